@@ -1,13 +1,17 @@
 # -*- coding: utf-8 -*-
 
-from odoo import http
+from odoo import http, fields
 from odoo.http import request, Response
 from odoo.http import content_disposition
 
 from odoo.tools.translate import _
+from odoo.tools.lru import LRU
+from odoo.osv.expression import OR
 
 import xml.etree.cElementTree as ET
+from werkzeug.exceptions import BadRequest
 from datetime import datetime
+from hashlib import md5
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -37,6 +41,50 @@ ID_TRAINING_MODULE_FIELD_MAP = {
     'description': 'description'
 }
 
+# Models whose records are serialized in the catalog, the most recent
+# ``write_date`` of all of them is used as cache key and as ETag
+CATALOG_MODELS = [
+    'academy.training.activity',
+    'academy.training.action',
+    'academy.competency.unit',
+    'academy.training.module',
+    'academy.professional.sector',
+    'academy.professional.area',
+    'academy.professional.family',
+    'academy.professional.field',
+    'academy.qualification.level'
+]
+
+CATALOG_STAMP_SELECT = \
+    'SELECT MAX ( write_date ) AS updated, COUNT ( * ) AS total FROM {table}'
+
+CATALOG_STAMP_SQL = \
+    'SELECT MAX ( updated ), SUM ( total ) FROM ( {selects} ) AS stamps'
+
+# Serialized catalogs, keys include the stamp so stale entries are never read
+CATALOG_CACHE = LRU(64)
+
+# Format of the ``updated`` attribute, also accepted by ``updated_since``
+UPDATED_FORMAT = '%m/%d/%Y %H:%M:%S'
+
+# Paths to the records serialized in the tree of each activity, delta mode
+# compares ``updated_since`` with the most recent ``write_date`` of all them
+CATALOG_ACTIVITY_TREE = [
+    'professional_area_id',
+    'qualification_level_id',
+    'professional_family_id',
+    'professional_field_id',
+    'professional_sector_ids',
+    'competency_unit_ids',
+    'competency_unit_ids.training_module_id',
+    'competency_unit_ids.training_module_id.training_unit_ids'
+]
+
+# Action trees are the ones of their activities
+CATALOG_ACTION_TREE = [
+    'training_activity_id.{}'.format(path) for path in CATALOG_ACTIVITY_TREE
+]
+
 
 class Publish(http.Controller):
 
@@ -58,7 +106,7 @@ class Publish(http.Controller):
         act = str(int(getattr(item, 'active', True)))
 
         upd = item.write_date or datetime.now()
-        upd = str(upd.strftime('%m/%d/%Y %H:%M:%S'))
+        upd = str(upd.strftime(UPDATED_FORMAT))
 
         target = ET.SubElement(et, tag, id=id_val, active=act, updated=upd)
 
@@ -129,78 +177,187 @@ class Publish(http.Controller):
                 self.xml_item_id(tus_et, 'unit', tu,
                                  ID_TRAINING_MODULE_FIELD_MAP)
 
-    @http.route('/academy_catalog/activity/<activity_id>', type='http', auth="public")
-    def activity(self, **kw):
+    # -------------------------------------------------------------------------
+    # Cache and conditional GET
+    # -------------------------------------------------------------------------
 
-        activity_id = int(kw['activity_id'])
+    @staticmethod
+    def _catalog_stamp():
+        """ Returns the most recent ``write_date`` of the catalog models and
+        the total number of their records, the latter changes on deletions.
+        """
 
-        headers = [('Content-Type', 'application/xml'),
-                   ('Content-Disposition', 'inline')]
+        env = request.env
+        tables = [env[model]._table for model in CATALOG_MODELS]
+        selects = [CATALOG_STAMP_SELECT.format(table=t) for t in tables]
 
-        root = ET.Element("catalog")
+        sql = CATALOG_STAMP_SQL.format(selects=' UNION ALL '.join(selects))
 
-        self._serialize_activity(root, activity_id)
+        env.cr.execute(sql)
+        updated, count = env.cr.fetchone()
 
-        xml = ET.tostring(root, encoding='utf8', method='xml')
+        return updated or datetime(1970, 1, 1), count or 0
 
-        return request.make_response(xml, headers=headers)
+    @staticmethod
+    def _parse_updated_since(kw):
+        value = kw.get('updated_since', False)
+        if not value:
+            return None
 
-    @http.route('/academy_catalog/activity/all', type='http', auth="public")
-    def activities(self, **kw):
+        try:
+            return datetime.strptime(value, UPDATED_FORMAT)
+        except ValueError:
+            pass
 
-        activity_obj = request.env['academy.training.activity']
-        activity_set = activity_obj.search([])
+        try:
+            return fields.Datetime.to_datetime(value)
+        except ValueError:
+            raise BadRequest(_('Invalid updated_since value: %s') % value)
+
+    @staticmethod
+    def _tree_updated(element):
+        """ Most recent ``updated`` attribute in the given element and in all
+        of its descendants
+        """
+
+        values = [item.get('updated') for item in element.iter()]
+        values = [datetime.strptime(v, UPDATED_FORMAT) for v in values if v]
+
+        return max(values) if values else None
+
+    def _catalog_response(self, builder, updated_since=None):
+        """ Serves the XML built by ``builder`` from the cache. The cache key
+        includes the catalog stamp, so it is never served out of date, and it
+        is also used as ETag and Last-Modified to answer conditional requests
+        with 304 Not Modified.
+
+        Args:
+            builder (callable): receives the root element and the optional
+            ``updated_since`` datetime and fills the catalog
+            updated_since (datetime): only changed items will be serialized
+        """
+
+        updated, count = self._catalog_stamp()
+        stamp = '{}:{}'.format(updated.isoformat(), count)
+
+        key = (request.env.cr.dbname, request.env.uid, request.env.lang,
+               request.httprequest.path, str(updated_since), stamp)
+
+        xml = CATALOG_CACHE.get(key)
+        if xml is None:
+            root = ET.Element("catalog")
+            builder(root, updated_since)
+
+            xml = ET.tostring(root, encoding='utf8', method='xml')
+            CATALOG_CACHE[key] = xml
 
         headers = [('Content-Type', 'application/xml'),
                    ('Content-Disposition', 'inline')]
 
-        root = ET.Element("catalog")
+        response = request.make_response(xml, headers=headers)
+
+        etag = md5(repr(key).encode('utf-8')).hexdigest()
+        response.set_etag(etag)
+        response.last_modified = updated
+        response.cache_control.no_cache = True
+
+        return response.make_conditional(request.httprequest)
+
+    # -------------------------------------------------------------------------
+    # Routes
+    # -------------------------------------------------------------------------
+
+    def _serialize_single(self, serializer, record_id):
+        """ Returns a builder which serializes a single record, in delta mode
+        it is omitted when nothing in its tree has changed
+        """
+
+        def builder(root, updated_since):
+            serializer(root, record_id)
+
+            if updated_since:
+                for element in list(root):
+                    updated = self._tree_updated(element)
+                    if updated and updated <= updated_since:
+                        root.remove(element)
+
+        return builder
+
+    def _serialize_all(self, model, tag, child_tag, fmap, tree):
+        """ Returns a builder which serializes all the records of the model,
+        in delta mode it includes only the ones which have changed, even
+        archived, or in whose tree something has changed. This is the same
+        the single record routes compare.
+
+        Args:
+            tree (list): paths to the records in the tree of each record
+        """
+
+        def builder(root, updated_since):
+            target_obj = request.env[model]
+            domain = []
+
+            if updated_since:
+                target_obj = target_obj.with_context(active_test=False)
+                paths = ['write_date']
+                paths += ['{}.write_date'.format(path) for path in tree]
+                domain = OR([[(path, '>', updated_since)] for path in paths])
+
+            target_set = target_obj.search(domain)
+            self.xml_item_ids(root, tag, target_set, child_tag, fmap)
+
+        return builder
+
+    @http.route('/academy_catalog/activity/<activity_id>', type='http',
+                auth="public")
+    def activity(self, **kw):
+
+        activity_id = int(kw['activity_id'])
+        updated_since = self._parse_updated_since(kw)
+
+        builder = self._serialize_single(self._serialize_activity, activity_id)
+
+        return self._catalog_response(builder, updated_since)
+
+    @http.route('/academy_catalog/activity/all', type='http', auth="public")
+    def activities(self, **kw):
+
+        updated_since = self._parse_updated_since(kw)
 
         fmap = {
             'activity_code': 'code',
             'name': 'name',
             'description': 'description'
         }
-        self.xml_item_ids(root, 'activities', activity_set, 'activity', fmap)
+        builder = self._serialize_all(
+            'academy.training.activity', 'activities', 'activity', fmap,
+            CATALOG_ACTIVITY_TREE)
 
-        xml = ET.tostring(root, encoding='utf8', method='xml')
+        return self._catalog_response(builder, updated_since)
 
-        return request.make_response(xml, headers=headers)
-
-    @http.route('/academy_catalog/action/<action_id>', type='http', auth="public")
+    @http.route('/academy_catalog/action/<action_id>', type='http',
+                auth="public")
     def action(self, **kw):
 
         action_id = int(kw['action_id'])
+        updated_since = self._parse_updated_since(kw)
 
-        headers = [('Content-Type', 'application/xml'),
-                   ('Content-Disposition', 'inline')]
-
-        root = ET.Element("catalog")
+        builder = self._serialize_single(self._serialize_action, action_id)
 
-        self._serialize_action(root, action_id)
-
-        xml = ET.tostring(root, encoding='utf8', method='xml')
-
-        return request.make_response(xml, headers=headers)
+        return self._catalog_response(builder, updated_since)
 
     @http.route('/academy_catalog/action/all', type='http', auth="public")
-    def activities(self, **kw):
+    def actions(self, **kw):
 
-        action_obj = request.env['academy.training.action']
-        action_set = action_obj.search([])
-
-        headers = [('Content-Type', 'application/xml'),
-                   ('Content-Disposition', 'inline')]
-
-        root = ET.Element("catalog")
+        updated_since = self._parse_updated_since(kw)
 
         fmap = {
             'action_code': 'code',
             'name': 'name',
             'description': 'description'
         }
-        self.xml_item_ids(root, 'actions', action_set, 'action', fmap)
-
-        xml = ET.tostring(root, encoding='utf8', method='xml')
+        builder = self._serialize_all(
+            'academy.training.action', 'actions', 'action', fmap,
+            CATALOG_ACTION_TREE)
 
-        return request.make_response(xml, headers=headers)
+        return self._catalog_response(builder, updated_since)
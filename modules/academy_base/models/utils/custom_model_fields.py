@@ -4,6 +4,23 @@
 This module has an Odoo overloaded fields.Many2many with change the middle
 TABLE by an SQL VIEW
 
+It also has a Many2manyView (overload for base_field_m2m_view) with an opt-in
+materialized mode. The relation is stored in an indexed TABLE refreshed from
+the SQL VIEW given as ``source``. Changes in the tables listed in
+``refresh_on`` enqueue the affected ``column1`` values, these are refreshed
+before the next read, e.g.::
+
+    available_item_ids = Many2manyView(
+        ...
+        relation='academy_training_module_available_item',
+        materialized=True,
+        source='academy_training_module_item_rel',
+        refresh_on=[
+            ('academy_item', 'INSERT OR DELETE', 'SELECT {row}.module_id'),
+            ('academy_training_module', 'UPDATE OF parent_id', None)  # All
+        ]
+    )
+
 Todo:
     * Move the SQL outside Many2manyThroughView class to paren models.Model
 
@@ -16,6 +33,8 @@ from logging import getLogger
 # pylint: disable=locally-disabled, E0401
 from odoo.fields import Many2many, Default
 from odoo.tools import sql as sqltools
+from odoo.addons.base_field_m2m_view.fields import \
+    Many2manyView as BaseMany2manyView
 from odoo.tools.translate import _
 
 # pylint: disable=locally-disabled, C0103
@@ -274,3 +293,307 @@ class Many2manyThroughView(Many2many):
             target = target(model)
 
         return target
+
+
+# pylint: disable=locally-disabled, R0903
+class Many2manyView(BaseMany2manyView):
+    """ Many2manyView with an opt-in materialized mode, without it the field
+    behaves as the original one and the relation must be created elsewhere
+    """
+
+    # Store the relation in a TABLE refreshed from the ``source`` SQL VIEW
+    materialized = False
+
+    # SQL VIEW with the live relation, it must have column1 and column2
+    source = None
+
+    # Changes which refresh the relation, as (table, events, sql) tuples.
+    # Events are given as in CREATE TRIGGER, default to all of them, and sql
+    # returns the affected column1 values, where ``{row}`` will be replaced by
+    # NEW or OLD, or it is None to refresh all the relation.
+    refresh_on = None
+
+    def update_db(self, model, columns):
+        """ Overload method to create the stored relation. It is delayed
+        until all the models have been initialized, so the ``source`` VIEW
+        and the tables in ``refresh_on`` will already exist.
+        """
+
+        if not self.materialized:
+            return super(Many2manyView, self).update_db(model, columns)
+
+        model.pool.post_init(self._update_materialized, model)
+
+        return True
+
+    def read(self, records):
+        """ Overload method to apply pending changes before the stored
+        relation will be read
+        """
+
+        if self.materialized:
+            records.flush()
+            if self.refresh_pending(records.env.cr):
+                records.env.cache.invalidate([(self, None)])
+
+        return super(Many2manyView, self).read(records)
+
+    # ------------------------- AUXILIARY METHODS -----------------------------
+
+    def _pending_relation(self):
+        return '{}_pending'.format(self.relation)
+
+    def _update_materialized(self, model):
+        """ Creates the TABLE, the queue of pending changes and the triggers
+        which fill it. A new TABLE is fully loaded on the first read, not
+        here, in order not to slow down module updates.
+        """
+
+        cursor = model.env.cr
+
+        if not self.source or not sqltools.table_kind(cursor, self.source):
+            _logger.warning('%s: Source %s does not exist',
+                            self.relation, self.source)
+            return
+
+        _logger.debug('Creating materialized %s for %s field',
+                      self.relation, self.name)
+
+        created = self._create_table_if_not_exists(cursor, model)
+        self._create_pending_table(cursor)
+        self._create_triggers(cursor)
+
+        if created:
+            sql = 'INSERT INTO {} ( {} ) VALUES ( NULL );'
+            cursor.execute(sql.format(self._pending_relation(), self.column1))
+
+    def _create_table_if_not_exists(self, cursor, model):
+        """ Creates the relation TABLE, removing the SQL VIEW would have been
+        created by a previous non materialized version of the field
+        """
+
+        kind = sqltools.table_kind(cursor, self.relation)
+        if kind == 'r':
+            return False
+
+        if kind == 'v':
+            sqltools.drop_view_if_exists(cursor, self.relation)
+
+        sql = '''
+            CREATE TABLE {rel} (
+                {col1} INTEGER NOT NULL
+                    REFERENCES {table1} ("id") ON DELETE CASCADE,
+                {col2} INTEGER NOT NULL
+                    REFERENCES {table2} ("id") ON DELETE CASCADE,
+                PRIMARY KEY ( {col1}, {col2} )
+            );
+
+            CREATE INDEX {rel}_{col2}_idx ON {rel} ( {col2}, {col1} );
+        '''
+
+        # pylint: disable=locally-disabled, W0212
+        sql = sql.format(
+            rel=self.relation,
+            col1=self.column1,
+            col2=self.column2,
+            table1=model._table,
+            table2=model.env[self.comodel_name]._table
+        )
+        cursor.execute(sql)
+
+        return True
+
+    def _create_pending_table(self, cursor):
+        """ Queue of column1 values to refresh, NULL means all of them
+        """
+
+        sql = 'CREATE TABLE IF NOT EXISTS {} ( {} INTEGER );'
+        sql = sql.format(self._pending_relation(), self.column1)
+        cursor.execute(sql)
+
+    def _create_triggers(self, cursor):
+        """ Creates a single function which enqueues the values affected by
+        the change, it will be called by a row trigger in each source table
+        """
+
+        # NULL is only enqueued to refresh all, other NULL keys are skipped
+        insert_sql = 'INSERT INTO {pending} ( {col1} ) {select};'
+        filter_sql = \
+            'SELECT key FROM ( {} ) AS affected ( key ) WHERE key IS NOT NULL'
+        branch_sql = '''
+            {keyword} TG_TABLE_NAME = '{table}' THEN
+                IF TG_OP <> 'INSERT' THEN
+                    {old_sql}
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    {new_sql}
+                END IF;
+        '''
+        function_sql = '''
+            CREATE OR REPLACE FUNCTION {name}() RETURNS TRIGGER AS $$
+            BEGIN
+                {branches}
+                END IF;
+
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        '''
+        trigger_sql = '''
+            DROP TRIGGER IF EXISTS {name} ON {table};
+
+            CREATE TRIGGER {name}
+            AFTER {events} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {name}();
+        '''
+
+        name = '{}_enqueue'.format(self.relation)
+        pending = self._pending_relation()
+
+        triggers, branches = [], []
+        for table, events, select in (self.refresh_on or []):
+            if not sqltools.table_exists(cursor, table):
+                _logger.warning('%s: Source table %s does not exist',
+                                self.relation, table)
+                continue
+
+            if select:
+                select = filter_sql.format(select)
+            else:
+                select = 'SELECT NULL::INTEGER'
+
+            old_sql, new_sql = [
+                insert_sql.format(pending=pending, col1=self.column1,
+                                  select=select.format(row=row))
+                for row in ('OLD', 'NEW')
+            ]
+
+            keyword = 'ELSIF' if branches else 'IF'
+            branches.append(branch_sql.format(
+                keyword=keyword, table=table,
+                old_sql=old_sql, new_sql=new_sql))
+            triggers.append((table, events or 'INSERT OR UPDATE OR DELETE'))
+
+        if not branches:
+            return
+
+        sql = function_sql.format(name=name, branches=''.join(branches))
+        cursor.execute(sql)
+
+        for table, events in triggers:
+            cursor.execute(
+                trigger_sql.format(name=name, table=table, events=events))
+
+    def refresh(self, cursor, ids=None):
+        """ Synchronizes the stored rows with the ``source`` VIEW
+
+        Args:
+            cursor (Cursor): database cursor
+            ids (list): column1 values to refresh, None to refresh all
+        """
+
+        sql = '''
+            DELETE FROM {rel} AS rel
+            WHERE
+                ( %(ids)s::INTEGER[] IS NULL OR rel.{col1} = ANY(%(ids)s) )
+                AND NOT EXISTS (
+                    SELECT
+                        1
+                    FROM
+                        {source} AS src
+                    WHERE
+                        src.{col1} = rel.{col1}
+                        AND src.{col2} = rel.{col2}
+                );
+
+            INSERT INTO {rel} ( {col1}, {col2} )
+            SELECT DISTINCT
+                src.{col1},
+                src.{col2}
+            FROM
+                {source} AS src
+            WHERE
+                ( %(ids)s::INTEGER[] IS NULL OR src.{col1} = ANY(%(ids)s) )
+                AND src.{col1} IS NOT NULL
+                AND src.{col2} IS NOT NULL
+            ON CONFLICT DO NOTHING;
+        '''
+
+        sql = sql.format(rel=self.relation, source=self.source,
+                         col1=self.column1, col2=self.column2)
+
+        cursor.execute(sql, {'ids': list(ids) if ids is not None else None})
+
+    def refresh_pending(self, cursor):
+        """ Refreshes the column1 values enqueued by the triggers. The queue
+        is checked before it is drained, so reads without pending changes do
+        not write.
+
+        Returns:
+            bool: True if something has been refreshed
+        """
+
+        sql = 'SELECT EXISTS ( SELECT 1 FROM {} );'
+        cursor.execute(sql.format(self._pending_relation()))
+        if not cursor.fetchone()[0]:
+            return False
+
+        sql = 'DELETE FROM {} RETURNING {};'
+        sql = sql.format(self._pending_relation(), self.column1)
+
+        cursor.execute(sql)
+        ids = set(row[0] for row in cursor.fetchall())
+
+        if not ids:
+            return False
+
+        self.refresh(cursor, None if None in ids else sorted(ids))
+
+        return True
+
+    def check_consistency(self, cursor, fix=False):
+        """ Compares the stored rows against the ``source`` VIEW
+
+        Args:
+            cursor (Cursor): database cursor
+            fix (bool): refresh all the relation if they do not match
+
+        Returns:
+            tuple: number of missing rows and number of extra rows
+        """
+
+        sql = '''
+            WITH src AS (
+                SELECT DISTINCT {col1}, {col2}
+                FROM {source}
+                WHERE {col1} IS NOT NULL AND {col2} IS NOT NULL
+            )
+            SELECT
+                (
+                    SELECT COUNT(*) FROM (
+                        SELECT {col1}, {col2} FROM src
+                        EXCEPT SELECT {col1}, {col2} FROM {rel}
+                    ) AS missing
+                ) AS missing_count,
+                (
+                    SELECT COUNT(*) FROM (
+                        SELECT {col1}, {col2} FROM {rel}
+                        EXCEPT SELECT {col1}, {col2} FROM src
+                    ) AS extra
+                ) AS extra_count
+        '''
+
+        self.refresh_pending(cursor)
+
+        sql = sql.format(rel=self.relation, source=self.source,
+                         col1=self.column1, col2=self.column2)
+        cursor.execute(sql)
+        missing, extra = cursor.fetchone()
+
+        if missing or extra:
+            _logger.warning('%s: %s missing and %s extra rows',
+                            self.relation, missing, extra)
+            if fix:
+                self.refresh(cursor)
+
+        return missing, extra
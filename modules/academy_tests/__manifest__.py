@@ -37,6 +37,7 @@
         'data/academy_tests_correction_scale_data.xml',
         'data/ir_sequence.xml',
         'data/ir_cron.xml',
+        'data/ir_cron_update.xml',
         'data/ir_actions_server_data.xml',
         'data/academy_tests_test_block_data.xml',
 
@@ -50,6 +51,7 @@
         'security/academy_tests_attempt.xml',
         'security/academy_tests_attempt_answer.xml',
         'security/academy_tests_attempt_final_answer_helper.xml',
+        'security/academy_statistics_student_question_readonly.xml',
         'security/academy_tests_category.xml',
         'security/academy_tests_correction_scale.xml',
         'security/academy_tests_level.xml',
@@ -58,6 +60,7 @@
         'security/academy_tests_question_dependency_rel.xml',
         'security/academy_tests_question_duplicated_by_owner_rel.xml',
         'security/academy_tests_question_duplicated_rel.xml',
+        'security/academy_tests_question_near_duplicate_rel.xml',
         'security/academy_tests_question_impugnment.xml',
         'security/academy_tests_question_impugnment_reply.xml',
         'security/academy_tests_question_request.xml',
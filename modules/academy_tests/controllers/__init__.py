@@ -7,3 +7,4 @@
 
 from . import download_resources
 from . import redirecto_to
+from . import answer_sheets
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+from odoo.http import Controller, request, route
+
+from logging import getLogger
+
+
+_logger = getLogger(__name__)
+
+
+ANSWER_SHEETS_URL = '/academy_tests/attempt/answer_sheets'
+
+
+class AnswerSheets(Controller):
+    """ Allows to submit the answers of many attempts in a single request
+
+        Routes:
+          /academy_tests/attempt/answer_sheets: stores compact answer sheets
+    """
+
+    @route(ANSWER_SHEETS_URL, type='json', auth='user', website=False)
+    def answer_sheets(self, sheets, close=True, **kw):
+        """ Expects a JSON-RPC call with ``sheets``, a dictionary of answer
+        sheets by attempt ID, each one of them is a list of ``[link_id,
+        answer_id]`` or ``[link_id, answer_id, user_action]`` entries. See
+        ``academy.tests.attempt.submit_answer_sheets``.
+        """
+
+        attempt_obj = request.env['academy.tests.attempt']
+        attempt_set = attempt_obj.submit_answer_sheets(sheets, close=close)
+
+        return attempt_set.read(['closed', 'final_score', 'passed'])
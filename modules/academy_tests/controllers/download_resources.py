@@ -19,23 +19,58 @@
 ###############################################################################
 
 import logging
-try:
-    from BytesIO import BytesIO
-except ImportError:
-    from io import BytesIO
 import zipfile
 from datetime import datetime
-from odoo import http
+from odoo import http, api
 from odoo.http import request, Response
+from odoo.models import BaseModel
+from odoo.modules.registry import Registry
 from odoo.http import content_disposition
 import mimetypes
 import os
 from odoo.tools.translate import _
+from ..models.utils.libuseful import ChunkBuffer
 
 
 _logger = logging.getLogger(__name__)
 
 
+ZIP_CHUNK_SIZE = 64 * 1024
+
+# Formats which are already compressed, they will be stored as they are
+STORED_MIMETYPES = (
+    'image/jpeg', 'image/png', 'image/gif', 'image/webp',
+    'application/zip', 'application/gzip', 'application/x-7z-compressed',
+    'audio/mpeg', 'video/mp4', 'video/mpeg'
+)
+
+
+def stream_records(target_set, method, **kwargs):
+    """ Yields the chunks returned by the given generator method of the
+    target recordset. The request cursor has been released when the response
+    is consumed, so the records are browsed again using a new cursor.
+
+    Arguments:
+        target_set {BaseModel} -- records in the request environment
+        method {str} -- name of the recordset method which yields the chunks
+    """
+
+    env = target_set.env
+    dbname, uid, context, su = env.cr.dbname, env.uid, env.context, env.su
+
+    with api.Environment.manage():
+        with Registry(dbname).cursor() as cr:
+            stream_env = api.Environment(cr, uid, context, su=su)
+
+            for key, value in kwargs.items():
+                if isinstance(value, BaseModel):
+                    kwargs[key] = value.with_env(stream_env)
+
+            stream_set = target_set.with_env(stream_env)
+            for chunk in getattr(stream_set, method)(**kwargs):
+                yield chunk
+
+
 class TestAttachments(http.Controller):
 
     @staticmethod
@@ -55,6 +90,66 @@ class TestAttachments(http.Controller):
     def _get_extension(attachment):
         return mimetypes.guess_extension(attachment.mimetype)
 
+    @staticmethod
+    def _zip_compress_type(file_name):
+        mimetype, encoding = mimetypes.guess_type(file_name)
+
+        if encoding or mimetype in STORED_MIMETYPES:
+            return zipfile.ZIP_STORED
+
+        return zipfile.ZIP_DEFLATED
+
+    def _stream_zip(self, file_list, text_list=None):
+        """ Builds a ZIP archive yielding it chunk by chunk, so only a chunk
+        is held in memory at a time.
+
+        Arguments:
+            file_list {list} -- tuples (path in filestore, path in archive)
+            text_list {list} -- tuples (bytes content, path in archive)
+        """
+
+        stream = ChunkBuffer()
+        zip_file = zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED)
+
+        for content, arcname in (text_list or []):
+            zip_file.writestr(arcname, content)
+            yield stream.pop()
+
+        for file_path, arcname in file_list:
+            try:
+                zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+            except OSError as ex:
+                _logger.warning('Missing file %s: %s', file_path, ex)
+                continue
+
+            zinfo.compress_type = self._zip_compress_type(arcname)
+            zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT
+
+            with open(file_path, 'rb') as src:
+                with zip_file.open(zinfo, 'w', force_zip64=zip64) as dest:
+                    chunk = src.read(ZIP_CHUNK_SIZE)
+                    while chunk:
+                        dest.write(chunk)
+                        yield stream.pop()
+                        chunk = src.read(ZIP_CHUNK_SIZE)
+
+            yield stream.pop()
+
+        zip_file.close()
+        yield stream.pop()
+
+    def _make_zip_response(self, zname, file_list, text_list=None):
+        """ All the database reads must be done before calling this, the
+        archive is built once the request cursor has been released.
+        """
+
+        headers = [('Content-Type', 'application/x-zip-compressed'),
+                   ('Content-Disposition', content_disposition(zname))]
+
+        stream = self._stream_zip(file_list, text_list)
+
+        return Response(stream, headers=headers, direct_passthrough=True)
+
     def _attachment_file_name(self, attachment):
         file_name = '{0:08}'.format(attachment.id)
         attach_name = attachment.name
@@ -91,16 +186,10 @@ class TestAttachments(http.Controller):
         if not zname:
             zname = '{0:08}.zip'.format(test_id)
 
-        bitIO = BytesIO()
-        zip_file = zipfile.ZipFile(bitIO, "w", zipfile.ZIP_DEFLATED)
-        for file_info in file_dict.values():
-            zip_file.write(file_info["path"], file_info["name"])
-        zip_file.close()
+        file_list = [(file_info["path"], file_info["name"])
+                     for file_info in file_dict.values()]
 
-        headers = [('Content-Type', 'application/x-zip-compressed'),
-                   ('Content-Disposition', content_disposition(zname))]
-
-        return request.make_response(bitIO.getvalue(), headers=headers)
+        return self._make_zip_response(zname, file_list)
 
     @http.route('/academy_tests/source', type='http', auth="public")
     def download_source(self, question_ids, zname=None, **kw):
@@ -132,18 +221,12 @@ class TestAttachments(http.Controller):
         tname = '{}.txt'.format(_('Statement'))
         dname = _('Resources')
 
-        bitIO = BytesIO()
-        zip_file = zipfile.ZipFile(bitIO, "w", zipfile.ZIP_DEFLATED)
-        zip_file.writestr(tname, content)
-        for file_info in file_dict.values():
-            target_path = os.path.join(dname, file_info["name"])
-            zip_file.write(file_info["path"], target_path)
-        zip_file.close()
-
-        headers = [('Content-Type', 'application/x-zip-compressed'),
-                   ('Content-Disposition', content_disposition(zname))]
+        file_list = [
+            (file_info["path"], os.path.join(dname, file_info["name"]))
+            for file_info in file_dict.values()
+        ]
 
-        return request.make_response(bitIO.getvalue(), headers=headers)
+        return self._make_zip_response(zname, file_list, [(content, tname)])
 
     @http.route('/academy_tests/moodle/test', type='http', auth="public")
     def test_to_moodle(self, test_id, category=None, **kw):
@@ -155,10 +238,10 @@ class TestAttachments(http.Controller):
             return Response(str(ae), status=404)
 
         headers = self._build_moodle_headers(test_set.name)
-        content = self._build_moodle_xml(
+        stream = self._build_moodle_xml(
             test_set, category or test_set.name)
 
-        return request.make_response(content, headers=headers)
+        return Response(stream, headers=headers, direct_passthrough=True)
 
     @http.route('/academy_tests/moodle/questions', type='http', auth="public")
     def questions_to_moodle(self, question_ids, category=None, **kw):
@@ -168,10 +251,10 @@ class TestAttachments(http.Controller):
         except AssertionError as ae:
             return Response(str(ae), status=404)
 
-        content = self._build_moodle_xml(question_set, category)
+        stream = self._build_moodle_xml(question_set, category)
         headers = self._build_moodle_headers()
 
-        return request.make_response(content, headers=headers)
+        return Response(stream, headers=headers, direct_passthrough=True)
 
     def _browse_for_test(self, test_id_str, verify=True):
         test_set = request.env['academy.tests.test'].sudo()
@@ -224,6 +307,10 @@ class TestAttachments(http.Controller):
 
     @staticmethod
     def _build_moodle_xml(target_set, category=None):
+        """ Returns a generator which yields the Moodle XML chunk by chunk,
+        questions are read in batches once the response is being sent.
+        """
+
         category = category or _('Odoo export')
 
         scale_xid = 'academy_tests.academy_tests_correction_scale_default'
@@ -234,10 +321,10 @@ class TestAttachments(http.Controller):
             correction_scale = target_set.correction_scale_id
             target_set = target_set.question_ids
 
-        return target_set.to_moodle(encoding='utf8', prettify=True,
-                                    xml_declaration=True,
-                                    category=category,
-                                    correction_scale=correction_scale)
+        return stream_records(target_set, 'moodle_stream', encoding='utf8',
+                              prettify=True, xml_declaration=True,
+                              category=category,
+                              correction_scale=correction_scale)
 
     @staticmethod
     def _build_moodle_headers(fname=None):
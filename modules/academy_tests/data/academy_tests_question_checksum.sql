@@ -0,0 +1,184 @@
+-- ----------------------------------------------------------------------------
+-- academy_tests_question.checksum
+-- MD5 of the question statement, its answers, its topic versions and its
+-- attachments. It is kept up to date by the triggers below, each one computes
+-- only the checksum of the questions affected by the change. Questions
+-- without answers have no checksum.
+-- ----------------------------------------------------------------------------
+
+
+-- Computes and stores the checksum of the given questions, all of them when
+-- the array is NULL. Only the changed values are written. Returns the number
+-- of updated questions.
+CREATE OR REPLACE FUNCTION academy_tests_question_checksum_refresh(
+    p_question_ids INTEGER[]
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+
+    IF p_question_ids = '{}' THEN
+        RETURN 0;
+    END IF;
+
+    WITH targets AS (
+        SELECT
+            atq."id" AS question_id,
+            COALESCE(NULLIF( atq.preamble, '' ), 'Empty')::VARCHAR AS preamble,
+            atq."name"
+        FROM
+            academy_tests_question AS atq
+        WHERE
+            p_question_ids IS NULL OR atq."id" = ANY ( p_question_ids )
+    ), answers AS (
+        SELECT
+            ans.question_id,
+            ARRAY_AGG (
+                CASE WHEN ans.is_correct
+                    THEN 'x'
+                    ELSE '#'
+                END || ans."name"
+                ORDER BY ans."sequence" ASC, ans."id" ASC
+            )::VARCHAR AS answers
+        FROM
+            academy_tests_answer AS ans
+        INNER JOIN targets AS tgt
+            ON tgt.question_id = ans.question_id
+        GROUP BY
+            ans.question_id
+    ), versions AS (
+        SELECT
+            rel.question_id,
+            ARRAY_AGG (
+                rel.topic_version_id ORDER BY rel.topic_version_id ASC
+            ) :: INT [] AS version_ids
+        FROM
+            academy_tests_question_topic_version_rel AS rel
+        INNER JOIN targets AS tgt
+            ON tgt.question_id = rel.question_id
+        GROUP BY
+            rel.question_id
+    ), attachments AS (
+        SELECT
+            rel.question_id,
+            ARRAY_AGG (
+                rel.attachment_id ORDER BY rel.attachment_id ASC
+            ) :: INT [] AS attachment_ids
+        FROM
+            academy_tests_question_ir_attachment_rel AS rel
+        INNER JOIN targets AS tgt
+            ON tgt.question_id = rel.question_id
+        GROUP BY
+            rel.question_id
+    ), computed_md5 AS (
+        SELECT
+            tgt.question_id,
+            UPPER(MD5(
+                tgt.preamble || '; ' ||
+                tgt."name" || '; ' ||
+                ARRAY_TO_STRING(ans.answers::VARCHAR[], '; ')::VARCHAR || '; ' ||
+                ARRAY_TO_STRING(
+                    COALESCE(vers.version_ids, ARRAY[0]::INT[]), '; '
+                )::VARCHAR ||
+                ARRAY_TO_STRING(
+                    COALESCE(att.attachment_ids, ARRAY[0]::INT[]), '; '
+                )::VARCHAR
+            ))::VARCHAR AS md5
+        FROM
+            targets AS tgt
+        LEFT JOIN answers AS ans
+            ON ans.question_id = tgt.question_id
+        LEFT JOIN versions AS vers
+            ON vers.question_id = tgt.question_id
+        LEFT JOIN attachments AS att
+            ON att.question_id = tgt.question_id
+    )
+    UPDATE academy_tests_question AS atq
+    SET checksum = cmp."md5"
+    FROM
+        computed_md5 AS cmp
+    WHERE
+        cmp.question_id = atq."id"
+        AND atq.checksum IS DISTINCT FROM cmp."md5";
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Questions: new ones or changes in the statement
+CREATE OR REPLACE FUNCTION academy_tests_question_checksum_on_question()
+RETURNS TRIGGER AS $$
+BEGIN
+
+    PERFORM academy_tests_question_checksum_refresh(ARRAY[NEW."id"]);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS
+    trg_academy_tests_question_checksum_on_question
+    ON academy_tests_question;
+
+CREATE TRIGGER trg_academy_tests_question_checksum_on_question
+AFTER INSERT OR UPDATE OF preamble, "name"
+ON academy_tests_question
+FOR EACH ROW
+EXECUTE FUNCTION academy_tests_question_checksum_on_question();
+
+
+-- Answers, topic versions and attachments, all of them have a question_id
+-- column. Updates can move the row from a question to another one.
+CREATE OR REPLACE FUNCTION academy_tests_question_checksum_on_child()
+RETURNS TRIGGER AS $$
+BEGIN
+
+    IF TG_OP = 'INSERT' THEN
+        PERFORM academy_tests_question_checksum_refresh(
+            ARRAY[NEW.question_id]);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM academy_tests_question_checksum_refresh(
+            ARRAY[OLD.question_id]);
+    ELSE
+        PERFORM academy_tests_question_checksum_refresh(
+            ARRAY[OLD.question_id, NEW.question_id]);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS
+    trg_academy_tests_question_checksum_on_answer
+    ON academy_tests_answer;
+
+CREATE TRIGGER trg_academy_tests_question_checksum_on_answer
+AFTER INSERT OR DELETE OR UPDATE OF
+    question_id, "name", is_correct, "sequence"
+ON academy_tests_answer
+FOR EACH ROW
+EXECUTE FUNCTION academy_tests_question_checksum_on_child();
+
+DROP TRIGGER IF EXISTS
+    trg_academy_tests_question_checksum_on_version
+    ON academy_tests_question_topic_version_rel;
+
+CREATE TRIGGER trg_academy_tests_question_checksum_on_version
+AFTER INSERT OR DELETE OR UPDATE
+ON academy_tests_question_topic_version_rel
+FOR EACH ROW
+EXECUTE FUNCTION academy_tests_question_checksum_on_child();
+
+DROP TRIGGER IF EXISTS
+    trg_academy_tests_question_checksum_on_attachment
+    ON academy_tests_question_ir_attachment_rel;
+
+CREATE TRIGGER trg_academy_tests_question_checksum_on_attachment
+AFTER INSERT OR DELETE OR UPDATE
+ON academy_tests_question_ir_attachment_rel
+FOR EACH ROW
+EXECUTE FUNCTION academy_tests_question_checksum_on_child();
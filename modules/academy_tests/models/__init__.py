@@ -39,6 +39,7 @@ from . import academy_tests_test_kind
 
 from . import academy_tests_attempt
 from . import academy_tests_attempt_answer
+from . import academy_statistics_student_question_readonly
 
 from . import academy_training_action_enrolment
 from . import academy_tests_test
@@ -66,6 +67,7 @@ from . import academy_tests_attempt_final_answer_helper
 
 from . import academy_tests_question_dependency_rel
 from . import academy_tests_question_duplicated_rel
+from . import academy_tests_question_near_duplicate_rel
 from . import academy_tests_topic_training_module_link_question_rel
 from . import academy_tests_test_test_block_rel
 from . import academy_tests_test_training_assignment_enrolment_rel
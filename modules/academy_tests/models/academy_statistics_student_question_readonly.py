@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+""" AcademyStatisticsStudentQuestionReadonly
+
+This module contains the academy.statistics.student.question.readonly Odoo
+model which stores the answer statistics of each student for each question.
+Rows are pre-aggregated, they are refreshed when attempts are recalculated
+and they can be fully rebuilt.
+"""
+
+from odoo import models, fields, api
+from odoo.tools.translate import _
+from odoo.exceptions import UserError
+
+from .utils.view_academy_statistics_student_question_readonly import \
+    ACADEMY_STATISTICS_STUDENT_QUESTION_REFRESH
+from .utils.view_academy_statistics_student_question_readonly import \
+    ACADEMY_STATISTICS_STUDENT_QUESTION_SCOPE
+from .utils.view_academy_statistics_student_question_readonly import \
+    ACADEMY_STATISTICS_STUDENT_QUESTION_LINK_SCOPE
+
+from logging import getLogger
+
+
+_logger = getLogger(__name__)
+
+
+class AcademyStatisticsStudentQuestionReadonly(models.Model):
+    """ Answer statistics by student and question, it only can be changed
+    through ``refresh_statistics``
+    """
+
+    _name = 'academy.statistics.student.question.readonly'
+    _description = u'Academy statistics student question'
+
+    _rec_name = 'question_id'
+    _order = 'student_id ASC, question_id ASC'
+
+    student_id = fields.Many2one(
+        string='Student',
+        required=True,
+        readonly=True,
+        index=True,
+        default=None,
+        help='Student who answered the question',
+        comodel_name='academy.student',
+        domain=[],
+        context={},
+        ondelete='cascade',
+        auto_join=False
+    )
+
+    question_id = fields.Many2one(
+        string='Question',
+        required=True,
+        readonly=True,
+        index=True,
+        default=None,
+        help='Answered question',
+        comodel_name='academy.tests.question',
+        domain=[],
+        context={},
+        ondelete='cascade',
+        auto_join=False
+    )
+
+    attempts = fields.Integer(
+        string='Attempts',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of times the student has been asked the question'
+    )
+
+    answer = fields.Integer(
+        string='Answer',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of times the student answered the question'
+    )
+
+    answer_percent = fields.Float(
+        string='Answer (%)',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0.0,
+        digits=(16, 4),
+        help='Ratio of answer to attempts'
+    )
+
+    doubt = fields.Integer(
+        string='Doubt',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of times the student marked the question as doubt'
+    )
+
+    doubt_percent = fields.Float(
+        string='Doubt (%)',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0.0,
+        digits=(16, 4),
+        help='Ratio of doubt to attempts'
+    )
+
+    blank = fields.Integer(
+        string='Blank',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of times the student left the question blank'
+    )
+
+    blank_percent = fields.Float(
+        string='Blank (%)',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0.0,
+        digits=(16, 4),
+        help='Ratio of blank to attempts'
+    )
+
+    right = fields.Integer(
+        string='Right',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of times the student marked the right answer'
+    )
+
+    right_percent = fields.Float(
+        string='Right (%)',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0.0,
+        digits=(16, 4),
+        help='Ratio of right to attempts'
+    )
+
+    wrong = fields.Integer(
+        string='Wrong',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of times the student marked a wrong answer'
+    )
+
+    wrong_percent = fields.Float(
+        string='Wrong (%)',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0.0,
+        digits=(16, 4),
+        help='Ratio of wrong to attempts'
+    )
+
+    answer_doubt = fields.Integer(
+        string='Answer or doubt',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of times the student did not leave the question blank'
+    )
+
+    answer_doubt_percent = fields.Float(
+        string='Answer or doubt (%)',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0.0,
+        digits=(16, 4),
+        help='Ratio of answer or doubt to attempts'
+    )
+
+    blank_doubt = fields.Integer(
+        string='Blank or doubt',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of times the student was not sure'
+    )
+
+    blank_doubt_percent = fields.Float(
+        string='Blank or doubt (%)',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0.0,
+        digits=(16, 4),
+        help='Ratio of blank or doubt to attempts'
+    )
+
+    blank_wrong = fields.Integer(
+        string='Blank or wrong',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of times the student did not mark the right answer'
+    )
+
+    blank_wrong_percent = fields.Float(
+        string='Blank or wrong (%)',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0.0,
+        digits=(16, 4),
+        help='Ratio of blank or wrong to attempts'
+    )
+
+    doubt_wrong = fields.Integer(
+        string='Doubt or wrong',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of times the student doubted or failed'
+    )
+
+    doubt_wrong_percent = fields.Float(
+        string='Doubt or wrong (%)',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0.0,
+        digits=(16, 4),
+        help='Ratio of doubt or wrong to attempts'
+    )
+
+    blank_doubt_wrong = fields.Integer(
+        string='Blank, doubt or wrong',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of times the student did not answer correctly for sure'
+    )
+
+    blank_doubt_wrong_percent = fields.Float(
+        string='Blank, doubt or wrong (%)',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0.0,
+        digits=(16, 4),
+        help='Ratio of blank, doubt or wrong to attempts'
+    )
+
+    _sql_constraints = [
+        (
+            'unique_student_question',
+            'UNIQUE(student_id, question_id)',
+            _('There can only be one statistics row by student and question')
+        )
+    ]
+
+    def init(self):
+        """ Builds the statistics the first time the table is created """
+
+        sql = 'SELECT EXISTS ( SELECT 1 FROM {} )'.format(self._table)
+        self.env.cr.execute(sql)
+
+        if not self.env.cr.fetchone()[0]:
+            self.rebuild_statistics()
+
+    @api.model_create_multi
+    def create(self, values_list):
+        raise UserError(_('Statistics can only be changed by refreshing them'))
+
+    def write(self, values):
+        raise UserError(_('Statistics can only be changed by refreshing them'))
+
+    @api.model
+    def refresh_statistics(self, student_ids=None, question_ids=None):
+        """ Recomputes the statistics of the given students and questions
+
+        Args:
+            student_ids (list): students to refresh, None means all
+            question_ids (list): questions to refresh, None means all
+        """
+
+        if student_ids is not None and not student_ids:
+            return
+        if question_ids is not None and not question_ids:
+            return
+
+        self.env['academy.tests.attempt.answer'].flush()
+        self.env['academy.tests.attempt'].flush()
+        self.flush()
+
+        params = {
+            'uid': self.env.uid,
+            'student_ids': list(student_ids) if student_ids else None,
+            'question_ids': list(question_ids) if question_ids else None
+        }
+        sql = ACADEMY_STATISTICS_STUDENT_QUESTION_REFRESH
+        self.env.cr.execute(sql, params)
+
+        self.invalidate_cache()
+
+    @api.model
+    def refresh_by_attempts(self, attempt_ids):
+        """ Recomputes the statistics which can be changed by the attempts """
+
+        self.refresh_scope(self.get_scope_by_attempts(attempt_ids))
+
+    @api.model
+    def get_scope_by_attempts(self, attempt_ids):
+        """ Students and questions whose statistics can be changed by the
+        attempts. Scope must be taken before the attempts will be removed.
+
+        Returns:
+            tuple: set of student IDs and set of question IDs
+        """
+
+        attempt_obj = self.env['academy.tests.attempt']
+        attempt_obj.flush(['student_id', 'assignment_id'])
+
+        sql = ACADEMY_STATISTICS_STUDENT_QUESTION_SCOPE
+        return self._fetch_scope(sql, attempt_ids)
+
+    @api.model
+    def get_scope_by_links(self, link_ids):
+        """ Students and questions whose statistics can be changed by the
+        test question links. Scope must be taken before the links will be
+        removed or moved.
+
+        Returns:
+            tuple: set of student IDs and set of question IDs
+        """
+
+        link_obj = self.env['academy.tests.test.question.rel']
+        link_obj.flush(['test_id', 'question_id'])
+
+        sql = ACADEMY_STATISTICS_STUDENT_QUESTION_LINK_SCOPE
+        return self._fetch_scope(sql, link_ids)
+
+    def _fetch_scope(self, sql, res_ids):
+        if not res_ids:
+            return set(), set()
+
+        self.env.cr.execute(sql, (list(res_ids),))
+        student_ids, question_ids = self.env.cr.fetchone()
+
+        return set(student_ids or []), set(question_ids or [])
+
+    @api.model
+    def refresh_scope(self, *scopes):
+        """ Recomputes the statistics of the given scopes, they are merged
+
+        Args:
+            scopes (tuple): set of student IDs and set of question IDs
+        """
+
+        student_ids, question_ids = set(), set()
+        for scope_student_ids, scope_question_ids in scopes:
+            student_ids.update(scope_student_ids)
+            question_ids.update(scope_question_ids)
+
+        self.refresh_statistics(sorted(student_ids), sorted(question_ids))
+
+    @api.model
+    def rebuild_statistics(self):
+        """ Recomputes all the statistics, existing rows are updated in place
+        """
+
+        _logger.info('Rebuilding student/question statistics')
+
+        self.refresh_statistics()
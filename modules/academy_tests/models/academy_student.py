@@ -66,6 +66,21 @@ class AcademyStudent(models.Model):
 
         return domain
 
+    question_statistics_ids = fields.One2many(
+        string='Question statistics',
+        required=False,
+        readonly=True,
+        index=False,
+        default=None,
+        help='Answer statistics of this student for each question',
+        comodel_name='academy.statistics.student.question.readonly',
+        inverse_name='student_id',
+        domain=[],
+        context={},
+        auto_join=False,
+        limit=None
+    )
+
     assignment_count = fields.Integer(
         string='Nº assignments',
         required=False,
@@ -12,6 +12,10 @@ from odoo.tools.translate import _
 
 _logger = getLogger(__name__)
 
+# Near-duplicate index, it must be updated when these fields change
+NEAR_DUPLICATE_MODEL = 'academy.tests.question.near.duplicate.rel'
+NEAR_DUPLICATE_FIELDS = {'name', 'sequence', 'question_id'}
+
 
 class AcademyTestsAnswer(models.Model):
     """ This model stores an answer for existing academy.tests.question
@@ -123,12 +127,36 @@ class AcademyTestsAnswer(models.Model):
         for record in records:
             record.message_change_thread(record.question_id)
 
+        self.env['academy.tests.question'].bump_bank_generation()
+
+        question_ids = records.mapped('question_id').ids
+        self.env[NEAR_DUPLICATE_MODEL].update_index(question_ids)
+
         return records
 
     def write(self, values):
+        question_ids = self.mapped('question_id').ids
+
         result = super(AcademyTestsAnswer, self).write(values)
 
         for record in self:
             record.message_change_thread(record.question_id)
 
+        self.env['academy.tests.question'].bump_bank_generation()
+
+        if NEAR_DUPLICATE_FIELDS & values.keys():
+            question_ids += self.mapped('question_id').ids
+            self.env[NEAR_DUPLICATE_MODEL].update_index(set(question_ids))
+
+        return result
+
+    def unlink(self):
+        question_ids = self.mapped('question_id').ids
+
+        result = super(AcademyTestsAnswer, self).unlink()
+
+        self.env['academy.tests.question'].bump_bank_generation()
+
+        self.env[NEAR_DUPLICATE_MODEL].update_index(question_ids)
+
         return result
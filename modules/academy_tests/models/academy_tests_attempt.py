@@ -11,11 +11,18 @@ from odoo.tools.translate import _
 from odoo.tools import safe_eval
 from odoo.osv.expression import TRUE_DOMAIN
 from odoo.exceptions import ValidationError, UserError
+from odoo.tools import split_every
 from odoo.addons.academy_base.utils.sql_helpers import create_index
 
+from .utils.sql_operations import ACADEMY_TESTS_ATTEMPT_SCORE_COUNTS
+from .utils.sql_operations import ACADEMY_TESTS_ATTEMPT_SHEET_CHECK
+from .utils.sql_operations import ACADEMY_TESTS_ATTEMPT_INSERT_ANSWERS
+from .academy_tests_attempt_answer import USER_ACTIONS
+
 from logging import getLogger
 from psycopg2.errors import SerializationFailure
 from datetime import timedelta
+from threading import current_thread
 from math import floor
 from sys import maxsize
 from time import sleep
@@ -24,6 +31,50 @@ _logger = getLogger(__name__)
 
 MAX_RETRIES = 5
 
+# Durable queue with the side effects of closing attempts. Entries are only
+# appended, so concurrent transactions never wait for each other, and they are
+# coalesced by the worker which drains them.
+PENDING_UPDATE_TABLE = 'academy_tests_attempt_pending_update'
+PENDING_UPDATE_BATCH = 5000
+
+# Entries which failed this number of times are kept in the queue, but they
+# are no longer claimed, so they can be reviewed
+PENDING_UPDATE_MAX_RETRIES = 5
+
+# Kinds of queued side effects, in the order they are applied
+PENDING_UPDATE_KINDS = [
+    'prevalence', 'rank', 'statistics', 'individual', 'assignment'
+]
+
+# Number of attempts will be scored and written by each bulk statement
+SCORE_BATCH_SIZE = 5000
+
+# Pre-aggregated answer statistics by student and question
+STATISTICS_MODEL = 'academy.statistics.student.question.readonly'
+
+# Attempt fields which change the statistics scope
+STATISTICS_SCOPE_FIELDS = ['individual_id', 'active']
+
+ATTEMPT_ANSWER_MODEL = 'academy.tests.attempt.answer'
+
+# Columns of the compact answer sheets, one array by column
+ANSWER_SHEET_COLUMNS = [
+    'attempt_ids', 'link_ids', 'answer_ids', 'user_actions'
+]
+
+INDIVIDUAL_MODEL = 'academy.tests.test.training.assignment.enrolment.rel'
+ASSIGNMENT_MODEL = 'academy.tests.test.training.assignment'
+
+# Fields computed by get_computed_values, in the same order they are written
+SCORE_FIELDS = [
+    'question_count', 'answered_count', 'doubt_count', 'answer_count',
+    'right_count', 'wrong_count', 'blank_count', 'max_points',
+    'right_points', 'wrong_points', 'blank_points', 'final_points',
+    'answered_percent', 'right_percent', 'wrong_percent', 'blank_percent',
+    'final_score', 'right_score', 'wrong_score', 'blank_score', 'rating',
+    'passed', 'grade'
+]
+
 
 class AcademyTestAttempt(models.Model):
     """ Logs all student answers in a test attempt, even if later he
@@ -617,6 +668,19 @@ class AcademyTestAttempt(models.Model):
         fields = ['individual_id', 'active', 'closed']
         create_index(self.env, self._table, fields, unique=False)
 
+        sql = '''
+            CREATE TABLE IF NOT EXISTS {table} (
+                "id" BIGSERIAL PRIMARY KEY,
+                kind VARCHAR NOT NULL,
+                res_id INTEGER NOT NULL,
+                create_date TIMESTAMP DEFAULT ( NOW() AT TIME ZONE 'UTC' )
+            );
+
+            ALTER TABLE {table}
+                ADD COLUMN IF NOT EXISTS retries INTEGER NOT NULL DEFAULT 0;
+        '''
+        self.env.cr.execute(sql.format(table=PENDING_UPDATE_TABLE))
+
     # -------------------------------------------------------------------------
     # CRUD Methods and Their Helpers
     # -------------------------------------------------------------------------
@@ -644,18 +708,39 @@ class AcademyTestAttempt(models.Model):
         # Prevent manually closed
         self._raise_if_closed_set(values)
 
+        statistics_obj = self.env[STATISTICS_MODEL]
+        refresh = not self._ctx_disable_update('statistics') and \
+            any(key in values for key in STATISTICS_SCOPE_FIELDS)
+
+        if refresh:
+            scope = statistics_obj.get_scope_by_attempts(self.ids)
+
         parent = super(AcademyTestAttempt, self)
         result = parent.write(values)
 
+        if refresh:
+            statistics_obj.refresh_scope(
+                scope, statistics_obj.get_scope_by_attempts(self.ids))
+
         return result
 
     def unlink(self):
-        """ Overridden method 'unlink'
+        """ Overridden method 'unlink'. Statistics scope is taken before the
+        attempts are removed and refreshed after it.
         """
 
+        statistics_obj = self.env[STATISTICS_MODEL]
+        refresh = not self._ctx_disable_update('statistics')
+
+        if refresh:
+            scope = statistics_obj.get_scope_by_attempts(self.ids)
+
         parent = super(AcademyTestAttempt, self)
         result = parent.unlink()
 
+        if refresh:
+            statistics_obj.refresh_scope(scope)
+
         return result
 
     @api.model
@@ -788,37 +873,59 @@ class AcademyTestAttempt(models.Model):
 
         _logger.debug(f'Calculating values for test attempt ID {self.id}')
 
-        values = {}
+        counts = {}
 
         link_path = 'individual_id.assignment_id.test_id.question_ids'
         answer_set = self.attempt_final_answer_ids
 
-        values['question_count'] = len(self.mapped(link_path))
-        values['answered_count'] = len(answer_set.filtered(
+        counts['question_count'] = len(self.mapped(link_path))
+        counts['answered_count'] = len(answer_set.filtered(
             lambda r: r.user_action != 'blank'
         ))
-        values['doubt_count'] = len(answer_set.filtered(
+        counts['doubt_count'] = len(answer_set.filtered(
             lambda r: r.user_action == 'doubt'
         ))
 
-        values['answer_count'] = len(answer_set.filtered(
+        counts['answer_count'] = len(answer_set.filtered(
             lambda r: r.user_action == 'answer'
         ))
 
-        values['right_count'] = len(answer_set.filtered(
+        counts['right_count'] = len(answer_set.filtered(
             lambda r: r.is_correct
         ))
-        values['wrong_count'] = len(answer_set.filtered(
+        counts['wrong_count'] = len(answer_set.filtered(
             lambda r: not r.is_correct and r.user_action != 'blank'
         ))
+
+        return self._compute_score_values(
+            counts, self.right, self.wrong, self.blank)
+
+    @api.model
+    def _compute_score_values(self, counts, right, wrong, blank):
+        """ Computes points, percents, scores and grade from the number of
+        questions and final answers of an attempt.
+
+        Args:
+            counts (dict): question_count, answered_count, doubt_count,
+            answer_count, right_count and wrong_count values
+            right (float): points awarded by right answer
+            wrong (float): points awarded by wrong answer
+            blank (float): points awarded by blank answer
+
+        Returns:
+            dict: values for all the fields in SCORE_FIELDS
+        """
+
+        values = dict(counts)
+
         values['blank_count'] = (
             values['question_count'] - values['answered_count']
         )
 
-        values['max_points'] = values['question_count'] * self.right
-        values['right_points'] = values['right_count'] * self.right
-        values['wrong_points'] = values['wrong_count'] * self.wrong
-        values['blank_points'] = values['blank_count'] * self.blank
+        values['max_points'] = values['question_count'] * right
+        values['right_points'] = values['right_count'] * right
+        values['wrong_points'] = values['wrong_count'] * wrong
+        values['blank_points'] = values['blank_count'] * blank
         values['final_points'] = (
             values['right_points']
             + values['wrong_points']
@@ -853,37 +960,91 @@ class AcademyTestAttempt(models.Model):
 
         return values
 
-    def _get_anwered_link_ids(self):
-        field_path = 'attempt_final_answer_ids.question_link_id'
-        return self.mapped(field_path)
+    def get_computed_values_batch(self):
+        """ Set-based version of ``get_computed_values``. Questions and final
+        answers for all the attempts in recordset are counted with a single
+        aggregate query and then the same formulas are applied.
 
-    def _get_tests_link_ids(self):
-        field_path = 'individual_id.assignment_id.test_id.question_ids'
-        return self.mapped(field_path)
+        Returns:
+            dict: computed values by attempt ID
+        """
 
-    def _update_values_with_missing_answers(self, values):
-        self.ensure_one()
+        result = {}
+
+        if not self.ids:
+            return result
+
+        self.flush()
+
+        self.env.cr.execute(ACADEMY_TESTS_ATTEMPT_SCORE_COUNTS, (self.ids,))
+
+        for row in self.env.cr.dictfetchall():
+            attempt_id = row.pop('attempt_id')
+            right = float(row.pop('right') or 0.0)
+            wrong = float(row.pop('wrong') or 0.0)
+            blank = float(row.pop('blank') or 0.0)
+
+            result[attempt_id] = self._compute_score_values(
+                row, right, wrong, blank)
+
+        return result
+
+    def _write_computed_values(self, computed):
+        """ Writes the computed scoring values for all the attempts in
+        recordset using a single UPDATE statement. Values are converted as
+        the ORM does it, so the stored result is the same as ``write``.
+
+        Args:
+            computed (dict): values by attempt ID, as returned by
+            ``get_computed_values_batch``
+        """
+
+        target_set = self.filtered(lambda r: r.id in computed)
+        if not target_set:
+            return
+
+        columns = {name: [] for name in SCORE_FIELDS}
+        for record in target_set:
+            values = computed[record.id]
+            for name in SCORE_FIELDS:
+                field = self._fields[name]
+                value = field.convert_to_column(values[name], record)
+                columns[name].append(value)
+
+        assignments = ', '.join(
+            f'"{name}" = src."{name}"' for name in SCORE_FIELDS)
+        arrays = ', '.join(
+            f'%s :: {self._fields[name].column_type[1]} []'
+            for name in SCORE_FIELDS)
+        names = ', '.join(f'"{name}"' for name in SCORE_FIELDS)
+
+        sql = f'''
+            UPDATE academy_tests_attempt AS att
+            SET {assignments},
+                write_uid = %s,
+                write_date = ( NOW ( ) AT TIME ZONE 'UTC' )
+            FROM
+                UNNEST ( %s :: INTEGER [], {arrays} ) AS src ( "id", {names} )
+            WHERE
+                att."id" = src."id"
+        '''
 
-        attempt_answer_o2m_ops = []
+        params = [self.env.uid, target_set.ids]
+        params.extend(columns[name] for name in SCORE_FIELDS)
 
-        answered_set = self._get_anwered_link_ids()
-        test_set = self._get_tests_link_ids()
-        left_set = test_set - answered_set
+        self.env.cr.execute(sql, params)
+        target_set.invalidate_cache(fnames=SCORE_FIELDS)
 
-        for link_item in (left_set):
-            o2m_op = (0, 0, {
-                'active': True,
-                'user_action': 'blank',
-                'attempt_id': self.id,
-                'question_link_id': link_item.id,
-                'answer_id': None,
-                'prevalence': 1
-            })
+    def _create_missing_answers(self):
+        """ Stores a blank answer for each question has not been answered in
+        the given attempts, all of them are inserted at once.
+        """
 
-            attempt_answer_o2m_ops.append(o2m_op)
+        if not self:
+            return
 
-        if attempt_answer_o2m_ops:
-            values['attempt_answer_ids'] = attempt_answer_o2m_ops
+        self._insert_answers(
+            dict.fromkeys(ANSWER_SHEET_COLUMNS, []), blank_ids=self.ids)
 
     def _update_time_values(self, values):
         self.ensure_one()
@@ -951,36 +1112,48 @@ class AcademyTestAttempt(models.Model):
             target_set = target_set._filter_closed_records(warning=True)
 
         # Update related answer prevalence
-        attempt_answer_set = target_set.mapped('attempt_answer_ids')
-        attempt_answer_set.update_prevalence()
+        attempt_answer_obj = self.env['academy.tests.attempt.answer']
+        attempt_answer_obj.update_prevalence_by_attempt(target_set.ids)
 
-        for record in target_set:
-            values = record.get_computed_values()
+        closing_set = target_set.filtered(lambda r: close and not r.closed)
+        closing_set._create_missing_answers()
 
-            if close and not record.closed:
+        for batch_ids in split_every(SCORE_BATCH_SIZE, target_set.ids):
+            batch_set = target_set.browse(batch_ids)
+            computed = batch_set.get_computed_values_batch()
+
+            for record in batch_set & closing_set:
+                values = computed.pop(record.id)
                 values['closed'] = True
 
                 record._update_time_values(values)
-                record._update_values_with_missing_answers(values)
                 record._log_closing()
 
-            record.write(values)
+                record.write(values)
+
+            batch_set._write_computed_values(computed)
 
         # See: It will be used self insted self_ctx to get global context
+        pending = dict.fromkeys(PENDING_UPDATE_KINDS, [])
+
         if not self._ctx_disable_update('prevalence'):
-            self.update_prevalence()
+            pending['prevalence'] = self._get_individual_ids()
 
-        # See: It will be used self insted self_ctx to get global context
         if not self._ctx_disable_update('rank'):
-            self.update_rank()
+            pending['rank'] = self._get_assignment_ids()
+
+        if not self._ctx_disable_update('statistics'):
+            pending['statistics'] = target_set.ids
 
-        # See: It will be used self insted self_ctx to get global context
         if not self._ctx_disable_update('attempt'):
-            individual_set = self.mapped('individual_id')
-            individual_set.fast_update_attempt_data()
+            pending['individual'] = self.mapped('individual_id').ids
+            pending['assignment'] = \
+                self.mapped('individual_id.assignment_id').ids
 
-            assignment_set = self.mapped('individual_id.assignment_id')
-            assignment_set.fast_update_attempt_data()
+        if self._is_update_deferred():
+            self._enqueue_updates(pending)
+        else:
+            self._apply_updates(pending)
 
     def recalculate_all(self, close=False):
         domain = TRUE_DOMAIN if close else [('closed', '=', True)]
@@ -1000,6 +1173,145 @@ class AcademyTestAttempt(models.Model):
 
         self.recalculate(close=True)
 
+    # -------------------------------------------------------------------------
+    # Answer sheets
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def submit_answer_sheets(self, sheets, close=True):
+        """ Stores the answers of several attempts at once. Entries are
+        validated against the tests using a single query and all of them are
+        inserted with a single statement, bypassing the ORM.
+
+        Args:
+            sheets (dict): answer sheet by attempt ID, each sheet is a list of
+            ``[question_link_id, answer_id]`` or ``[question_link_id,
+            answer_id, user_action]`` entries. Answer must be ``False`` for
+            blanks and ``user_action`` defaults to ``answer``.
+            close (bool): if True, questions left unanswered will be stored
+            as blanks and the attempts will be closed
+
+        Returns:
+            Model: recordset with the given attempts
+        """
+
+        attempt_ids, columns = self._parse_answer_sheets(sheets)
+
+        attempt_set = self.browse(attempt_ids)
+        attempt_set._check_answer_sheets(columns)
+
+        blank_ids = attempt_set.ids if close else []
+        if blank_ids:
+            attempt_answer_obj = self.env[ATTEMPT_ANSWER_MODEL]
+            attempt_answer_obj.update_prevalence_by_attempt(blank_ids)
+
+        attempt_set._insert_answers(columns, blank_ids=blank_ids)
+
+        if close:
+            attempt_set.close()
+        else:
+            attempt_answer_obj = self.env[ATTEMPT_ANSWER_MODEL]
+            attempt_answer_obj.update_prevalence_by_attempt(attempt_set.ids)
+
+        return attempt_set
+
+    @api.model
+    def _parse_answer_sheets(self, sheets):
+        """ Validates the answer sheets and splits them in columns
+
+        Returns:
+            tuple: list of attempt IDs, including those with empty sheets,
+            and the columns dictionary
+        """
+
+        columns = {name: [] for name in ANSWER_SHEET_COLUMNS}
+        actions = [item[0] for item in USER_ACTIONS]
+        attempt_ids, answered = [], {}
+
+        for attempt_key, sheet in (sheets or {}).items():
+            try:
+                attempt_id = int(attempt_key)
+            except (TypeError, ValueError):
+                message = _('Invalid attempt ID: %s') % (attempt_key,)
+                raise ValidationError(message)
+
+            if attempt_id not in answered:
+                attempt_ids.append(attempt_id)
+
+            link_ids = answered.setdefault(attempt_id, set())
+
+            for entry in sheet or []:
+                try:
+                    link_id, answer_id = int(entry[0]), entry[1] or None
+                    answer_id = answer_id and int(answer_id)
+                    user_action = entry[2] if len(entry) > 2 else None
+                except (TypeError, ValueError, IndexError):
+                    message = _('Invalid answer sheet entry: %s') % (entry,)
+                    raise ValidationError(message)
+
+                user_action = user_action or ('answer' if answer_id else
+                                              'blank')
+
+                if user_action not in actions or \
+                   bool(answer_id) == (user_action == 'blank'):
+                    message = _('Invalid answer sheet entry: %s') % (entry,)
+                    raise ValidationError(message)
+
+                if link_id in link_ids:
+                    message = _('Question link %s has been answered twice '
+                                'in attempt %s') % (link_id, attempt_id)
+                    raise ValidationError(message)
+
+                link_ids.add(link_id)
+
+                columns['attempt_ids'].append(attempt_id)
+                columns['link_ids'].append(link_id)
+                columns['answer_ids'].append(answer_id)
+                columns['user_actions'].append(user_action)
+
+        return attempt_ids, columns
+
+    def _check_answer_sheets(self, columns):
+        """ Ensures the user can write the attempts, they are still opened and
+        all the entries belong to their tests
+        """
+
+        missing_set = self - self.exists()
+        if missing_set:
+            message = _('Attempts %s do not exist') % missing_set.ids
+            raise ValidationError(message)
+
+        self.check_access_rights('write')
+        self.check_access_rule('write')
+        self.env[ATTEMPT_ANSWER_MODEL].check_access_rights('create')
+
+        closed_set = self.filtered(lambda r: r.closed)
+        if closed_set:
+            message = _('Attempts %s have already been closed')
+            raise UserError(message % closed_set.ids)
+
+        if columns['attempt_ids']:
+            self.flush()
+            self.env.cr.execute(ACADEMY_TESTS_ATTEMPT_SHEET_CHECK, columns)
+
+            invalid = self.env.cr.fetchall()
+            if invalid:
+                message = _('The following answers do not belong to the test '
+                            'of their attempt: %s')
+                raise ValidationError(message % invalid)
+
+    def _insert_answers(self, columns, blank_ids=None):
+        params = dict(columns, uid=self.env.uid)
+        params['blank_attempt_ids'] = list(blank_ids or [])
+
+        if params['attempt_ids'] or params['blank_attempt_ids']:
+            self.env[ATTEMPT_ANSWER_MODEL].flush()
+            self.env.cr.execute(ACADEMY_TESTS_ATTEMPT_INSERT_ANSWERS, params)
+
+            self.env[ATTEMPT_ANSWER_MODEL].invalidate_cache()
+            self.invalidate_cache(
+                ['attempt_answer_ids', 'attempt_final_answer_ids'])
+
     # -------------------------------------------------------------------------
     # Update prevalence
     # -------------------------------------------------------------------------
@@ -1008,7 +1320,7 @@ class AcademyTestAttempt(models.Model):
         return self.mapped('individual_id').ids
 
     def update_prevalence(self, individual_ids=False):
-        sql_pattern = '''
+        sql = '''
             WITH attempt_prevalence AS (
                 SELECT
                     "id",
@@ -1024,34 +1336,34 @@ class AcademyTestAttempt(models.Model):
                 FROM
                     academy_tests_attempt
                 WHERE
-                    individual_id in ({ids})
+                    individual_id = ANY ( %s )
             )
             UPDATE academy_tests_attempt AS att
                 SET prevalence = ap."prevalence"
             FROM
                 attempt_prevalence AS ap
             WHERE
-                ap."id" = att."id";
+                ap."id" = att."id"
+                AND att.prevalence IS DISTINCT FROM ap."prevalence";
         '''
 
         if individual_ids is False:
             individual_ids = self._get_individual_ids()
 
         if individual_ids:
-            ids_str = ', '.join([str(item_id) for item_id in individual_ids])
-            sql = sql_pattern.format(ids=ids_str)
-
-            self._execute_query(sql, action='update_prevalence')
+            params = (list(individual_ids),)
+            self._execute_query(sql, params, action='update_prevalence')
 
     @api.model
-    def _execute_query(self, sql, selection=False, notify=False, action=None):
+    def _execute_query(self, sql, params=None, selection=False, notify=False,
+                       action=None):
         results = []
         action = action or 'SQL'
 
         for attempt in range(MAX_RETRIES):
             try:
                 cursor = self.env.cr
-                cursor.execute(sql)
+                cursor.execute(sql, params)
 
                 if selection:
                     results = cursor.dictfetchall()
@@ -1091,7 +1403,7 @@ class AcademyTestAttempt(models.Model):
         return self.mapped('assignment_id').ids
 
     def update_rank(self, assignment_ids=False):
-        sql_pattern = '''
+        sql = '''
             WITH attempt_rank AS (
                 SELECT
                     "id",
@@ -1107,24 +1419,248 @@ class AcademyTestAttempt(models.Model):
                 FROM
                     academy_tests_attempt
                 WHERE
-                    assignment_id in ({ids})
+                    assignment_id = ANY ( %s )
             )
             UPDATE academy_tests_attempt AS att
                 SET rank = ap.rank
             FROM
                 attempt_rank AS ap
             WHERE
-                ap."id" = att."id";
+                ap."id" = att."id"
+                AND att.rank IS DISTINCT FROM ap.rank;
         '''
 
         if assignment_ids is False:
             assignment_ids = self._get_assignment_ids()
 
         if assignment_ids:
-            ids_str = ', '.join([str(item_id) for item_id in assignment_ids])
-            sql = sql_pattern.format(ids=ids_str)
+            params = (list(assignment_ids),)
+            self._execute_query(sql, params, action='update_rank')
+
+    # -------------------------------------------------------------------------
+    # Deferred side effects
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _is_update_deferred(self):
+        """ Prevalence, rank, statistics and attempt data updates are queued
+        and applied by a scheduled action unless it has been disabled in
+        settings or ``attempt_update_now`` is in context, this last one allows
+        callers to read their own writes.
+
+        Tests run in a cursor which is never committed, so they are never
+        deferred there.
+        """
+
+        if self.env.context.get('attempt_update_now', False):
+            return False
+
+        if getattr(current_thread(), 'testing', False):
+            return False
+
+        config_obj = self.env['ir.config_parameter'].sudo()
+        param_name = 'academy_tests.defer_attempt_ranking'
+        deferred = config_obj.get_param(param_name, default='True')
+
+        return deferred not in ('False', 'false', '0', '')
+
+    @api.model
+    def _enqueue_updates(self, pending):
+        """ Appends the given side effects to the durable queue
+
+        Args:
+            pending (dict): list of IDs by kind of side effect
+        """
+
+        kinds, res_ids = [], []
+        for kind in PENDING_UPDATE_KINDS:
+            for res_id in set(pending.get(kind) or []):
+                kinds.append(kind)
+                res_ids.append(res_id)
+
+        if not res_ids:
+            return
+
+        sql = '''
+            INSERT INTO {table} ( kind, res_id )
+            SELECT * FROM UNNEST ( %s::VARCHAR[], %s::INTEGER[] )
+        '''.format(table=PENDING_UPDATE_TABLE)
+
+        self.env.cr.execute(sql, (kinds, res_ids))
+
+    @api.model
+    def _apply_updates(self, pending):
+        """ Applies the given side effects
+
+        Args:
+            pending (dict): list of IDs by kind of side effect
+        """
+
+        individual_obj = self.env[INDIVIDUAL_MODEL]
+        assignment_obj = self.env[ASSIGNMENT_MODEL]
+        statistics_obj = self.env[STATISTICS_MODEL]
+
+        self.update_prevalence(list(pending.get('prevalence') or []))
+        self.update_rank(list(pending.get('rank') or []))
+
+        statistics_obj.refresh_by_attempts(pending.get('statistics') or [])
+
+        individual_ids = list(pending.get('individual') or [])
+        individual_obj.browse(individual_ids).exists() \
+            .fast_update_attempt_data()
+
+        assignment_ids = list(pending.get('assignment') or [])
+        assignment_obj.browse(assignment_ids).exists() \
+            .fast_update_attempt_data()
+
+    @api.model
+    def _claim_pending_updates(self, limit=PENDING_UPDATE_BATCH, max_id=None):
+        """ Removes a batch of entries from the queue, entries locked by other
+        workers, entries newer than ``max_id`` and entries which failed too
+        many times are skipped. Duplicated entries are coalesced.
+
+        Returns:
+            dict: number of previous failures by each (kind, res_id) pair
+        """
+
+        sql = '''
+            DELETE FROM {table}
+            WHERE "id" IN (
+                SELECT "id"
+                FROM {table}
+                WHERE
+                    retries < %(max_retries)s
+                    AND (
+                        %(max_id)s::BIGINT IS NULL
+                        OR "id" <= %(max_id)s::BIGINT
+                    )
+                ORDER BY "id" ASC
+                LIMIT %(limit)s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING kind, res_id, retries
+        '''.format(table=PENDING_UPDATE_TABLE)
+
+        params = {
+            'max_retries': PENDING_UPDATE_MAX_RETRIES,
+            'max_id': max_id,
+            'limit': limit
+        }
+        self.env.cr.execute(sql, params)
+
+        entries = {}
+        for kind, res_id, retries in self.env.cr.fetchall():
+            key = (kind, res_id)
+            entries[key] = max(entries.get(key, 0), retries)
+
+        return entries
+
+    @staticmethod
+    def _coalesce_updates(entries):
+        """ Groups the claimed entries by kind of side effect
+
+        Returns:
+            dict: set of IDs by kind of side effect
+        """
+
+        pending = {}
+        for kind, res_id in entries:
+            pending.setdefault(kind, set()).add(res_id)
+
+        return pending
+
+    @api.model
+    def _apply_updates_safely(self, pending):
+        """ Applies the side effects inside a savepoint, a failure only rolls
+        back these side effects
+
+        Returns:
+            bool: True if the side effects have been applied
+        """
+
+        try:
+            with self.env.cr.savepoint():
+                self._apply_updates(pending)
+                self.flush()
+        except Exception:
+            counts = {key: len(value) for key, value in pending.items()}
+            _logger.exception('Queued attempt updates failed: %s', counts)
+            self.env.cache.invalidate()
+            return False
+
+        return True
+
+    @api.model
+    def _requeue_failed_updates(self, failed):
+        """ Appends again the failed entries increasing their retries
+
+        Args:
+            failed (dict): number of previous failures by (kind, res_id)
+        """
+
+        kinds, res_ids, retries = [], [], []
+        for (kind, res_id), count in failed.items():
+            kinds.append(kind)
+            res_ids.append(res_id)
+            retries.append(count + 1)
+
+            if count + 1 >= PENDING_UPDATE_MAX_RETRIES:
+                _logger.error('Queued attempt update %s for %s failed %s '
+                              'times, it will not be retried',
+                              kind, res_id, count + 1)
+
+        if not kinds:
+            return
+
+        sql = '''
+            INSERT INTO {table} ( kind, res_id, retries )
+            SELECT * FROM UNNEST (
+                %s::VARCHAR[], %s::INTEGER[], %s::INTEGER[]
+            )
+        '''.format(table=PENDING_UPDATE_TABLE)
+
+        self.env.cr.execute(sql, (kinds, res_ids, retries))
+
+    @api.model
+    def process_pending_updates(self, limit=PENDING_UPDATE_BATCH):
+        """ Scheduled action, drains the queue applying the side effects in
+        coalesced batches. Each batch is committed on its own.
+
+        When a batch fails its entries are applied one by one, the failing
+        ones are queued again with one more retry. Only the entries existing
+        when the action starts are claimed, so failed entries wait for the
+        next run.
+        """
+
+        testing = getattr(current_thread(), 'testing', False)
+
+        sql = 'SELECT MAX("id") FROM {table}'
+        self.env.cr.execute(sql.format(table=PENDING_UPDATE_TABLE))
+        max_id = self.env.cr.fetchone()[0]
+
+        while max_id:
+            entries = self._claim_pending_updates(limit, max_id)
+            if not entries:
+                break
+
+            pending = self._coalesce_updates(entries)
+
+            counts = {key: len(value) for key, value in pending.items()}
+            _logger.debug('Applying queued attempt updates: %s', counts)
+
+            if not self._apply_updates_safely(pending):
+                failed = {}
+                for key, count in entries.items():
+                    single = self._coalesce_updates([key])
+                    if not self._apply_updates_safely(single):
+                        failed[key] = count
+
+                self._requeue_failed_updates(failed)
+
+            if testing:
+                break
 
-            self._execute_query(sql, action='update_rank')
+            self.env.cr.commit()
 
     # -------------------------------------------------------------------------
     # Actions and Events
@@ -358,3 +358,47 @@ class AcademyTestAttemptAnswer(models.Model):
 
             cursor = self.env.cr
             cursor.execute(sql)
+
+    @api.model
+    def update_prevalence_by_attempt(self, attempt_ids):
+        """ Set-based version of ``update_prevalence`` which updates all the
+        answers of the given attempts without building attempt/link pairs.
+
+        Args:
+            attempt_ids (list): IDs of the attempts whose answers will be
+            updated
+        """
+
+        sql = '''
+            WITH answer_prevalence AS (
+                SELECT
+                    ans."id",
+                    ROW_NUMBER ( ) OVER ( wnd ) AS prevalence
+                FROM
+                    academy_tests_attempt_answer AS ans
+                WHERE
+                    ans.attempt_id = ANY ( %s )
+                WINDOW wnd AS (
+                        PARTITION BY ans.attempt_id,
+                        ans.question_link_id
+                    ORDER BY
+                        ans.attempt_id,
+                        ans.question_link_id,
+                        ans.active DESC NULLS LAST,
+                        ans.instant DESC,
+                        ans.create_date DESC
+                )
+            )
+            UPDATE academy_tests_attempt_answer AS ans
+            SET prevalence = ap.prevalence
+            FROM
+                answer_prevalence AS ap
+            WHERE
+                ans."id" = ap."id"
+                AND ans.prevalence IS DISTINCT FROM ap.prevalence;
+        '''
+
+        if attempt_ids:
+            self.flush()
+            self.env.cr.execute(sql, (list(attempt_ids),))
+            self.invalidate_cache(fnames=['prevalence'])
@@ -325,6 +325,50 @@ class AcademyTestsCategory(models.Model):
         )
     ]
 
+    # --------------------------- OVERLOADED METHODS --------------------------
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """ Clear cached keyword matchers, see topic _get_keyword_matcher
+        """
+
+        result = super(AcademyTestsCategory, self).create(vals_list)
+
+        if any(values.get('keywords') for values in vals_list):
+            self.clear_caches()
+
+        if any(values.get('question_ids') for values in vals_list):
+            self.env['academy.tests.question'].bump_bank_generation()
+
+        return result
+
+    def write(self, values):
+        """ Clear cached keyword matchers, see topic _get_keyword_matcher.
+        Questions can be categorized from here, random line candidate pools
+        must be discarded then.
+        """
+
+        result = super(AcademyTestsCategory, self).write(values)
+
+        if {'keywords', 'topic_id', 'active'} & values.keys():
+            self.clear_caches()
+
+        if {'question_ids', 'topic_id', 'active'} & values.keys():
+            self.env['academy.tests.question'].bump_bank_generation()
+
+        return result
+
+    def unlink(self):
+        """ Clear cached keyword matchers, see topic _get_keyword_matcher
+        """
+
+        result = super(AcademyTestsCategory, self).unlink()
+
+        self.clear_caches()
+        self.env['academy.tests.question'].bump_bank_generation()
+
+        return result
+
     # -------------------------- PYTHON_CONTRAINTS ----------------------------
 
     @api.constrains('keywords')
@@ -9,6 +9,9 @@ from odoo import models, fields, api
 from odoo.tools.translate import _
 from odoo.exceptions import ValidationError, UserError
 from odoo.osv.expression import FALSE_DOMAIN
+from odoo.tools import split_every
+from odoo.tools.lru import LRU
+from odoo.addons.academy_base.utils.sql_helpers import execute_sql_script
 
 from logging import getLogger
 from os import linesep
@@ -17,11 +20,12 @@ from enum import Enum
 
 import lxml.etree as ET
 import mimetypes
-from io import BytesIO
 
 from .utils.libuseful import prepare_text, fix_established, is_numeric
+from .utils.libuseful import ChunkBuffer
 
 from .utils.sql_operations import ACADEMY_QUESTION_ENSURE_CHECKSUMS
+from .utils.sql_operations import ACADEMY_QUESTION_CHAIN_DEPENDENCIES
 from .utils.sql_operations import FIND_MOST_USED_QUESTION_FIELD_VALUE_FOR_SQL
 from .utils.sql_operations import FIND_MOST_USED_QUESTION_CATEGORY_VALUE_SQL
 
@@ -31,6 +35,84 @@ from .utils.sql_inverse_searches import UNCATEGORIZED_QUESTION_SEARCH
 _logger = getLogger(__name__)
 
 
+# Database sequence used as question bank generation counter. It changes each
+# time a question, an answer or a test link is created, updated or removed.
+BANK_GENERATION_SEQUENCE = 'academy_tests_question_bank_generation_seq'
+
+# Near-duplicate index, it must be updated when these fields change
+NEAR_DUPLICATE_MODEL = 'academy.tests.question.near.duplicate.rel'
+NEAR_DUPLICATE_FIELDS = {'name', 'preamble'}
+
+# Rendered questions by database, language, format, question and stamp. The
+# stamp changes when the question, its answers or its attachments change.
+RENDER_CACHE = LRU(8192)
+HTML_TEMPLATE_XID = \
+    'academy_tests.view_academy_tests_display_question_as_html'
+
+# Last change of each question, including all its answers, even the archived
+# ones, and its attachments. Write dates do not change inside a transaction,
+# so the checksum, the active answers and the attachment names are added.
+RENDER_STAMP_SQL = '''
+    SELECT
+        atq."id",
+        atq.checksum,
+        GREATEST (
+            atq.write_date,
+            (
+                SELECT
+                    MAX ( ans.write_date )
+                FROM
+                    academy_tests_answer AS ans
+                WHERE
+                    ans.question_id = atq."id"
+            ),
+            (
+                SELECT
+                    MAX ( att.write_date )
+                FROM
+                    academy_tests_question_ir_attachment_rel AS rel
+                INNER JOIN ir_attachment AS att
+                    ON att."id" = rel.attachment_id
+                WHERE
+                    rel.question_id = atq."id"
+            )
+        ) AS updated,
+        ARRAY (
+            SELECT
+                ans."id"
+            FROM
+                academy_tests_answer AS ans
+            WHERE
+                ans.question_id = atq."id"
+                AND ans.active IS TRUE
+            ORDER BY
+                ans."id"
+        ) AS answer_ids,
+        ARRAY (
+            SELECT
+                att."id" || ':' || COALESCE ( att."name", '' )
+            FROM
+                academy_tests_question_ir_attachment_rel AS rel
+            INNER JOIN ir_attachment AS att
+                ON att."id" = rel.attachment_id
+            WHERE
+                rel.question_id = atq."id"
+            ORDER BY
+                att."id"
+        ) AS attachments
+    FROM
+        academy_tests_question AS atq
+    WHERE
+        atq."id" = ANY ( %s )
+'''
+
+# Number of questions will be read by each export batch
+EXPORT_BATCH_SIZE = 500
+
+# Number of questions will be verified by each checksum repair statement
+CHECKSUM_BATCH_SIZE = 5000
+
+
 class Mi(Enum):
     """ Enumerates regex group index un line processing
     """
@@ -259,6 +341,22 @@ class AcademyTestsQuestion(models.Model):
         limit=None,
     )
 
+    student_statistics_ids = fields.One2many(
+        string='Student statistics',
+        required=False,
+        readonly=True,
+        index=False,
+        default=None,
+        help='Answer statistics of each student for this question',
+        comodel_name='academy.statistics.student.question.readonly',
+        inverse_name='question_id',
+        domain=[],
+        context={},
+        auto_join=False,
+        limit=None,
+        copy=False
+    )
+
     impugnment_ids = fields.One2many(
         string='Impugnments',
         required=False,
@@ -374,6 +472,23 @@ class AcademyTestsQuestion(models.Model):
         copy=False
     )
 
+    near_duplicate_ids = fields.Many2manyView(
+        string='Near duplicates',
+        required=False,
+        readonly=True,
+        index=True,
+        default=None,
+        help='Questions whose text is almost the same',
+        comodel_name='academy.tests.question',
+        relation='academy_tests_question_near_duplicate_rel',
+        column1='question_id',
+        column2='duplicate_id',
+        domain=[],
+        context={},
+        limit=None,
+        copy=False
+    )
+
     # This field can have a maximum of one record. It's used in some domains
     # to check if question is not the original.
     original_ids = fields.Many2manyView(
@@ -798,11 +913,11 @@ class AcademyTestsQuestion(models.Model):
     def _check_answer_ids(self):
         """ Check if question have at last one valid answer
         """
-        if self.active:
-            if True not in self.answer_ids.mapped('is_correct'):
+        for record in self.filtered('active'):
+            if True not in record.answer_ids.mapped('is_correct'):
                 message = _(u'You must specify at least one correct answer')
                 raise ValidationError(message)
-            if False not in self.answer_ids.mapped('is_correct'):
+            if False not in record.answer_ids.mapped('is_correct'):
                 message = _(u'You must specify at least one incorrect answer')
                 raise ValidationError(message)
 
@@ -859,15 +974,66 @@ class AcademyTestsQuestion(models.Model):
 
         return result
 
+    def init(self):
+        """ Ensures the question bank generation counter exists and creates
+        the triggers which keep the checksums up to date
+        """
+
+        sql = 'CREATE SEQUENCE IF NOT EXISTS {}'
+        self.env.cr.execute(sql.format(BANK_GENERATION_SEQUENCE))
+
+        rel_path = ('academy_tests', 'data')
+        file_name = 'academy_tests_question_checksum.sql'
+        execute_sql_script(self.env.cr, rel_path, file_name, self._name)
+
     @api.model
-    def create(self, values):
+    def get_bank_generation(self):
+        """ Returns the current value of the question bank generation counter.
+        Caches built over questions must be discarded when it changes.
+        """
+
+        sql = 'SELECT last_value FROM {}'
+        self.env.cr.execute(sql.format(BANK_GENERATION_SEQUENCE))
+
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def bump_bank_generation(self):
+        """ Moves the question bank generation counter forward. Sequences are
+        not transactional, so it will be moved again after commit to discard
+        caches could have been built by other workers before the changes were
+        visible.
+        """
+
+        cr = self.env.cr
+        sql = 'SELECT nextval(\'{}\')'.format(BANK_GENERATION_SEQUENCE)
+
+        cr.execute(sql)
+
+        if not getattr(cr, '_bank_generation_pending', False):
+            def _after_commit():
+                cr._bank_generation_pending = False
+                cr.execute(sql)
+
+            def _after_rollback():
+                cr._bank_generation_pending = False
+
+            cr._bank_generation_pending = True
+            cr.after('commit', _after_commit)
+            cr.after('rollback', _after_rollback)
+
+    @api.model_create_multi
+    def create(self, values_list):
         """ Update attachment records
         """
 
         _super = super(AcademyTestsQuestion, self)
-        result = _super.create(values)
+        result = _super.create(values_list)
 
         result._update_ir_attachments()
+        self.bump_bank_generation()
+
+        self.env[NEAR_DUPLICATE_MODEL].update_index(result.ids)
 
         return result
 
@@ -885,12 +1051,26 @@ class AcademyTestsQuestion(models.Model):
             result = super(AcademyTestsQuestion, self).write(values)
 
         self._update_ir_attachments()
+        self.bump_bank_generation()
+
+        if NEAR_DUPLICATE_FIELDS & values.keys():
+            self.env[NEAR_DUPLICATE_MODEL].update_index(self.ids)
 
         if self._has_tracked_fields(values):
             self._notify_related_tests()
 
         return result
 
+    def unlink(self):
+        """ Question bank changes, random line caches must be discarded
+        """
+
+        result = super(AcademyTestsQuestion, self).unlink()
+
+        self.bump_bank_generation()
+
+        return result
+
     # ----------------------- MESSAGING METHODS ------------------------
 
     def _track_subtype(self, init_values):
@@ -1144,8 +1324,8 @@ class AcademyTestsQuestion(models.Model):
     @api.depends(
         'name', 'preamble', 'answer_ids', 'attachment_ids', 'description')
     def compute_markdown(self):
-        for record in self:
-            record.markdown = record.to_string(True).strip()
+        for record, text in zip(self, self._render_markdown_list(True)):
+            record.markdown = text.strip()
 
     html = fields.Html(
         string='Html',
@@ -1161,8 +1341,8 @@ class AcademyTestsQuestion(models.Model):
     @api.depends(
         'name', 'preamble', 'answer_ids', 'attachment_ids', 'description')
     def compute_html(self):
-        for record in self:
-            record.html = record.to_html()
+        for record, html in zip(self, self._render_html_list()):
+            record.html = html
 
     def _get_values_for_template(self):
         answers = []
@@ -1200,32 +1380,143 @@ class AcademyTestsQuestion(models.Model):
         else:
             return item.id
 
-    def to_html(self):
-        output = ''
+    def _prefetch_for_render(self):
+        """ Reads the answers and the attachments of all the questions at
+        once, otherwise they would be read question by question
+        """
 
-        template_xid = \
-            'academy_tests.view_academy_tests_display_question_as_html'
-        view_obj = self.env['ir.ui.view']
+        self.mapped('answer_ids').read(['name', 'is_correct'])
+        self.mapped('ir_attachment_ids').read(['name', 'index_content'])
+
+    def _get_render_stamps(self):
+        """ Stamps are read from database, pending changes are flushed
+        before, so they include the last write dates and the checksums
+        updated by the database triggers.
+
+        Returns:
+            dict: stamp by question ID, new records are not included
+        """
+
+        real_ids = [item.id for item in self if isinstance(item.id, int)]
+        if not real_ids:
+            return {}
+
+        self.env['academy.tests.answer'].flush()
+        self.env['ir.attachment'].flush(['name', 'write_date'])
+        self.flush()
+
+        self.env.cr.execute(RENDER_STAMP_SQL, (real_ids,))
+
+        return {
+            row[0]: (row[1], row[2], tuple(row[3]), tuple(row[4]))
+            for row in self.env.cr.fetchall()
+        }
+
+    def _render_with_cache(self, kind, renderer, extra=None):
+        """ Renders the questions which are not in the render cache in a
+        single call and stores them in the cache.
+
+        Args:
+            kind (str): output format, it is part of the cache key
+            renderer (callable): receives a recordset and returns the list
+            of texts, one by question, in the same order
+            extra (callable): optional, receives a question and returns the
+            values, other than the stamp, which change the output
+
+        Returns:
+            list: one text by question in the recordset order
+        """
+
+        stamps = self._get_render_stamps()
+        dbname, lang = self.env.cr.dbname, self.env.lang
+
+        keys, texts = [], []
+        pending_set = self.browse()
 
         for record in self:
+            key = None
 
-            values = record._get_values_for_template()
+            stamp = stamps.get(record.id)
+            if stamp:
+                key = (dbname, lang, kind, record.id) + stamp
+                if extra:
+                    key += (extra(record),)
 
-            html = view_obj.render_template(template_xid, values)
-            output += html.decode('utf8')
+            text = RENDER_CACHE.get(key) if key else None
+            if text is None:
+                pending_set |= record
 
-        return output
+            keys.append(key)
+            texts.append(text)
 
-    def to_string(self, editable=False):
-        """ Export question contents as markdown text
+        if pending_set:
+            rendered = dict(zip(pending_set, renderer(pending_set)))
 
-        @param editable (bool): if it set to true IDs will be preserved,
-        otherwise index or URLs will be used instead
+            for position, record in enumerate(self):
+                if texts[position] is None:
+                    texts[position] = rendered[record]
+                    if keys[position]:
+                        RENDER_CACHE[keys[position]] = texts[position]
 
-        @return (str): returns a single text string it contains the
-        contents of the all questions in the recordset
+        return texts
+
+    @api.model
+    def _render_html_values(self, values_list):
+        """ Renders the given question values one by one. The template is
+        compiled once and the rendering context is also prepared once.
+
+        Args:
+            values_list (list): values returned by _get_values_for_template
+
+        Returns:
+            list: one HTML string by item in the given list
         """
-        output = ''
+
+        if not values_list:
+            return []
+
+        view_obj = self.env['ir.ui.view']
+        view = view_obj.browse(view_obj.get_view_id(HTML_TEMPLATE_XID))
+        qcontext = view._prepare_qcontext()
+        qweb = self.env['ir.qweb']
+
+        result = []
+        for values in values_list:
+            html = qweb.render(view.id, dict(qcontext, **values))
+            result.append(html.decode('utf8'))
+
+        return result
+
+    def _render_html_list(self):
+        def renderer(question_set):
+            question_set._prefetch_for_render()
+            values_list = [
+                record._get_values_for_template() for record in question_set
+            ]
+            return self._render_html_values(values_list)
+
+        return self._render_with_cache('html', renderer)
+
+    def to_html(self):
+        return ''.join(self._render_html_list())
+
+    def _render_markdown_list(self, editable=False):
+        """ Markdown text of each question. Non editable texts are numbered
+        by their position, so they can not be cached.
+        """
+
+        def renderer(question_set):
+            question_set._prefetch_for_render()
+            return question_set._render_markdown_parts(editable)
+
+        if not editable:
+            return renderer(self)
+
+        return self._render_with_cache(
+            'markdown', renderer, extra=lambda r: r.description or '')
+
+    def _render_markdown_parts(self, editable=False):
+        parts = []
         index = 0
 
         for record in self:
@@ -1264,9 +1555,21 @@ class AcademyTestsQuestion(models.Model):
             lines.append(linesep)
 
             # STEP 7: Store question lines in output buffer
-            output += linesep.join(lines)
+            parts.append(linesep.join(lines))
+
+        return parts
+
+    def to_string(self, editable=False):
+        """ Export question contents as markdown text
 
-        return output
+        @param editable (bool): if it set to true IDs will be preserved,
+        otherwise index or URLs will be used instead
+
+        @return (str): returns a single text string it contains the
+        contents of the all questions in the recordset
+        """
+
+        return ''.join(self._render_markdown_list(editable))
 
     @api.model
     def from_string(self, content, defaults={}, edit=False):
@@ -1294,14 +1597,59 @@ class AcademyTestsQuestion(models.Model):
                 record.status = 'draft'
 
     @api.model
-    def ensure_checksums(self):
-        """ This method uses an SQL query to UPDATE the checksum in all the
-        question records when this field has a null value.
+    def ensure_checksums(self, batch_size=CHECKSUM_BATCH_SIZE):
+        """ Verifies the checksum of all the questions and repairs the wrong
+        ones. Triggers keep checksums up to date, so this is only needed
+        after operations which skip them. Changes are committed after each
+        batch of questions.
+
+        Args:
+            batch_size (int): number of questions verified at once
+
+        Returns:
+            int: number of repaired checksums
         """
+
         sql = ACADEMY_QUESTION_ENSURE_CHECKSUMS
+        repaired = 0
 
-        self.env.cr.execute(sql)
-        self.env.cr.commit()
+        self.flush()
+
+        self.env.cr.execute('SELECT "id" FROM academy_tests_question')
+        question_ids = [row[0] for row in self.env.cr.fetchall()]
+
+        for batch_ids in split_every(batch_size, sorted(question_ids)):
+            self.env.cr.execute(sql, (list(batch_ids),))
+            repaired += self.env.cr.fetchone()[0] or 0
+            self.env.cr.commit()
+
+        self.invalidate_cache(['checksum'])
+
+        if repaired:
+            _logger.warning('%s question checksums have been repaired',
+                            repaired)
+
+        return repaired
+
+    def chain_dependencies(self):
+        """ Makes each question in the recordset depend on the previous one,
+        following the recordset order, using a single SQL UPDATE.
+
+        Only new questions should be chained this way, the circular
+        dependency constraint will not be checked.
+        """
+        if len(self) < 2:
+            return
+
+        self.flush(['depends_on_id'])
+
+        sql = ACADEMY_QUESTION_CHAIN_DEPENDENCIES
+        self.env.cr.execute(sql, (self.ids,))
+
+        fnames = ['depends_on_id', 'depends_on_ids', 'dependent_ids',
+                  'dependency_count', 'dependent_count']
+        self.invalidate_cache(fnames)
+        self.bump_bank_generation()
 
     def impugn(self):
         self.ensure_one()
@@ -1425,18 +1773,68 @@ class AcademyTestsQuestion(models.Model):
 
     def to_moodle(self, encoding='utf8', prettify=True, xml_declaration=True,
                   category=None, correction_scale=None):
+        chunks = self.moodle_stream(
+            encoding=encoding, prettify=prettify,
+            xml_declaration=xml_declaration, category=category,
+            correction_scale=correction_scale)
+
+        return b''.join(chunks)
+
+    def moodle_stream(self, encoding='utf8', prettify=True,
+                      xml_declaration=True, category=None,
+                      correction_scale=None, names=None,
+                      batch_size=EXPORT_BATCH_SIZE):
+        """ Writes the questions as Moodle XML, one node at a time, yielding
+        the document in chunks. Questions are read in batches and the cache
+        is cleared after each one of them, so memory does not grow with
+        the number of questions.
+
+        Args:
+            names (list): optional question names, one by question
+            batch_size (int): number of questions read at once
+
+        Yields:
+            bytes: next chunk of the document
+        """
+
+        buffer = ChunkBuffer()
         quiz = self._moodle_create_quiz(category=category)
+        question_ids = list(self._ids)
 
-        for record in self:
-            node = record._to_moodle(correction_scale=correction_scale)
-            quiz.append(node)
+        with ET.xmlfile(buffer, encoding=encoding) as xf:
+            if xml_declaration:
+                xf.write_declaration()
+
+            with xf.element('quiz'):
+                for node in quiz:
+                    xf.write(node, pretty_print=prettify)
+
+                for start in range(0, len(question_ids), batch_size):
+                    stop = start + batch_size
+                    batch_set = self.browse(question_ids[start:stop])
+                    batch_set._prefetch_for_export()
+
+                    for position, record in enumerate(batch_set, start):
+                        name = names[position] if names else None
+                        node = record._to_moodle(
+                            name=name, correction_scale=correction_scale)
+                        xf.write(node, pretty_print=prettify)
 
-        file = BytesIO()
-        root = quiz.getroottree()
-        root.write(file, encoding=encoding, pretty_print=prettify,
-                   xml_declaration=xml_declaration)
+                    xf.flush()
+                    yield buffer.pop()
+
+                    batch_set.invalidate_cache()
+
+        yield buffer.pop()
+
+    def _prefetch_for_export(self):
+        """ Reads the answers and the attachment metadata of all the
+        questions at once, attachment contents are read one by one
+        """
 
-        return file.getvalue()
+        self.mapped('answer_ids').read(
+            ['name', 'description', 'is_correct', 'sequence'])
+        self.mapped('ir_attachment_ids').read(['name', 'mimetype'])
 
     @staticmethod
     def _moodle_create_quiz(category=None):
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+from odoo import models, fields, api
+from odoo.tools import drop_view_if_exists, split_every
+
+from .utils.minhash import shingles, signature, buckets
+from .utils.minhash import MINHASH_PERMUTATIONS, MINHASH_BANDS
+
+from logging import getLogger
+from math import ceil
+from time import perf_counter
+
+
+_logger = getLogger(__name__)
+
+
+# Locality-sensitive index, one MinHash signature by question and one bucket
+# by signature band. Questions sharing a bucket are near-duplicate candidates.
+MINHASH_TABLE = 'academy_tests_question_minhash'
+
+# Number of questions will be indexed by each statement
+MINHASH_BATCH_SIZE = 2000
+
+# Minimum estimated Jaccard similarity of the question texts
+NEAR_DUPLICATE_THRESHOLD = 0.7
+
+MINHASH_CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS academy_tests_question_minhash (
+        question_id INTEGER PRIMARY KEY
+            REFERENCES academy_tests_question ( "id" ) ON DELETE CASCADE,
+        signature BIGINT [] NOT NULL,
+        buckets BIGINT [] NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS academy_tests_question_minhash_buckets_idx
+        ON academy_tests_question_minhash USING GIN ( buckets );
+'''
+
+# Name, preamble and answers of the given questions
+MINHASH_QUESTION_TEXTS = '''
+    SELECT
+        atq."id",
+        atq."name",
+        atq.preamble,
+        ARRAY_AGG (
+            ans."name" ORDER BY ans."sequence" ASC, ans."id" ASC
+        ) FILTER ( WHERE ans."id" IS NOT NULL ) AS answers
+    FROM
+        academy_tests_question AS atq
+    LEFT JOIN academy_tests_answer AS ans
+        ON ans.question_id = atq."id"
+    WHERE
+        atq."id" = ANY ( %s :: INTEGER [] )
+    GROUP BY
+        atq."id"
+'''
+
+# Signatures and buckets are given as flat arrays, each question takes its
+# slice using its position in the question array
+MINHASH_UPSERT = '''
+    INSERT INTO academy_tests_question_minhash AS mh (
+        question_id,
+        signature,
+        buckets
+    )
+    SELECT
+        q.question_id,
+        src.signatures [
+            ( q.pos - 1 ) * %(permutations)s + 1 : q.pos * %(permutations)s
+        ],
+        src.buckets [
+            ( q.pos - 1 ) * %(bands)s + 1 : q.pos * %(bands)s
+        ]
+    FROM
+        UNNEST ( %(question_ids)s :: INTEGER [] )
+            WITH ORDINALITY AS q ( question_id, pos )
+    CROSS JOIN (
+        SELECT
+            %(signatures)s :: BIGINT [] AS signatures,
+            %(buckets)s :: BIGINT [] AS buckets
+    ) AS src
+    ON CONFLICT ( question_id ) DO UPDATE
+    SET
+        signature = EXCLUDED.signature,
+        buckets = EXCLUDED.buckets
+    WHERE
+        mh.signature IS DISTINCT FROM EXCLUDED.signature
+'''
+
+# Questions have not been indexed yet
+MINHASH_MISSING_QUESTIONS = '''
+    SELECT
+        atq."id"
+    FROM
+        academy_tests_question AS atq
+    WHERE
+        NOT EXISTS (
+            SELECT
+                1
+            FROM
+                academy_tests_question_minhash AS mh
+            WHERE
+                mh.question_id = atq."id"
+        )
+    ORDER BY
+        atq."id" ASC
+'''
+
+MINHASH_DELETE = '''
+    DELETE FROM academy_tests_question_minhash
+    WHERE question_id = ANY ( %s :: INTEGER [] )
+'''
+
+
+class AcademyTestsQuestionNearDuplicateRel(models.Model):
+    """ SQL VIEW will be used as middle many to many relationship between
+    questions whose texts are almost the same. Candidates are found through
+    the LSH buckets and confirmed comparing their MinHash signatures.
+    """
+
+    _name = 'academy.tests.question.near.duplicate.rel'
+    _description = u'Academy tests question near duplicate rel'
+
+    _auto = False
+    _table = 'academy_tests_question_near_duplicate_rel'
+    _view_sql = '''
+    SELECT
+        mh1.question_id,
+        mh2.question_id AS duplicate_id
+    FROM
+        academy_tests_question_minhash AS mh1
+    INNER JOIN academy_tests_question_minhash AS mh2
+        ON mh2.buckets && mh1.buckets
+        AND mh2.question_id <> mh1.question_id
+    INNER JOIN academy_tests_question AS atq1
+        ON atq1."id" = mh1.question_id
+        AND atq1.active
+        AND atq1.status <> 'draft'
+    INNER JOIN academy_tests_question AS atq2
+        ON atq2."id" = mh2.question_id
+        AND atq2.active
+        AND atq2.status <> 'draft'
+    WHERE (
+        SELECT
+            COUNT ( * )
+        FROM
+            UNNEST ( mh1.signature, mh2.signature ) AS sig ( x, y )
+        WHERE
+            sig.x = sig.y
+    ) >= {min_equal}
+    '''
+
+    question_id = fields.Many2one(
+        string='Question',
+        required=False,
+        readonly=True,
+        index=True,
+        default=None,
+        help='Question',
+        comodel_name='academy.tests.question',
+        domain=[],
+        context={},
+        ondelete='cascade',
+        auto_join=False
+    )
+
+    duplicate_id = fields.Many2one(
+        string='Near duplicate',
+        required=False,
+        readonly=True,
+        index=True,
+        default=None,
+        help='Question whose text is almost the same',
+        comodel_name='academy.tests.question',
+        domain=[],
+        context={},
+        ondelete='cascade',
+        auto_join=False
+    )
+
+    def init(self):
+        self.env.cr.execute(MINHASH_CREATE_TABLE)
+
+        min_equal = ceil(NEAR_DUPLICATE_THRESHOLD * MINHASH_PERMUTATIONS)
+        view_sql = self._view_sql.format(min_equal=min_equal)
+
+        sentence = 'CREATE or REPLACE VIEW {} as ( {} )'
+
+        drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(sentence.format(self._table, view_sql))
+
+        self.prevent_actions()
+
+    def prevent_actions(self):
+        actions = ['INSERT', 'UPDATE', 'DELETE']
+
+        BASE_SQL = '''
+            CREATE OR REPLACE RULE {table}_{action} AS
+                ON {action} TO {table} DO INSTEAD NOTHING
+        '''
+
+        for action in actions:
+            sql = BASE_SQL.format(table=self._table, action=action)
+            self.env.cr.execute(sql)
+
+    @api.model
+    def update_index(self, question_ids):
+        """ Computes the MinHash signature and the LSH buckets of the given
+        questions and stores the changed ones. Questions without text are
+        removed from the index.
+
+        Args:
+            question_ids (list): IDs of the questions will be indexed
+        """
+
+        if not question_ids:
+            return
+
+        self.env['academy.tests.question'].flush(['name', 'preamble'])
+        self.env['academy.tests.answer'].flush(
+            ['name', 'sequence', 'question_id'])
+
+        cursor = self.env.cr
+
+        for batch_ids in split_every(MINHASH_BATCH_SIZE, list(question_ids)):
+            cursor.execute(MINHASH_QUESTION_TEXTS, (list(batch_ids),))
+
+            params = {
+                'question_ids': [],
+                'signatures': [],
+                'buckets': [],
+                'permutations': MINHASH_PERMUTATIONS,
+                'bands': MINHASH_BANDS
+            }
+            empty_ids = set(batch_ids)
+
+            for question_id, name, preamble, answers in cursor.fetchall():
+                texts = [preamble, name] + (answers or [])
+                values = signature(shingles(texts))
+                if not values:
+                    continue
+
+                params['question_ids'].append(question_id)
+                params['signatures'].extend(values)
+                params['buckets'].extend(buckets(values))
+                empty_ids.discard(question_id)
+
+            if params['question_ids']:
+                cursor.execute(MINHASH_UPSERT, params)
+
+            if empty_ids:
+                cursor.execute(MINHASH_DELETE, (list(empty_ids),))
+
+    @api.model
+    def index_missing_questions(self):
+        """ Scheduled action, indexes the questions which are not in the index
+        yet. The first run builds the whole index, it is not built on module
+        installation or update.
+        """
+
+        self.env.cr.execute(MINHASH_MISSING_QUESTIONS)
+        question_ids = [row[0] for row in self.env.cr.fetchall()]
+
+        if question_ids:
+            _logger.info('Indexing %s questions in the near-duplicate index',
+                         len(question_ids))
+            self.update_index(question_ids)
+
+    @api.model
+    def rebuild_index(self):
+        """ Indexes all the questions, this is only needed after operations
+        which skip the ORM.
+
+        Returns:
+            float: elapsed seconds
+        """
+
+        started = perf_counter()
+
+        self.env.cr.execute('SELECT "id" FROM academy_tests_question')
+        question_ids = [row[0] for row in self.env.cr.fetchall()]
+
+        self.update_index(sorted(question_ids))
+
+        elapsed = perf_counter() - started
+        _logger.info('Near-duplicate index of %s questions built in %.2fs',
+                     len(question_ids), elapsed)
+
+        return elapsed
@@ -72,6 +72,114 @@ PARTIAL_ACADEMY_TESTS_QUESTION_TRAINING_MODULE = '''
 '''
 
 
+# Following SQL sentences return the modules whose available questions change
+# when a row, ``{row}``, changes. They are used to refresh the stored
+# relations of the available questions of modules and activities.
+# -----------------------------------------------------------------------------
+_MODULE_TREE_SQL = '''
+    SELECT tree.requested_module_id
+    FROM academy_training_module_tree_readonly AS tree
+    WHERE tree.responded_module_id IN ( %s )
+'''
+
+_LINK_MODULE_SQL = '''
+    SELECT link.training_module_id
+    FROM academy_tests_topic_training_module_link AS link
+    WHERE %s
+'''
+
+_QUESTION_TOPIC_SQL = '''
+    link.topic_id IN (
+        SELECT atq.topic_id
+        FROM academy_tests_question AS atq
+        WHERE atq."id" = {row}.question_id
+    )
+'''
+
+_CATEGORY_LINK_SQL = '''
+    link."id" IN (
+        SELECT rel.tests_topic_training_module_link_id
+        FROM academy_tests_category_tests_topic_training_module_link_rel AS rel
+        WHERE rel.category_id = {row}."id"
+    )
+'''
+
+_ACTIVITY_MODULE_SQL = '''
+    SELECT acu.training_activity_id
+    FROM academy_competency_unit AS acu
+    WHERE acu.training_module_id IN ( %s )
+'''
+
+
+def _linked_modules(condition):
+    return _MODULE_TREE_SQL % (_LINK_MODULE_SQL % condition)
+
+
+# (table, events, sql) as expected by Many2manyView.refresh_on, None sql
+# refreshes all the relation
+AVAILABLE_QUESTION_MODULE_REFRESH_ON = [
+    (
+        'academy_tests_topic_training_module_link',
+        None,
+        _MODULE_TREE_SQL % 'SELECT {row}.training_module_id'
+    ),
+    (
+        'academy_tests_category_tests_topic_training_module_link_rel',
+        None,
+        _linked_modules(
+            'link."id" = {row}.tests_topic_training_module_link_id')
+    ),
+    (
+        'academy_tests_question',
+        'UPDATE OF topic_id',
+        _linked_modules('link.topic_id = {row}.topic_id')
+    ),
+    (
+        'academy_tests_question_topic_version_rel',
+        None,
+        _linked_modules(_QUESTION_TOPIC_SQL)
+    ),
+    (
+        'academy_tests_question_category_rel',
+        None,
+        _linked_modules(_QUESTION_TOPIC_SQL)
+    ),
+    (
+        'academy_tests_topic',
+        'UPDATE OF active',
+        _linked_modules('link.topic_id = {row}."id"')
+    ),
+    (
+        'academy_tests_topic_version',
+        'UPDATE OF active',
+        _linked_modules('link.topic_version_id = {row}."id"')
+    ),
+    (
+        'academy_tests_category',
+        'UPDATE OF active',
+        _linked_modules(_CATEGORY_LINK_SQL)
+    ),
+    (
+        'academy_training_module',
+        'INSERT OR DELETE OR UPDATE OF training_module_id',
+        None
+    )
+]
+
+# Activities take the questions of the modules of their competency units
+AVAILABLE_QUESTION_ACTIVITY_REFRESH_ON = [
+    (table, events, sql and _ACTIVITY_MODULE_SQL % sql)
+    for table, events, sql in AVAILABLE_QUESTION_MODULE_REFRESH_ON
+] + [
+    (
+        'academy_competency_unit',
+        'INSERT OR DELETE OR UPDATE OF training_module_id, '
+        'training_activity_id',
+        'SELECT {row}.training_activity_id'
+    )
+]
+
+
 class AcademyTestsQuestionTrainingActivityRel(models.Model):
     """ SQL VIEW will be used as middle many to many relationship
     """
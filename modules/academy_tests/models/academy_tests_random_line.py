@@ -7,10 +7,16 @@ which contains all Academy Tests Random Wizard Line  attributes and behavior.
 
 
 from logging import getLogger
+from array import array
 from datetime import datetime
+from hashlib import md5
+import random
 from odoo.osv.expression import AND, FALSE_DOMAIN
 from odoo import models, fields, api
 from odoo.tools.translate import _
+from odoo.tools.lru import LRU
+
+from .utils.sql_operations import ACADEMY_RANDOM_LINE_CANDIDATES
 
 
 _logger = getLogger(__name__)
@@ -24,6 +30,15 @@ WIZARD_LINE_STATES = [
     ('step5', _('Special'))
 ]
 
+# Materialized candidate pools by line criteria, shared by all the lines which
+# have the same criteria. Each entry stores the question bank generation was
+# used to build it and the candidate question IDs as a compact int array.
+CANDIDATE_POOL_CACHE = LRU(64)
+
+# Larger pools will not be cached to keep the worker memory under control,
+# the cache will never take more than 64 * 50000 * 4 bytes by worker
+CANDIDATE_POOL_MAX_SIZE = 50000
+
 CHECK_ANSWER_VALUES = ('CHECK(minimum_answers > 1 AND maximum_answers > 1 AND '
                        'minimum_answers <= maximum_answers)')
 
@@ -685,15 +700,6 @@ class AcademyTestsRandomTemplateLine(models.Model):
             self._append_in(
                 domains, 'question_ids', 'id', 'exclude_questions')
 
-    @staticmethod
-    def _accumulate_domain(base_domain, accumulate_ids):
-        if accumulate_ids:
-            domain = AND([base_domain, [('id', 'not in', accumulate_ids)]])
-        else:
-            domain = base_domain.copy()
-
-        return domain
-
     def _compute_domain(self, extra):
         """ Make two valid domains for record, one without restrictions and
         another with them.
@@ -776,36 +782,277 @@ class AcademyTestsRandomTemplateLine(models.Model):
 
         return question_set.search(domain, limit=self.quantity)
 
+    def _candidate_subquery(self, extra, limit):
+        """ Builds the SQL subquery which draws random candidates for a single
+        line. Record rules and active filter are applied as ``search`` does.
+
+        Args:
+            extra (list): Odoo valid domain will be merged with line domain
+            limit (int): maximum number of candidates will be drawn
+
+        Returns:
+            tuple: SQL string and its list of parameters
+        """
+
+        self.ensure_one()
+
+        question_obj = self.env['academy.tests.question']
+
+        domain = self._compute_domain(extra)
+        self._log_operation('_candidate_subquery', domain)
+
+        query = question_obj._where_calc(domain)
+        question_obj._apply_ir_rules(query, 'read')
+        from_clause, where_clause, where_params = query.get_sql()
+
+        sql = ACADEMY_RANDOM_LINE_CANDIDATES.format(
+            from_clause=from_clause, where_clause=where_clause or 'TRUE')
+
+        return sql, [self.id] + list(where_params) + [limit]
+
+    def _candidate_pool_key(self, domain):
+        """ Builds the key will be used to store the candidate pool of the
+        line in cache. Record rules are not applied in superuser mode, so
+        pools built with and without it are kept apart.
+
+        Args:
+            domain (list): line domain, see ``_compute_domain``
+
+        Returns:
+            tuple: cache key
+        """
+
+        self.ensure_one()
+
+        criteria = md5(repr(domain).encode('utf-8')).hexdigest()
+
+        return (
+            self.env.cr.dbname,
+            self.env.uid,
+            self.env.su,
+            tuple(self.env.companies.ids),
+            self.env.context.get('active_test', True),
+            criteria
+        )
+
+    def _get_candidate_pool(self, generation):
+        """ Gets all the candidate question IDs for the line, reading them from
+        cache when it was built with the given question bank generation.
+
+        Lines which take criteria from the training context depend on more
+        than the question bank, so they will not be cached.
+
+        Args:
+            generation (int): current question bank generation
+
+        Returns:
+            array: candidate question IDs or None if line can not be cached
+        """
+
+        self.ensure_one()
+
+        if self.tests_by_context or self.questions_by_context:
+            return None
+
+        domain = self._compute_domain([])
+        key = self._candidate_pool_key(domain)
+
+        entry = CANDIDATE_POOL_CACHE.get(key)
+        if entry and entry[0] == generation:
+            return entry[1]
+
+        question_obj = self.env['academy.tests.question']
+        self._log_operation('_get_candidate_pool', domain)
+
+        pool = array('i', question_obj._search(domain, order='id'))
+        if len(pool) <= CANDIDATE_POOL_MAX_SIZE:
+            CANDIDATE_POOL_CACHE[key] = (generation, pool)
+
+        return pool
+
+    @staticmethod
+    def _excluded_ids(extra):
+        """ Returns the question IDs excluded by the given domain when it only
+        contains ``('id', 'not in', ids)`` leafs, as template builds it.
+
+        Args:
+            extra (list): Odoo valid domain
+
+        Returns:
+            set: excluded question IDs or None if domain has other leafs
+        """
+
+        excluded = set()
+
+        for leaf in extra or []:
+            if not isinstance(leaf, (list, tuple)) or len(leaf) != 3 or \
+                    leaf[0] != 'id' or leaf[1] != 'not in':
+                return None
+
+            excluded.update(leaf[2])
+
+        return excluded
+
+    def _fetch_candidates(self, extra, limits):
+        """ Draws random candidates for all lines in recordset. Lines which
+        have their candidate pool in cache are resolved in Python, the rest
+        are resolved using a single query.
+
+        Args:
+            extra (list): Odoo valid domain will be merged with line domains
+            limits (dict): maximum number of candidates by line ID, lines not
+            in dictionary will be skipped and None means no limit
+
+        Returns:
+            dict: list of question IDs, in random order, by each line ID
+        """
+
+        candidates = {record.id: [] for record in self}
+        subqueries, params = [], []
+
+        generation = None
+        excluded = self._excluded_ids(extra)
+        if excluded is not None and limits:
+            question_obj = self.env['academy.tests.question']
+            generation = question_obj.get_bank_generation()
+
+        for record in self:
+            if record.id not in limits:
+                continue
+
+            pool = None
+            if excluded is not None:
+                pool = record._get_candidate_pool(generation)
+
+            if pool is not None:
+                pool = [item for item in pool if item not in excluded]
+                size = len(pool) if limits[record.id] is None \
+                    else min(len(pool), limits[record.id])
+                candidates[record.id] = random.sample(pool, size)
+                continue
+
+            sql, args = record._candidate_subquery(extra, limits[record.id])
+            subqueries.append(sql)
+            params.extend(args)
+
+        if subqueries:
+            self.env.cr.execute(' UNION ALL '.join(subqueries), params)
+
+            drawn = {}
+            for line_id, question_id, draw in self.env.cr.fetchall():
+                drawn.setdefault(line_id, []).append((draw, question_id))
+
+            for line_id, items in drawn.items():
+                candidates[line_id] = [item[1] for item in sorted(items)]
+
+        return candidates
+
+    def sample_candidates_batch(self, extra=None, count=1, disjoint=True):
+        """ Draws random questions for all lines in recordset as many times as
+        given ``count``. Line domains are computed and resolved only once.
+
+        Questions chosen by a line will not be chosen by the next ones in the
+        same sample. If ``disjoint`` is True, a question can not be chosen for
+        more than one sample.
+
+        When samples are disjoint each line draws as many candidates as the
+        sum of all the quantities by the number of samples, this ensures there
+        will be enough candidates left after removing those have already been
+        taken. Otherwise the full candidate pool is read and every sample is
+        shuffled in Python.
+
+        Keyword Arguments:
+            extra {list} -- Odoo valid domain will be merged as extra leafs in
+            each computed domain (default: {None})
+            count {int} -- number of samples will be drawn (default: {1})
+            disjoint {bool} -- True to not repeat questions between samples
+            (default: {True})
+
+        Returns:
+            list -- one dictionary by sample with the found question recordset
+            by each line ID, questions will be sorted in random order
+        """
+
+        question_obj = self.env['academy.tests.question']
+        line_set = self.filtered(lambda line: line.quantity > 0)
+
+        total = sum(line_set.mapped('quantity'))
+        limit = total * count if disjoint else None
+        limits = {line.id: limit for line in line_set}
+
+        candidates = self._fetch_candidates(extra or [], limits)
+
+        samples = []
+        taken = set()
+        cursors = {line.id: 0 for line in line_set}
+
+        for index in range(0, count):
+            if not disjoint:
+                taken = set()
+
+            sample = {record.id: question_obj for record in self}
+
+            for record in line_set:
+                pool = candidates[record.id]
+                if not disjoint:
+                    size = min(len(pool), record.quantity + len(taken))
+                    pool = random.sample(pool, size)
+
+                # Taken questions never come back, so in disjoint mode the
+                # next sample can continue where the previous one stopped
+                position = cursors[record.id] if disjoint else 0
+                question_ids = []
+
+                while position < len(pool) and \
+                        len(question_ids) < record.quantity:
+                    question_id = pool[position]
+                    position += 1
+
+                    if question_id not in taken:
+                        question_ids.append(question_id)
+                        taken.add(question_id)
+
+                cursors[record.id] = position
+                sample[record.id] = question_obj.browse(question_ids)
+
+            samples.append(sample)
+
+        return samples
+
+    def sample_candidates(self, extra=None):
+        """ Draws random questions for all lines in recordset using a single
+        query. Questions chosen by a line will not be chosen by the next ones.
+
+        Keyword Arguments:
+            extra {list} -- Odoo valid domain will be merged as extra leafs in
+            each computed domain (default: {None})
+
+        Returns:
+            dict -- found question recordset by each line ID, questions will
+            be sorted in random order
+        """
+
+        return self.sample_candidates_batch(extra, count=1)[0]
+
     def perform_search(self, extra=None):
         """ Performs search for all lines in given recorset. This method
-        calls a private ``_perform_search`` method by earch record.
+        calls ``sample_candidates`` to resolve all lines at once.
 
-        This uses resulted question IDs to exclude them when it will perform
-        the next line search
+        Questions found by a line will not be returned again by the next ones.
 
         Keyword Arguments:
             extra {list} -- Odoo valid domain will be merged as extra leafs in
             new computed domain (default: {None})
-            random {bool} -- True to allow return found questions when the
-            required quantity has not been reached
 
         Returns:
             recordset -- found question recordset using all lines
         """
 
         result_set = self.env['academy.tests.question']
-        base_domain = (extra or []).copy()
-        accumulate_ids = []
+        samples = self.sample_candidates(extra)
 
         for record in self:
-            domain = self._accumulate_domain(base_domain, accumulate_ids)
-            record_set = record._perform_search(domain)
-
-            accumulate_ids.extend(record_set.mapped('id'))
-            if accumulate_ids:
-                domain = AND([extra, [('id', 'not in', accumulate_ids)]])
-
-            result_set += record_set
+            result_set += samples[record.id]
 
         return result_set
 
@@ -816,6 +1063,13 @@ class AcademyTestsRandomTemplateLine(models.Model):
             training_ref = self.random_template_id.training_ref
 
         question_set = self.env['academy.tests.question']
+
+        if not extra:
+            generation = question_set.get_bank_generation()
+            pool = self._get_candidate_pool(generation)
+            if pool is not None:
+                return len(pool)
+
         domain = self._compute_domain(extra or [])
 
         self._log_operation('perform_search_count', domain)
@@ -8,10 +8,11 @@ all academy tests random templeate attributes and behavior.
 
 from odoo import models, fields, api
 from odoo.tools.translate import _
-from odoo.exceptions import UserError
+from odoo.exceptions import UserError, ValidationError
 from odoo.osv.expression import AND
 
 from .utils.libuseful import eval_domain
+from .utils.sql_operations import ACADEMY_TESTS_INSERT_QUESTION_LINKS
 from odoo.addons.academy_base.models.academy_abstract_training \
     import AcademyAbstractTraining
 
@@ -22,6 +23,9 @@ from logging import getLogger
 
 _logger = getLogger(__name__)
 
+# Pre-aggregated answer statistics by student and question
+STATISTICS_MODEL = 'academy.statistics.student.question.readonly'
+
 
 class OverwriteInfo(IntFlag):
     NONE = 0
@@ -513,12 +517,14 @@ class AcademyTestsRandomTemplate(models.Model):
 
         return result
 
-    def _new_name(self, extra=None):
+    def _new_name(self, extra=None, serial=None):
         """Makes a new test name according to the pattern supplied by user
 
         Args:
             extra (str, optional): some extra text can be used as a part of the
             new test name
+            serial (int, optional): sequence will be used instead of the
+            current template serial
 
         Returns:
             str: new generated test name
@@ -533,7 +539,7 @@ class AcademyTestsRandomTemplate(models.Model):
             owner=self.owner_id.name or _('ownerless'),
             scale=self.correction_scale_id.name or _('default'),
             kind=self.test_kind_id.name or _('common'),
-            sequence=self.serial,
+            sequence=self.serial if serial is None else serial,
             extra=extra,
             uid=self._get_name_uid(),
             training=self._get_training_name()
@@ -584,15 +590,6 @@ class AcademyTestsRandomTemplate(models.Model):
 
         return [('id', 'not in', question_ids)] if question_ids else []
 
-    @staticmethod
-    def _accumulate_domain(base_domain, accumulate_ids):
-        if accumulate_ids:
-            domain = AND([base_domain, [('id', 'not in', accumulate_ids)]])
-        else:
-            domain = base_domain.copy()
-
-        return domain
-
     @staticmethod
     def append_links(m2m_operations, line, question_set, sequence):
         request_id = line.env.context.get('request_id', None)
@@ -662,6 +659,94 @@ class AcademyTestsRandomTemplate(models.Model):
         if not allow_partial and len(record_set) != line.quantity:
             raise UserError(msg.format(line.name))
 
+    def _draw_links(self, base_domain):
+        """ Draws random questions for all template lines at once and builds
+        the One2many operations will be used to link them to a test.
+
+        Args:
+            base_domain (list): Odoo valid domain will be merged with the
+            domain of each line
+
+        Returns:
+            list: One2many create operations for question links
+
+        Raises:
+            UserError -- A line does not have enough questions and template
+            does not allow to skip faulty lines
+        """
+
+        line_set = self.random_line_ids
+        sample = line_set.sample_candidates(base_domain)
+
+        sequence = 0
+        m2m_operations = []
+
+        for line in line_set:
+            sequence = sequence + 10
+
+            question_set = sample[line.id]
+            self.assert_expected_questions(line, question_set)
+
+            self.append_links(m2m_operations, line, question_set, sequence)
+
+        return m2m_operations
+
+    def _insert_links(self, test_set, samples):
+        """ Links drawn questions to the given tests using a single INSERT
+        statement instead of One2many operations.
+
+        Args:
+            test_set (recordset): new tests, one by sample
+            samples (list): found questions by line ID, one dict by test
+        """
+
+        request_id = self.env.context.get('request_id', None)
+        columns = {
+            'uid': self.env.uid,
+            'test_ids': [],
+            'question_ids': [],
+            'sequences': [],
+            'request_ids': [],
+            'test_block_ids': []
+        }
+
+        for test, sample in zip(test_set, samples):
+            sequence = 0
+
+            for line in self.random_line_ids:
+                test_block_id = line.test_block_id.id or None
+
+                for question_id in sample[line.id].ids:
+                    sequence = sequence + 1
+
+                    columns['test_ids'].append(test.id)
+                    columns['question_ids'].append(question_id)
+                    columns['sequences'].append(sequence)
+                    columns['request_ids'].append(request_id)
+                    columns['test_block_ids'].append(test_block_id)
+
+        if columns['test_ids']:
+            self.env.cr.execute(ACADEMY_TESTS_INSERT_QUESTION_LINKS, columns)
+            link_ids = [row[0] for row in self.env.cr.fetchall()]
+
+            link_obj = self.env['academy.tests.test.question.rel']
+            link_obj.invalidate_cache()
+            test_set.invalidate_cache(['question_ids'])
+
+            # The INSERT skips the link create, its constraint and its hooks
+            link_set = link_obj.browse(link_ids)
+            link_set._check_dependency_sequence_order()
+
+            self.env['academy.tests.question'].bump_bank_generation()
+
+            statistics_obj = self.env[STATISTICS_MODEL]
+            statistics_obj.refresh_scope(
+                statistics_obj.get_scope_by_links(link_ids))
+
+        if request_id:
+            request_obj = self.env['academy.tests.question.request']
+            request_obj.browse(request_id).update_state()
+
     def _append_questions(self, test_id, overwrite):
         self.ensure_one()
 
@@ -679,25 +764,13 @@ class AcademyTestsRandomTemplate(models.Model):
             values['question_ids'] = [(5, 0, 0)]
             values['random_template_id'] = self._original_template_id()
 
-        sequence = 0
-        m2m_operations = []
-        accumulate_ids = []
-
-        for line in self.random_line_ids:
-            sequence = sequence + 10
-
-            domain = self._accumulate_domain(base_domain, accumulate_ids)
-
-            question_set = line.perform_search(domain)
-            self.assert_expected_questions(line, question_set)
-
-            self.append_links(m2m_operations, line, question_set, sequence)
-            accumulate_ids.extend(question_set.mapped('id'))
+        m2m_operations = self._draw_links(base_domain)
 
         values['question_ids'].extend(m2m_operations)
         test_id.write(values)
 
-        return question_set
+        question_ids = [op[2]['question_id'] for op in m2m_operations]
+        return self.env['academy.tests.question'].browse(question_ids)
 
     def append_questions(self, test_id, overwrite=False):
         """ Try to append existing questions to a given test using
@@ -752,20 +825,7 @@ class AcademyTestsRandomTemplate(models.Model):
         values['random_template_id'] = self._original_template_id()
         values['test_kind_id'] = self.test_kind_id.id
 
-        sequence = 0
-        m2m_operations = []
-        accumulate_ids = []
-
-        for line in self.random_line_ids:
-            sequence = sequence + 10
-
-            domain = self._accumulate_domain(base_domain, accumulate_ids)
-
-            question_set = line.perform_search(domain)
-            self.assert_expected_questions(line, question_set)
-
-            self.append_links(m2m_operations, line, question_set, sequence)
-            accumulate_ids.extend(question_set.mapped('id'))
+        m2m_operations = self._draw_links(base_domain)
 
         values['question_ids'] = m2m_operations
         test_id = test.create(values)
@@ -820,6 +880,99 @@ class AcademyTestsRandomTemplate(models.Model):
         else:
             return test_id
 
+    def _new_tests(self, count, disjoint=False, name=False):
+        """ Creates several tests from this template, questions are drawn
+        for all of them at once and linked using a single query.
+
+        Arguments:
+            count {int} -- number of tests will be created
+
+        Keyword Arguments:
+            disjoint {bool} -- True to not repeat questions between the new
+            tests, it is forced in incremental templates (default: {False})
+            name {str} -- name for all the new tests (default: {False})
+
+        Returns:
+            recordset -- the new tests
+        """
+
+        self.ensure_one()
+
+        test_obj = self.env['academy.tests.test']
+
+        base_domain = self._exclude_incremental()
+
+        # Incremental exclusion is computed only once, the new tests must not
+        # share questions as they would not if they were created one by one
+        disjoint = disjoint or bool(self.incremental)
+
+        line_set = self.random_line_ids
+        samples = line_set.sample_candidates_batch(
+            base_domain, count=count, disjoint=disjoint)
+
+        values_list = []
+        for index, sample in enumerate(samples):
+            for line in line_set:
+                self.assert_expected_questions(line, sample[line.id])
+
+            values = self._get_test_info(overwrite=OverwriteInfo.ALL)
+            values['name'] = name or self._new_name(serial=self.serial + index)
+            values['random_template_id'] = self._original_template_id()
+            values['test_kind_id'] = self.test_kind_id.id
+
+            values_list.append(values)
+
+        test_set = test_obj.create(values_list)
+        self._insert_links(test_set, samples)
+
+        self.serial = self.serial + count
+
+        if self.self_assignment and self.training_ref:
+            for test_id in test_set:
+                self._assign(test_id)
+
+        return test_set
+
+    def new_tests(self, count=1, disjoint=False, name=False):
+        """ Create several tests from template at once. Line domains will be
+        computed only once and questions will be linked using a single query.
+
+        Keyword Arguments:
+            count {int} -- number of tests will be created (default: {1})
+            disjoint {bool} -- True to not repeat questions between the new
+            tests, incremental templates never repeat them (default: {False})
+            name {str} -- name for all the new tests, leave empty to use
+            template name pattern (default: {False})
+
+        Returns:
+            recordset -- all the new created tests
+
+        Raises:
+            error -- Unknown common exception, will be sent to log
+            UserError -- The established restrictions cannot be satisfied
+        """
+
+        success = self._begin_proccess()
+        test_set = self.env['academy.tests.test']
+
+        try:
+
+            for record in self:
+                test_set += record._new_tests(count, disjoint, name)
+
+            success = True
+
+        except (UserError, ValidationError) as error:
+            raise error
+
+        except Exception as ex:
+            _logger.error(ex)
+            raise UserError(_('A serious error has occurred, check log files'))
+
+        self._end_proccess(success)
+
+        return test_set
+
     # -------------------- CREATE NEW TEMPLATE FROM TRAINIG -------------------
 
     @staticmethod
@@ -208,8 +208,10 @@ class AcademyTestsRandomTemplateScheduled(models.Model):
     def _new_test(self, target_ids):
         self.ensure_one()
 
-        for target_id in target_ids:
-            self.template_id.new_test(gui=False, training_ref=target_id)
+        if target_ids:
+            template = self.template_id
+            template.new_tests(count=len(target_ids),
+                               disjoint=bool(template.incremental))
 
     def new_test(self):
 
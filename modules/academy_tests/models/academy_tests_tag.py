@@ -5,7 +5,7 @@ This module contains the academy.tests.tag Odoo model which stores
 all academy tests tag attributes and behavior.
 """
 
-from odoo import models, fields
+from odoo import models, fields, api
 from odoo.tools.translate import _
 
 from logging import getLogger
@@ -90,6 +90,40 @@ class AcademyTestsTag(models.Model):
         )
     ]
 
+    # --------------------------- OVERLOADED METHODS --------------------------
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """ Questions can be tagged from here, random line candidate pools
+        must be discarded then
+        """
+
+        result = super(AcademyTestsTag, self).create(vals_list)
+
+        if any(values.get('question_ids') for values in vals_list):
+            self.env['academy.tests.question'].bump_bank_generation()
+
+        return result
+
+    def write(self, values):
+        """ Questions can be tagged from here, random line candidate pools
+        must be discarded then
+        """
+
+        result = super(AcademyTestsTag, self).write(values)
+
+        if {'question_ids', 'active'} & values.keys():
+            self.env['academy.tests.question'].bump_bank_generation()
+
+        return result
+
+    def unlink(self):
+        result = super(AcademyTestsTag, self).unlink()
+
+        self.env['academy.tests.question'].bump_bank_generation()
+
+        return result
+
     def name_get(self):
         result = []
         current_user = self.env.user
@@ -776,31 +776,37 @@ class AcademyTestsTest(models.Model):
                         rel_item.write({'sequence': index})
                         index = index + 1
 
-    def shuffle(self):
-        dep_msg = _('This test has dependent questions, '
-                    'it must be sorted manually')
+    def shuffle(self, seed=None):
+        """ Sorts the questions of all the tests at random in a single
+        statement, questions with the same attachments are kept together
+        and blocks keep their order.
 
-        for record in self:
+        Args:
+            seed (str): optional seed, the same seed always gives the same
+            order for the same questions
+        """
 
-            if not record.question_ids:
-                continue
+        dep_msg = _('This test has dependent questions, '
+                    'it must be sorted manually')
 
-            link_ids = record.question_ids
-            dep_ids = link_ids.mapped('question_id.depends_on_id')
+        target_set = self.filtered(lambda r: r.question_ids)
+        if not target_set:
+            return
 
-            if dep_ids:
-                raise UserError(dep_msg)
+        if target_set.mapped('question_ids.question_id.depends_on_id'):
+            raise UserError(dep_msg)
 
-            else:
-                ids = record.mapped('id')
+        link_obj = self.env['academy.tests.test.question.rel']
+        link_obj.flush(['test_id', 'question_id', 'test_block_id', 'sequence'])
 
-                # Use complex search to keep images consecutive
-                target_ids = ', '.join([str(i) for i in ids])
-                sql = ACADEMY_TESTS_SHUFFLE.format(target_ids)
+        # Use complex search to keep images consecutive
+        params = {
+            'test_ids': target_set.ids,
+            'seed': str(seed) if seed not in (None, False) else None
+        }
+        self.env.cr.execute(ACADEMY_TESTS_SHUFFLE, params)
 
-                record.env.cr.execute(sql)
-                record.env.cr.commit()
-                # record.env.invalidate_all()
+        link_obj.invalidate_cache(['sequence'])
 
     def _creation_subtype(self):
         xid = 'academy_tests.academy_tests_test_created'
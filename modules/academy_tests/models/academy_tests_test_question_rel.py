@@ -21,11 +21,13 @@ from odoo import models, fields, api
 from odoo.tools.translate import _
 from odoo.tools import safe_eval
 
-from io import BytesIO
 
 # pylint: disable=locally-disabled, C0103
 _logger = getLogger(__name__)
 
+# Pre-aggregated answer statistics by student and question
+STATISTICS_MODEL = 'academy.statistics.student.question.readonly'
+
 
 # pylint: disable=locally-disabled, R0903
 class AcademyTestsTestQuestionRel(models.Model):
@@ -232,30 +234,59 @@ class AcademyTestsTestQuestionRel(models.Model):
         request_set = result.mapped('request_id')
         request_set.update_state()
 
+        self.env['academy.tests.question'].bump_bank_generation()
+
+        # New links add blanks to the attempts of the test
+        statistics_obj = self.env[STATISTICS_MODEL]
+        statistics_obj.refresh_scope(
+            statistics_obj.get_scope_by_links(result.ids))
+
         return result
 
     def write(self, values):
-        """ Ensure related a valid state in the related requests.
+        """ Ensure related a valid state in the related requests. Statistics
+        are refreshed when the links are moved to other test or question.
         """
+
+        statistics_obj = self.env[STATISTICS_MODEL]
+        refresh = 'test_id' in values or 'question_id' in values
+
+        if refresh:
+            scope = statistics_obj.get_scope_by_links(self.ids)
+
         _super = super(AcademyTestsTestQuestionRel, self)
         result = _super.write(values)
 
         request_set = self.mapped('request_id')
         request_set.update_state()
 
+        self.env['academy.tests.question'].bump_bank_generation()
+
+        if refresh:
+            statistics_obj.refresh_scope(
+                scope, statistics_obj.get_scope_by_links(self.ids))
+
         return result
 
     def unlink(self):
-        """ Ensure related a valid state in the related requests.
+        """ Ensure related a valid state in the related requests. Statistics
+        scope is taken before the links are removed and refreshed after it.
         """
 
         request_set = self.mapped('request_id')
 
+        statistics_obj = self.env[STATISTICS_MODEL]
+        scope = statistics_obj.get_scope_by_links(self.ids)
+
         _super = super(AcademyTestsTestQuestionRel, self)
         result = _super.unlink()
 
         request_set.update_state()
 
+        self.env['academy.tests.question'].bump_bank_generation()
+
+        statistics_obj.refresh_scope(scope)
+
         return result
 
     def open_test(self):
@@ -285,8 +316,8 @@ class AcademyTestsTestQuestionRel(models.Model):
     )
 
     def compute_link_html(self):
-        for record in self:
-            record.link_html = record.to_html()
+        for record, html in zip(self, self._render_html_list()):
+            record.link_html = html
 
     # -------------------------------------------------------------------------
     # CONTRAINTS
@@ -365,21 +396,18 @@ class AcademyTestsTestQuestionRel(models.Model):
     # PUBLIC METHODS
     # -------------------------------------------------------------------------
  
-    def to_html(self):
-        output = ''
-
-        template_xid = \
-            'academy_tests.view_academy_tests_display_question_as_html'
-        view_obj = self.env['ir.ui.view']
+    def _render_html_list(self):
+        """ Renders all the links with the values read at once """
 
-        for record in self:
+        question_set = self.mapped('question_id')
+        question_set._prefetch_for_render()
 
-            values = record._get_values_for_template()
+        values_list = [record._get_values_for_template() for record in self]
 
-            html = view_obj.render_template(template_xid, values)
-            output += html.decode('utf8')
+        return question_set._render_html_values(values_list)
 
-        return output
+    def to_html(self):
+        return ''.join(self._render_html_list())
 
     def show_duplicates(self):
         return self.question_id.show_duplicates()
@@ -389,20 +417,27 @@ class AcademyTestsTestQuestionRel(models.Model):
 
     def to_moodle(self, encoding='utf8', prettify=True, xml_declaration=True,
                   category=None, correction_scale=None):
-        quiz = self.question_id._moodle_create_quiz(category=category)
+        chunks = self.moodle_stream(
+            encoding=encoding, prettify=prettify,
+            xml_declaration=xml_declaration, category=category,
+            correction_scale=correction_scale)
 
-        for record in self:
-            name = 'SEQ-{:04}'.format(record.sequence)
-            node = record.question_id._to_moodle(
-                name=name, correction_scale=correction_scale)
-            quiz.append(node)
+        return b''.join(chunks)
+
+    def moodle_stream(self, **kwargs):
+        """ Streams the linked questions as Moodle XML, questions are named
+        using the link sequence. See ``academy.tests.question``.
+        """
+
+        self.read(['question_id', 'sequence'])
+
+        names = ['SEQ-{:04}'.format(record.sequence) for record in self]
+        question_ids = [record.question_id.id for record in self]
 
-        file = BytesIO()
-        root = quiz.getroottree()
-        root.write(file, encoding=encoding, pretty_print=prettify,
-                   xml_declaration=xml_declaration)
+        question_obj = self.env['academy.tests.question']
+        question_set = question_obj.browse(question_ids)
 
-        return file.getvalue()
+        return question_set.moodle_stream(names=names, **kwargs)
 
     def view_shuffle_wizard(self, use_context=True):
 
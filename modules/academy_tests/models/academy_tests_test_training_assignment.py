@@ -33,6 +33,204 @@ MODEL_ALLOW_SECONDARY = {
 
 MAX_RETRIES = 5
 
+# Attempt data of the given assignments computed in a single pass over their
+# active attempts. Only the rows whose values change are updated. Ties are
+# broken as the former stable sorts over ``attempt_ids`` did, these came in
+# ``start DESC, id DESC`` order: the latest attempt wins between equals.
+_ASSIGNMENT_ATTEMPT_DATA_UPDATE = '''
+WITH targets AS (
+    SELECT
+        ass."id" AS assignment_id,
+        (
+            SELECT
+                COUNT ( * )
+            FROM
+                academy_tests_test_question_rel AS link
+            WHERE
+                link.test_id = ass.test_id
+        ) :: INTEGER AS question_count,
+        COALESCE ( scale."right", 0.0 ) AS scale_right
+    FROM
+        academy_tests_test_training_assignment AS ass
+    LEFT JOIN academy_tests_correction_scale AS scale
+        ON scale."id" = ass.correction_scale_id
+    WHERE
+        ass."id" = ANY ( %(ids)s )
+), ranked AS (
+    SELECT
+        att.*,
+        enrol.student_id AS enrolment_student_id,
+        ROW_NUMBER ( ) OVER (
+            PARTITION BY att.assignment_id
+            ORDER BY att."start" ASC, att."id" DESC
+        ) AS first_pos,
+        ROW_NUMBER ( ) OVER (
+            PARTITION BY att.assignment_id
+            ORDER BY att."start" DESC, att."id" DESC
+        ) AS last_pos,
+        ROW_NUMBER ( ) OVER (
+            PARTITION BY att.assignment_id
+            ORDER BY
+                att.final_points DESC NULLS LAST,
+                att."start" DESC,
+                att."id" DESC
+        ) AS best_pos
+    FROM
+        academy_tests_attempt AS att
+    INNER JOIN targets AS tgs
+        ON tgs.assignment_id = att.assignment_id
+    LEFT JOIN academy_training_action_enrolment AS enrol
+        ON enrol."id" = att.enrolment_id
+    WHERE
+        att.active
+), grouped AS (
+    SELECT
+        assignment_id,
+
+        MAX ( "id" ) FILTER ( WHERE first_pos = 1 ) AS first_attempt_id,
+        MAX ( "id" ) FILTER ( WHERE last_pos = 1 ) AS last_attempt_id,
+        MAX ( "id" ) FILTER ( WHERE best_pos = 1 ) AS best_attempt_id,
+        MAX ( "end" ) FILTER ( WHERE first_pos = 1 ) AS first_attempt,
+        MAX ( "end" ) FILTER ( WHERE last_pos = 1 ) AS last_attempt,
+        MAX ( "end" ) FILTER ( WHERE best_pos = 1 ) AS best_attempt,
+        MAX ( final_points ) FILTER ( WHERE first_pos = 1 ) AS first_points,
+        MAX ( final_points ) FILTER ( WHERE last_pos = 1 ) AS last_points,
+        MAX ( final_points ) FILTER ( WHERE best_pos = 1 ) AS best_points,
+        MAX ( enrolment_student_id ) FILTER ( WHERE first_pos = 1 )
+            AS first_student_id,
+        MAX ( enrolment_student_id ) FILTER ( WHERE last_pos = 1 )
+            AS last_student_id,
+        MAX ( enrolment_student_id ) FILTER ( WHERE best_pos = 1 )
+            AS best_student_id,
+
+        COUNT ( * ) :: INTEGER AS attempt_count,
+        MAX ( final_points ) :: FLOAT AS max_final_points,
+        MIN ( final_points ) :: FLOAT AS min_final_points,
+
+        AVG ( final_points ) :: FLOAT AS avg_final_points,
+        AVG ( right_points ) :: FLOAT AS avg_right_points,
+        AVG ( wrong_points ) :: FLOAT AS avg_wrong_points,
+        AVG ( blank_points ) :: FLOAT AS avg_blank_points,
+
+        TRUNC ( AVG ( answered_count ) ) :: INTEGER AS avg_answered_count,
+        TRUNC ( AVG ( right_count ) ) :: INTEGER AS avg_right_count,
+        TRUNC ( AVG ( wrong_count ) ) :: INTEGER AS avg_wrong_count,
+        TRUNC ( AVG ( blank_count ) ) :: INTEGER AS avg_blank_count,
+
+        COUNT ( * ) FILTER ( WHERE passed ) :: INTEGER AS passed_count,
+        COUNT ( * ) FILTER ( WHERE passed IS NOT TRUE ) :: INTEGER
+            AS failed_count
+    FROM
+        ranked
+    GROUP BY
+        assignment_id
+), computed_data AS (
+    SELECT
+        tgs.assignment_id,
+        tgs.question_count,
+        ( tgs.question_count * tgs.scale_right ) :: FLOAT AS max_points,
+        grp.first_attempt_id,
+        grp.last_attempt_id,
+        grp.best_attempt_id,
+        grp.first_attempt,
+        grp.last_attempt,
+        grp.best_attempt,
+        grp.first_student_id,
+        grp.last_student_id,
+        grp.best_student_id,
+        COALESCE ( grp.first_points, 0.0 ) :: FLOAT AS first_points,
+        COALESCE ( grp.last_points, 0.0 ) :: FLOAT AS last_points,
+        COALESCE ( grp.best_points, 0.0 ) :: FLOAT AS best_points,
+        COALESCE ( grp.attempt_count, 0 ) AS attempt_count,
+        COALESCE ( grp.max_final_points, 0.0 ) AS max_final_points,
+        COALESCE ( grp.min_final_points, 0.0 ) AS min_final_points,
+        COALESCE ( grp.avg_final_points, 0.0 ) AS avg_final_points,
+        COALESCE ( grp.avg_right_points, 0.0 ) AS avg_right_points,
+        COALESCE ( grp.avg_wrong_points, 0.0 ) AS avg_wrong_points,
+        COALESCE ( grp.avg_blank_points, 0.0 ) AS avg_blank_points,
+        COALESCE ( grp.avg_answered_count, 0 ) AS avg_answered_count,
+        COALESCE ( grp.avg_right_count, 0 ) AS avg_right_count,
+        COALESCE ( grp.avg_wrong_count, 0 ) AS avg_wrong_count,
+        COALESCE ( grp.avg_blank_count, 0 ) AS avg_blank_count,
+        COALESCE ( grp.passed_count, 0 ) AS passed_count,
+        COALESCE ( grp.failed_count, 0 ) AS failed_count
+    FROM
+        targets AS tgs
+    LEFT JOIN grouped AS grp
+        ON grp.assignment_id = tgs.assignment_id
+)
+UPDATE academy_tests_test_training_assignment AS ass
+SET
+    write_uid = %(uid)s,
+    write_date = ( NOW() AT TIME ZONE 'UTC' ),
+    question_count = cd.question_count,
+    max_points = cd.max_points,
+    first_attempt_id = cd.first_attempt_id,
+    last_attempt_id = cd.last_attempt_id,
+    best_attempt_id = cd.best_attempt_id,
+    first_attempt = cd.first_attempt,
+    last_attempt = cd.last_attempt,
+    best_attempt = cd.best_attempt,
+    first_student_id = cd.first_student_id,
+    last_student_id = cd.last_student_id,
+    best_student_id = cd.best_student_id,
+    first_points = cd.first_points,
+    last_points = cd.last_points,
+    best_points = cd.best_points,
+    attempt_count = cd.attempt_count,
+    max_final_points = cd.max_final_points,
+    min_final_points = cd.min_final_points,
+    avg_final_points = cd.avg_final_points,
+    avg_right_points = cd.avg_right_points,
+    avg_wrong_points = cd.avg_wrong_points,
+    avg_blank_points = cd.avg_blank_points,
+    avg_answered_count = cd.avg_answered_count,
+    avg_right_count = cd.avg_right_count,
+    avg_wrong_count = cd.avg_wrong_count,
+    avg_blank_count = cd.avg_blank_count,
+    passed_count = cd.passed_count,
+    failed_count = cd.failed_count
+FROM
+    computed_data AS cd
+WHERE
+    cd.assignment_id = ass."id"
+    AND (
+        ass.question_count, ass.max_points,
+        ass.first_attempt_id, ass.last_attempt_id, ass.best_attempt_id,
+        ass.first_attempt, ass.last_attempt, ass.best_attempt,
+        ass.first_student_id, ass.last_student_id, ass.best_student_id,
+        ass.first_points, ass.last_points, ass.best_points,
+        ass.attempt_count, ass.max_final_points, ass.min_final_points,
+        ass.avg_final_points, ass.avg_right_points, ass.avg_wrong_points,
+        ass.avg_blank_points, ass.avg_answered_count, ass.avg_right_count,
+        ass.avg_wrong_count, ass.avg_blank_count, ass.passed_count,
+        ass.failed_count
+    ) IS DISTINCT FROM (
+        cd.question_count, cd.max_points,
+        cd.first_attempt_id, cd.last_attempt_id, cd.best_attempt_id,
+        cd.first_attempt, cd.last_attempt, cd.best_attempt,
+        cd.first_student_id, cd.last_student_id, cd.best_student_id,
+        cd.first_points, cd.last_points, cd.best_points,
+        cd.attempt_count, cd.max_final_points, cd.min_final_points,
+        cd.avg_final_points, cd.avg_right_points, cd.avg_wrong_points,
+        cd.avg_blank_points, cd.avg_answered_count, cd.avg_right_count,
+        cd.avg_wrong_count, cd.avg_blank_count, cd.passed_count,
+        cd.failed_count
+    )
+'''
+
+# Fields written by _ASSIGNMENT_ATTEMPT_DATA_UPDATE
+ASSIGNMENT_ATTEMPT_DATA_FIELDS = [
+    'question_count', 'max_points', 'first_attempt_id', 'last_attempt_id',
+    'best_attempt_id', 'first_attempt', 'last_attempt', 'best_attempt',
+    'first_student_id', 'last_student_id', 'best_student_id',
+    'first_points', 'last_points', 'best_points', 'attempt_count',
+    'max_final_points', 'min_final_points', 'avg_final_points',
+    'avg_right_points', 'avg_wrong_points', 'avg_blank_points',
+    'avg_answered_count', 'avg_right_count', 'avg_wrong_count',
+    'avg_blank_count', 'passed_count', 'failed_count'
+]
+
 
 class AcademyTestsTestTrainingAssignment(models.Model):
     """ Allow users to assign test to training actions, training activities,
@@ -1260,14 +1458,15 @@ class AcademyTestsTestTrainingAssignment(models.Model):
         self._execute_query(sql, notify=True, action='update_attempt_data')
 
     @api.model
-    def _execute_query(self, sql, selection=False, notify=False, action=None):
+    def _execute_query(self, sql, params=None, selection=False, notify=False,
+                       action=None):
         results = []
         action = action or 'SQL'
 
         for attempt in range(MAX_RETRIES):
             try:
                 cursor = self.env.cr
-                cursor.execute(sql)
+                cursor.execute(sql, params)
 
                 if selection:
                     results = cursor.dictfetchall()
@@ -1307,131 +1506,32 @@ class AcademyTestsTestTrainingAssignment(models.Model):
 
         record_set.fast_update_attempt_data()
 
-    @api.model
-    def _get_default_attempt_data(self):
-        return {
-            'question_count': 0,
-            'max_points': 0.0,
-            'first_attempt_id': None,
-            'last_attempt_id': None,
-            'best_attempt_id': None,
-            'first_attempt': None,
-            'last_attempt': None,
-            'best_attempt': None,
-            'first_student_id': None,
-            'last_student_id': None,
-            'best_student_id': None,
-            'first_points': 0.0,
-            'last_points': 0.0,
-            'best_points': 0.0,
-            'attempt_count': 0,
-            'max_final_points': 0.0,
-            'min_final_points': 0.0,
-            'avg_final_points': 0.0,
-            'avg_right_points': 0.0,
-            'avg_wrong_points': 0.0,
-            'avg_blank_points': 0.0,
-            'avg_answered_count': 0,
-            'avg_right_count': 0,
-            'avg_wrong_count': 0,
-            'avg_blank_count': 0,
-            'passed_count': 0,
-            'failed_count': 0,
-        }
-
-    def _compute_attempt_data(self):
-        values = self._get_default_attempt_data()
-
-        scale = self.correction_scale_id
-        values['question_count'] = len(self.test_id.question_ids)
-        values['max_points'] = values['question_count'] * scale.right
-
-        if self.attempt_ids:
-            attempt_count = len(self.attempt_ids)
-            values['attempt_count'] = attempt_count
-
-            first_attempt = self.attempt_ids.sorted(
-                key=lambda r: r.start, reverse=False)[0]
-            values['first_attempt_id'] = first_attempt.id
-            values['first_attempt'] = first_attempt.end
-            values['first_points'] = first_attempt.final_points
-            values['first_student_id'] = \
-                first_attempt.enrolment_id.student_id.id
-
-            last_attempt = self.attempt_ids.sorted(
-                key=lambda r: r.start, reverse=True)[0]
-            values['last_attempt_id'] = last_attempt.id
-            values['last_attempt'] = last_attempt.end
-            values['last_points'] = last_attempt.final_points
-            values['last_student_id'] = \
-                last_attempt.enrolment_id.student_id.id
-
-            best_attempt = self.attempt_ids.sorted(
-                key=lambda r: r.final_points, reverse=True)[0]
-            values['best_attempt_id'] = best_attempt.id
-            values['best_attempt'] = best_attempt.end
-            values['best_points'] = best_attempt.final_points
-            values['best_student_id'] = \
-                best_attempt.enrolment_id.student_id.id
-
-            final_points_list = self.mapped('attempt_ids.final_points')
-            values['max_final_points'] = max(final_points_list)
-            values['min_final_points'] = min(final_points_list)
-            values['avg_final_points'] = \
-                self._safe_division(sum(final_points_list), attempt_count, 0.0)
-
-            right_points_list = self.mapped('attempt_ids.right_points')
-            wrong_points_list = self.mapped('attempt_ids.wrong_points')
-            blank_points_list = self.mapped('attempt_ids.blank_points')
-            values['avg_right_points'] = \
-                self._safe_division(sum(right_points_list), attempt_count, 0.0)
-            values['avg_wrong_points'] = \
-                self._safe_division(sum(wrong_points_list), attempt_count, 0.0)
-            values['avg_blank_points'] = \
-                self._safe_division(sum(blank_points_list), attempt_count, 0.0)
-
-            right_count_list = self.mapped('attempt_ids.right_count')
-            wrong_count_list = self.mapped('attempt_ids.wrong_count')
-            blank_count_list = self.mapped('attempt_ids.blank_count')
-            values['avg_right_count'] = \
-                self._safe_division(sum(right_count_list), attempt_count, 0)
-            values['avg_wrong_count'] = \
-                self._safe_division(sum(wrong_count_list), attempt_count, 0)
-            values['avg_blank_count'] = \
-                self._safe_division(sum(blank_count_list), attempt_count, 0)
-
-            answered_count_list = self.mapped('attempt_ids.answered_count')
-            values['avg_answered_count'] = \
-                self._safe_division(sum(answered_count_list), attempt_count, 0)
-
-            passed_count = len(self.attempt_ids.filtered(lambda r: r.passed))
-            values['passed_count'] = passed_count
-            values['failed_count'] = attempt_count - passed_count
-
-        return values
-
     def fast_update_attempt_data(self):
-        for record in self:
-            values = record._compute_attempt_data()
-            record.write(values)
+        """
+        Updates attempt-related data of the assignments: first, last and best
+        attempts and students, points, averages and counts. All of them are
+        computed in a single grouped query over the active attempts and only
+        the rows whose values change are written.
+        """
+
+        if not self:
+            return
 
-    @staticmethod
-    def _safe_division(dividend, divisor, default=0.0):
         try:
-            result = dividend / divisor
-            result = type(default)(result)
-        except ZeroDivisionError:
-            message = (f'Warning: Division by zero. '
-                       f'Returning {default} as the result.')
-            _logger.warning(message)
-            result = default
-        except (ValueError, TypeError) as e:
-            message = (f'Warning: Invalid input {e}. '
-                       f'Returning {default} as the result.')
-            _logger.warning(message)
-            result = default
+            self.check_access_rights('write')
+        except AccessError:
+            message = _('You do not have the necessary permissions to update '
+                        'this data.')
+            raise UserError(message)
 
-        return result
+        self.flush()
+
+        params = {'ids': self.ids, 'uid': self.env.uid}
+        sql = _ASSIGNMENT_ATTEMPT_DATA_UPDATE
+        self._execute_query(sql, params, notify=True,
+                            action='update_attempt_data')
+
+        self.invalidate_cache(ASSIGNMENT_ATTEMPT_DATA_FIELDS, self.ids)
 
     # -------------------------------------------------------------------------
     # Public methods
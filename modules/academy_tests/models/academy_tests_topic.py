@@ -5,7 +5,7 @@ This module contains the academy.tests.topic Odoo model which stores
 all academy tests topic attributes and behavior.
 """
 
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from odoo.tools.translate import _
 from odoo.osv.expression import NEGATIVE_TERM_OPERATORS as NEGATIVE
 from odoo.osv.expression import TRUE_DOMAIN, FALSE_DOMAIN
@@ -424,6 +424,62 @@ class AcademyTestsTopic(models.Model):
 
         return result
 
+    @api.model
+    @tools.ormcache('topic_id')
+    def _get_keyword_matcher(self, topic_id):
+        """ Builds a single regular expression with all the category keywords
+        in the given topic. It has one lookahead group by category, so all the
+        categories can be found in a single scan, even if they overlap.
+
+        The result is cached, categories clear the cache when their keywords
+        change. If keywords can not be combined, a list with one compiled
+        expression by category will be returned instead.
+
+        Returns:
+            tuple: (combined regex or None, [(category ID, regex), ...])
+        """
+
+        msg = _('Error on autocategorize. Keywords: {}, Error: {}')
+
+        category_obj = self.env['academy.tests.category'].sudo()
+        domain = [('topic_id', '=', topic_id), ('keywords', '!=', False)]
+
+        patterns = []
+        for category in category_obj.search(domain):
+            keywords = [kw.strip() for kw in category.keywords.split(',')]
+
+            valid = []
+            for keyword in filter(None, keywords):
+                keyword = '(?:\\b' + keyword + '\\b)'
+                try:
+                    re.compile(keyword, re.IGNORECASE)
+                    valid.append(keyword)
+                except Exception as ex:
+                    _logger.warning(msg.format(category.keywords, str(ex)))
+
+            if valid:
+                patterns.append((category.id, '|'.join(valid)))
+
+        compiled = [(cid, re.compile(pattern, re.IGNORECASE))
+                    for cid, pattern in patterns]
+
+        if not patterns:
+            return None, compiled
+
+        # The first lookahead allows the engine to skip the positions where
+        # there is nothing to capture
+        guard = '(?=' + '|'.join(pattern for cid, pattern in patterns) + ')'
+        groups = ''.join('(?:(?=(?P<c{}>{}))|)'.format(cid, pattern)
+                         for cid, pattern in patterns)
+
+        try:
+            combined = re.compile(guard + groups, re.IGNORECASE)
+        except Exception as ex:
+            _logger.debug('Keywords can not be combined: {}'.format(ex))
+            combined = None
+
+        return combined, compiled
+
     def search_for_categories(self, _in_string):
         """ Search partial matches for all category keywords in given string
         and returns that categories
@@ -431,33 +487,37 @@ class AcademyTestsTopic(models.Model):
         Returned value wille be a dictionary {topic_id: [categorory_id1, ...]}
         """
 
-        msg = _('Error on autocategorize. Text: {}, Keywords: {}, Error: {}')
         result = {}
         if isinstance(_in_string, str):
             _in_string = [_in_string]
 
+        _in_string = [item for item in _in_string or [] if item]
+
         # STEP 1: Run over topic recordset
         for record in self:
 
             result[record.id] = []
-            cat_items = record.category_ids
-
-            # STEP 2: Run over categories with keywords in current topic
-            for catitem in cat_items.filtered(lambda x: x.keywords):
-
-                keywords = catitem.keywords.split(',')
-                keywords = ['\\b' + kw.strip() + '\\b' for kw in keywords]
-
-                # STEP 3: Run over current category keywords
-                for keyword in keywords:
-                    try:
-                        regex = re.compile(keyword, re.IGNORECASE)
-                        if self.findall(regex, _in_string):
-                            result[record.id].append(catitem.id)
-
-                    except Exception as ex:
-                        _logger.warning(msg.format(
-                            _in_string, catitem.keywords, str(ex)))
+            combined, compiled = self._get_keyword_matcher(record.id)
+
+            # STEP 2: Scan each string once to find all categories
+            if combined:
+                found = set()
+                for stritem in _in_string:
+                    for match in combined.finditer(stritem):
+                        found.update(
+                            key for key, value in match.groupdict().items()
+                            if value is not None)
+
+                result[record.id] = [
+                    cid for cid, regex in compiled
+                    if 'c{}'.format(cid) in found
+                ]
+
+            # STEP 3: Keywords could not be combined, one scan by category
+            else:
+                for cid, regex in compiled:
+                    if self.findall(regex, _in_string):
+                        result[record.id].append(cid)
 
         return result
 
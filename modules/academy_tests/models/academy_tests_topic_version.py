@@ -247,6 +247,25 @@ class AcademyTestsTopicVersion(models.Model):
 
         return result
 
+    def write(self, values):
+        """ Questions are filtered by topic version in random lines, their
+        candidate pools must be discarded when versions change
+        """
+
+        result = super(AcademyTestsTopicVersion, self).write(values)
+
+        if {'topic_id', 'active'} & values.keys():
+            self.env['academy.tests.question'].bump_bank_generation()
+
+        return result
+
+    def unlink(self):
+        result = super(AcademyTestsTopicVersion, self).unlink()
+
+        self.env['academy.tests.question'].bump_bank_generation()
+
+        return result
+
     _sql_constraints = [
         (
             'unique_version_by_topic',
@@ -5,6 +5,10 @@ This module extends the academy.training.activity Odoo model
 """
 
 from odoo import models, fields, api
+from odoo.addons.academy_base.models.utils.custom_model_fields import \
+    Many2manyView
+from .academy_tests_question_training_activity_rel import \
+    AVAILABLE_QUESTION_ACTIVITY_REFRESH_ON
 
 from logging import getLogger
 
@@ -110,7 +114,7 @@ class AcademyTrainingActivity(models.Model):
         for record in self:
             record.template_count = len(record.template_ids)
 
-    available_question_ids = fields.Many2manyView(
+    available_question_ids = Many2manyView(
         string='Available questions',
         required=False,
         readonly=True,
@@ -118,13 +122,16 @@ class AcademyTrainingActivity(models.Model):
         default=None,
         help='Show questions available in the module',
         comodel_name='academy.tests.question',
-        relation='academy_tests_question_training_activity_rel',
+        relation='academy_training_activity_available_question',
         column1='training_activity_id',
         column2='question_id',
         domain=[],
         context={},
         limit=None,
-        copy=False
+        copy=False,
+        materialized=True,
+        source='academy_tests_question_training_activity_rel',
+        refresh_on=AVAILABLE_QUESTION_ACTIVITY_REFRESH_ON
     )
 
     def create_test_template(self, no_open=False):
@@ -6,6 +6,10 @@ This module extends the academy.training.module Odoo model
 
 from odoo import models, fields, api
 from odoo.tools.translate import _
+from odoo.addons.academy_base.models.utils.custom_model_fields import \
+    Many2manyView
+from .academy_tests_question_training_activity_rel import \
+    AVAILABLE_QUESTION_MODULE_REFRESH_ON
 
 from logging import getLogger
 from datetime import datetime
@@ -137,7 +141,7 @@ class AcademyTrainingModule(models.Model):
         copy=False
     )
 
-    available_question_ids = fields.Many2manyView(
+    available_question_ids = Many2manyView(
         string='Available questions',
         required=False,
         readonly=True,
@@ -145,14 +149,41 @@ class AcademyTrainingModule(models.Model):
         default=None,
         help='Show questions available in the module',
         comodel_name='academy.tests.question',
-        relation='academy_tests_question_training_module_rel',
+        relation='academy_training_module_available_question',
         column1='training_module_id',
         column2='question_id',
         domain=[],
         context={},
-        limit=None
+        limit=None,
+        materialized=True,
+        source='academy_tests_question_training_module_rel',
+        refresh_on=AVAILABLE_QUESTION_MODULE_REFRESH_ON
     )
 
+    @api.model
+    def check_available_questions(self, fix=True):
+        """ Compares the stored available questions of the modules and the
+        activities with the SQL VIEWs they are built from
+
+        Args:
+            fix (bool): refresh the whole relation when it does not match
+
+        Returns:
+            dict: number of missing rows and extra rows by model
+        """
+
+        result = {}
+
+        for model in ('academy.training.module', 'academy.training.activity'):
+            target_obj = self.env[model]
+            field = target_obj._fields['available_question_ids']
+
+            result[model] = field.check_consistency(self.env.cr, fix=fix)
+            if fix and any(result[model]):
+                target_obj.invalidate_cache(['available_question_ids'])
+
+        return result
+
     @staticmethod
     def _template_name(target_set, name):
         if not name:
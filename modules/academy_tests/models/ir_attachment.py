@@ -48,6 +48,46 @@ class IrAttachment(models.Model):
 
         return _super.create(vals_list)
 
+    def write(self, values):
+        """ Attachments can be linked to questions from here, random line
+        candidate pools must be discarded then
+        """
+
+        result = super(IrAttachment, self).write(values)
+
+        if 'question_ids' in values:
+            self.env['academy.tests.question'].bump_bank_generation()
+
+        return result
+
+    def unlink(self):
+        """ Removed question attachments discard random line candidate pools
+        """
+
+        linked = self._are_linked_to_questions()
+
+        result = super(IrAttachment, self).unlink()
+
+        if linked:
+            self.env['academy.tests.question'].bump_bank_generation()
+
+        return result
+
+    def _are_linked_to_questions(self):
+        if not self.ids:
+            return False
+
+        sql = '''
+            SELECT EXISTS (
+                SELECT 1
+                FROM academy_tests_question_ir_attachment_rel
+                WHERE attachment_id = ANY ( %s )
+            )
+        '''
+        self.env.cr.execute(sql, (self.ids,))
+
+        return self.env.cr.fetchone()[0]
+
     def _has_been_called_from_question_import_wizard(self):
         return self.env.context.get('import_wizard', False)
 
@@ -111,8 +111,6 @@ class ResUsers(models.Model):
         mail_template = self.env.ref(DTPL)
         question_obj = self.env['academy.tests.question']
 
-        question_obj.ensure_checksums()
-
         domain = [('duplicated_ids', '!=', False)]
         question_set = question_obj.search(domain)
 
@@ -96,3 +96,25 @@ def fix_established(operator, operand):
             operator == '>=' if operator == '!=' else '='
 
     return operator, operand
+
+
+class ChunkBuffer(object):
+    """ Write-only, non seekable file object which keeps the written bytes
+    until they are popped, it allows to yield a document or a ``ZipFile``
+    archive while it is being written
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+""" MinHash
+
+This module contains the functions used to build the MinHash signatures and
+the LSH buckets of the near-duplicate question index. Signatures only depend
+on the text, so they can be compared across databases and Python versions.
+"""
+
+from hashlib import blake2b
+from random import Random
+from re import compile as re_compile, UNICODE
+from unicodedata import normalize, category
+
+# Number of hash functions (signature length), it must be BANDS * ROWS
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 16
+MINHASH_ROWS = 4
+
+# Words by shingle, texts with less words make a single shingle
+SHINGLE_SIZE = 3
+
+# Mersenne prime used by the (a * x + b) mod p universal hash functions
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Fixed seed, the coefficients must be the same each time
+_random = Random(20240101)
+COEFFICIENTS = [
+    (_random.randrange(1, MERSENNE_PRIME), _random.randrange(MERSENNE_PRIME))
+    for index in range(0, MINHASH_PERMUTATIONS)
+]
+
+TAG_RE = re_compile(r'<[^>]*>')
+WORD_RE = re_compile(r'\w+', UNICODE)
+
+
+def _hash64(value):
+    digest = blake2b(value.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=False)
+
+
+def normalize_words(text):
+    """ Lowercase words of the given text, without HTML tags and accents
+
+    Arguments:
+        text {str} -- text to be normalized
+
+    Returns:
+        list -- words in the text
+    """
+
+    text = TAG_RE.sub(' ', text or '').lower()
+    text = normalize('NFKD', text)
+    text = ''.join(char for char in text if category(char) != 'Mn')
+
+    return WORD_RE.findall(text)
+
+
+def shingles(texts):
+    """ Set with the hashes of the word shingles of the given texts, each
+    text is shingled by itself.
+
+    Arguments:
+        texts {list} -- texts, like the statement and the answers
+
+    Returns:
+        set -- 61 bit hashes of the shingles
+    """
+
+    result = set()
+
+    for text in texts:
+        words = normalize_words(text)
+        if not words:
+            continue
+
+        size = min(len(words), SHINGLE_SIZE)
+        for index in range(0, len(words) - size + 1):
+            shingle = ' '.join(words[index:index + size])
+            result.add(_hash64(shingle) % MERSENNE_PRIME)
+
+    return result
+
+
+def signature(hashes):
+    """ MinHash signature of a set of shingle hashes
+
+    Arguments:
+        hashes {set} -- value returned by ``shingles``
+
+    Returns:
+        list -- MINHASH_PERMUTATIONS integers or None if there is no shingle
+    """
+
+    if not hashes:
+        return None
+
+    return [
+        min((a * x + b) % MERSENNE_PRIME for x in hashes)
+        for a, b in COEFFICIENTS
+    ]
+
+
+def buckets(values):
+    """ LSH buckets of a signature, one by band. The band index is hashed
+    along with its rows, so the buckets of different bands never collide.
+
+    Arguments:
+        values {list} -- value returned by ``signature``
+
+    Returns:
+        list -- MINHASH_BANDS signed 64 bit integers
+    """
+
+    result = []
+
+    for band in range(0, MINHASH_BANDS):
+        rows = values[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]
+        key = '{}:{}'.format(band, ','.join(str(row) for row in rows))
+        result.append(_hash64(key) - (1 << 63))
+
+    return result
+
+
+def similarity(left, right):
+    """ Estimated Jaccard similarity of two signatures """
+
+    if not left or not right:
+        return 0.0
+
+    equal = sum(1 for x, y in zip(left, right) if x == y)
+
+    return equal / float(MINHASH_PERMUTATIONS)
@@ -77,141 +77,141 @@ FIND_MOST_USED_QUESTION_CATEGORY_VALUE_SQL = '''
 # PERFORM CHANGES IN DATABASE
 # This will be used to sort by random keeping grouped questions with the same
 # attachment or attachments. It packes ids in an SQL array, sort recordset and
-# unnest the arrays.
+# unnest the arrays. Only links of the given tests are read, so any number of
+# tests can be shuffled at once. When a seed is given, random indexes are
+# replaced by a hash of the seed and the question (or attachments), so the
+# same seed always gives the same order.
+# Params: test_ids (INTEGER[]), seed (VARCHAR or NULL)
 # -----------------------------------------------------------------------------
 
 ACADEMY_TESTS_SHUFFLE = '''
-    WITH target_tests AS (
-        -- Set target tests using ID
-        SELECT UNNEST ( ARRAY [{}] ) :: INTEGER AS test_id
+    WITH target_links AS (
+        -- Question links of the target tests
+        SELECT
+            rel."id" AS link_id,
+            rel.test_id,
+            rel.question_id,
+            rel.test_block_id,
+            rel."sequence"
+        FROM
+            academy_tests_test_question_rel AS rel
+        WHERE
+            rel.test_id = ANY ( %(test_ids)s )
     ),
 
     block_order AS (
-        -- Computes sequence of the first test block in test exercise
+        -- Sequence of each test block in its test, given by the position of
+        -- its first question
         SELECT
+            test_id,
             test_block_id,
-            ROW_NUMBER ( ) OVER (
-                ORDER BY "sequence" ASC ) :: INTEGER AS "sequence"
-        FROM (
-            -- Computes sequence by test ID and subsequence by test block
-            SELECT
-                test_block_id,
-                ROW_NUMBER ( ) OVER (
-                    PARTITION BY test_id ORDER BY test_id, "sequence"
-                ) AS "sequence",
-                ROW_NUMBER ( ) OVER (
-                    PARTITION BY test_id, test_block_id
-                    ORDER BY test_id, "sequence"
-                ) :: INTEGER AS "subsequence"
-            FROM
-                academy_tests_test_question_rel
-            WHERE
-                test_block_id IS NOT NULL
-            ) AS src
+            DENSE_RANK ( ) OVER (
+                PARTITION BY test_id
+                ORDER BY MIN ( "sequence" ), test_block_id
+            ) :: INTEGER AS "sequence"
+        FROM
+            target_links
         WHERE
-            "subsequence" = 1
+            test_block_id IS NOT NULL
+        GROUP BY
+            test_id,
+            test_block_id
     ),
 
     block_grouping AS (
-        -- Computes new question link sequences grouping by test, and block
+        -- Questions without block are placed at the beginning
         SELECT
-            "id" AS link_id,
+            tl.link_id,
+            tl."sequence" AS old_sequence,
             COALESCE ( bo."sequence", 0 ) :: INTEGER AS block_sequence
         FROM
-            academy_tests_test_question_rel AS rel
+            target_links AS tl
         LEFT JOIN block_order AS bo
-            ON bo.test_block_id = rel.test_block_id
-        ORDER BY
-            bo."sequence" ASC NULLS FIRST,
-            rel."sequence"
+            ON bo.test_id = tl.test_id
+            AND bo.test_block_id = tl.test_block_id
     ),
 
     question_attachment_relationship AS (
         -- Internal relationship between questions and attachments with the
         -- latter grouped
         SELECT
-            rel.test_id,
-            rel."id" AS link_id,
-            ARRAY_AGG ( ira_rel.attachment_id ) AS attachs
+            tl.test_id,
+            tl.link_id,
+            ARRAY_AGG (
+                ira_rel.attachment_id ORDER BY ira_rel.attachment_id
+            ) AS attachs
         FROM
-            academy_tests_question AS atq
-        INNER JOIN academy_tests_test_question_rel AS rel
-            ON rel.question_id = atq."id"
+            target_links AS tl
         INNER JOIN academy_tests_question_ir_attachment_rel AS ira_rel
-            ON ira_rel.question_id = atq."id"
-        INNER JOIN target_tests AS tt
-            ON tt.test_id = rel.test_id
+            ON ira_rel.question_id = tl.question_id
         GROUP BY
-            rel.test_id,
-            rel."id"
-        ),
+            tl.test_id,
+            tl.link_id
+    ),
 
-    without_attachments AS (
-        -- Obtain all the questions with their attachments,
-        -- grouping the IDs of the latter and assigning them a random index
+    full_set_of_questions AS (
+        -- Questions with the same attachments share the random index, so
+        -- they will be kept together
         SELECT
-            rel.test_id,
-            rel."id" AS link_id
+            qar.test_id,
+            qar.link_id,
+            COALESCE (
+                (
+                    'x' || SUBSTR ( MD5 (
+                        %(seed)s || ':a:' ||
+                        ARRAY_TO_STRING ( qar.attachs, ',' )
+                    ), 1, 12 )
+                )::BIT(48)::BIGINT::FLOAT,
+                FIRST_VALUE ( RANDOM ( ) ) OVER (
+                    PARTITION BY qar.test_id, qar.attachs
+                    ORDER BY qar.link_id
+                )
+            ) AS "index"
         FROM
-            academy_tests_question AS atq
-        INNER JOIN academy_tests_test_question_rel AS rel
-            ON rel.question_id = atq."id"
-        LEFT JOIN academy_tests_question_ir_attachment_rel AS ira_rel
-            ON ira_rel.question_id = atq."id"
-        INNER JOIN target_tests AS tt
-            ON tt.test_id = rel.test_id
-        WHERE
-            ira_rel.question_id IS NULL
-        ),
+            question_attachment_relationship AS qar
 
-    with_nested_attachments AS (
-        -- Get all questions without attachments and assigning them a random
-        -- index
-        SELECT
-            test_id,
-            attachs,
-            ARRAY_AGG ( link_id ) AS question_ids,
-            RANDOM( ) AS "index"
-        FROM
-            question_attachment_relationship
-        GROUP BY
-            test_id,
-            attachs
-        ORDER BY
-            random( )
-        ),
+        UNION ALL
 
-    full_set_of_questions AS (
-        -- Make union including the questions with and without attachments
-        SELECT
-            test_id,
-            "unnest" ( question_ids ) AS link_id,
-            "attachs" AS attachment_ids,
-            "index"
-        FROM
-            with_nested_attachments UNION ALL
         SELECT
-            test_id,
-            link_id,
-            NULL,
-            random( ) AS "index"
+            tl.test_id,
+            tl.link_id,
+            COALESCE (
+                (
+                    'x' || SUBSTR ( MD5 (
+                        %(seed)s || ':q:' || tl.question_id::VARCHAR
+                    ), 1, 12 )
+                )::BIT(48)::BIGINT::FLOAT,
+                RANDOM ( )
+            ) AS "index"
         FROM
-            without_attachments
-        ),
+            target_links AS tl
+        WHERE
+            NOT EXISTS (
+                SELECT
+                    1
+                FROM
+                    question_attachment_relationship AS qar
+                WHERE
+                    qar.link_id = tl.link_id
+            )
+    ),
 
     new_sequences AS (
         -- Assign new sequence numbers using previous generated random indexes
         SELECT
-            test_id,
             soq.link_id,
             ROW_NUMBER ( ) OVER (
-                PARTITION BY test_id
-                ORDER BY test_id DESC, block_sequence ASC, "index" ASC
-            ) AS "sequence",
-            attachment_ids
+                PARTITION BY soq.test_id
+                ORDER BY
+                    bg.block_sequence ASC,
+                    soq."index" ASC,
+                    bg.old_sequence ASC,
+                    soq.link_id ASC
+            ) AS "sequence"
         FROM
             full_set_of_questions AS soq
-        INNER JOIN block_grouping AS bg ON soq.link_id = bg.link_id
+        INNER JOIN block_grouping AS bg
+            ON soq.link_id = bg.link_id
     )
 
     UPDATE academy_tests_test_question_rel AS links
@@ -220,6 +220,7 @@ ACADEMY_TESTS_SHUFFLE = '''
         new_sequences AS nsq
     WHERE
         nsq.link_id = links."id"
+        AND links."sequence" IS DISTINCT FROM nsq."sequence"
 '''
 
 # PERFORM CHANGES IN DATABASE
@@ -267,82 +268,325 @@ ACADEMY_TESTS_ARRANGE_BLOCKS = '''
 '''
 
 # PERFORM CHANGES IN DATABASE
-# This will be used to sort by random keeping grouped questions with the same
-# attachment or attachments. It packes ids in an SQL array, sort recordset and
-# unnest the arrays.
+# Computes the checksum of the given questions and stores the changed ones. It
+# calls the function created by ``data/academy_tests_question_checksum.sql``,
+# which is also used by the triggers that keep checksums up to date. Returns
+# the number of updated questions. The ``%s`` must be a list of question IDs.
 # -----------------------------------------------------------------------------
 
 ACADEMY_QUESTION_ENSURE_CHECKSUMS = '''
-    WITH answers AS (
+    SELECT academy_tests_question_checksum_refresh ( %s :: INTEGER [] )
+'''
+
+# SELECT RANDOM CANDIDATES: used in academy.tests.random.line
+# Draws up to ``LIMIT`` random questions from the candidate pool of a single
+# random line. Several of these subqueries are joined using ``UNION ALL`` to
+# resolve all the lines of a template in a single round-trip. The ``draw``
+# column allows to restore the random order in Python. The ``{from_clause}``
+# and ``{where_clause}`` must be filled with the result of ``Query.get_sql``.
+# -----------------------------------------------------------------------------
+
+ACADEMY_RANDOM_LINE_CANDIDATES = '''
+    (
         SELECT
-            atq."id" AS question_id,
-            ARRAY_AGG (
-                CASE WHEN ans.is_correct
-                    THEN 'x'
-                    ELSE '#'
-                END || ans."name"
-                ORDER BY ans."sequence" ASC, ans."id" ASC
-            )::VARCHAR AS answers
+            %s :: INTEGER AS line_id,
+            "academy_tests_question"."id" AS question_id,
+            RANDOM ( ) AS draw
         FROM
-            academy_tests_question AS atq
-            INNER JOIN academy_tests_answer AS ans
-                ON atq."id" = ans.question_id
-        GROUP BY
-            atq."id"
-    ), versions AS (
+            {from_clause}
+        WHERE
+            {where_clause}
+        ORDER BY
+            draw ASC
+        LIMIT %s
+    )
+'''
+
+# PERFORM CHANGES IN DATABASE
+# Bulk insert of question links, used by academy.tests.random.template when it
+# creates several tests at once. Each parameter must be an array and all of
+# them must have the same length, one item by link. Returns the new link IDs.
+# -----------------------------------------------------------------------------
+
+ACADEMY_TESTS_INSERT_QUESTION_LINKS = '''
+    INSERT INTO academy_tests_test_question_rel (
+        test_id,
+        question_id,
+        "sequence",
+        request_id,
+        test_block_id,
+        perform,
+        create_uid,
+        create_date,
+        write_uid,
+        write_date
+    )
+    SELECT
+        test_id,
+        question_id,
+        "sequence",
+        request_id,
+        test_block_id,
+        'link',
+        %(uid)s,
+        ( NOW ( ) AT TIME ZONE 'UTC' ),
+        %(uid)s,
+        ( NOW ( ) AT TIME ZONE 'UTC' )
+    FROM
+        UNNEST (
+            %(test_ids)s :: INTEGER [],
+            %(question_ids)s :: INTEGER [],
+            %(sequences)s :: INTEGER [],
+            %(request_ids)s :: INTEGER [],
+            %(test_block_ids)s :: INTEGER []
+        ) AS links (
+            test_id,
+            question_id,
+            "sequence",
+            request_id,
+            test_block_id
+        )
+    RETURNING "id"
+'''
+
+# COMPUTE ATTEMPT SCORES: used in academy.tests.attempt
+# Counts the final answers of the given attempts by kind and the number of
+# questions in their tests. It uses the same criteria as the attempt fields:
+# final answers are the active ones with prevalence 1 and only the links to
+# active questions are counted. The ``%s`` must be a list of attempt IDs.
+# -----------------------------------------------------------------------------
+
+ACADEMY_TESTS_ATTEMPT_SCORE_COUNTS = '''
+    WITH targets AS (
         SELECT
-            atq."id" AS question_id,
-            ARRAY_AGG (
-                rel."topic_version_id" ORDER BY rel."topic_version_id" ASC
-            ) :: INT [] AS version_ids
+            att."id" AS attempt_id,
+            att.test_id,
+            att."right",
+            att.wrong,
+            att.blank
         FROM
-            academy_tests_question AS atq
-            INNER JOIN academy_tests_question_topic_version_rel AS rel
-                ON rel."question_id" = atq."id"
-        GROUP BY
-            atq."id"
-    ), attachments AS (
+            academy_tests_attempt AS att
+        WHERE
+            att."id" = ANY ( %s )
+    ), questions AS (
         SELECT
-            atq."id" AS question_id,
-            ARRAY_AGG (
-                rel."attachment_id" ORDER BY rel."attachment_id" ASC
-            ) :: INT [] AS attachment_ids
+            tgt.attempt_id,
+            COUNT ( atq."id" ) :: INTEGER AS question_count
         FROM
-            academy_tests_question AS atq
-            INNER JOIN academy_tests_question_ir_attachment_rel AS rel
-                ON rel."question_id" = atq."id"
+            targets AS tgt
+        INNER JOIN academy_tests_test_question_rel AS rel
+            ON rel.test_id = tgt.test_id
+        INNER JOIN academy_tests_question AS atq
+            ON atq."id" = rel.question_id AND atq.active
         GROUP BY
-            atq."id"
-    ), value_list AS (
+            tgt.attempt_id
+    ), answers AS (
         SELECT
-            atq."id" AS question_id,
-            COALESCE(NULLIF( "preamble", '' ), 'Empty')::VARCHAR AS preamble,
-            "name",
-            answers,
-            COALESCE(version_ids, ARRAY[0]::INT[])::INT[] AS version_ids,
-            COALESCE(attachment_ids, ARRAY[0]::INT[])::INT[] AS attachment_ids
+            tgt.attempt_id,
+            COUNT ( * ) FILTER (
+                WHERE ans.user_action != 'blank'
+            ) :: INTEGER AS answered_count,
+            COUNT ( * ) FILTER (
+                WHERE ans.user_action = 'doubt'
+            ) :: INTEGER AS doubt_count,
+            COUNT ( * ) FILTER (
+                WHERE ans.user_action = 'answer'
+            ) :: INTEGER AS answer_count,
+            COUNT ( * ) FILTER (
+                WHERE COALESCE ( ata.is_correct, FALSE )
+            ) :: INTEGER AS right_count,
+            COUNT ( * ) FILTER (
+                WHERE NOT COALESCE ( ata.is_correct, FALSE )
+                    AND ans.user_action != 'blank'
+            ) :: INTEGER AS wrong_count
         FROM
-            academy_tests_question AS atq
-            INNER JOIN answers AS ans
-                ON ans."question_id" = atq."id"
-            LEFT JOIN versions AS vers
-                ON vers."question_id" = atq."id"
-            LEFT JOIN attachments AS att
-                ON att."question_id" = atq."id"
-    ), computed_md5 AS (
+            targets AS tgt
+        INNER JOIN academy_tests_attempt_answer AS ans
+            ON ans.attempt_id = tgt.attempt_id
+        LEFT JOIN academy_tests_answer AS ata
+            ON ata."id" = ans.answer_id
+        WHERE
+            ans.prevalence = 1
+            AND ans.active
+        GROUP BY
+            tgt.attempt_id
+    )
+    SELECT
+        tgt.attempt_id,
+        tgt."right",
+        tgt.wrong,
+        tgt.blank,
+        COALESCE ( qst.question_count, 0 ) AS question_count,
+        COALESCE ( ans.answered_count, 0 ) AS answered_count,
+        COALESCE ( ans.doubt_count, 0 ) AS doubt_count,
+        COALESCE ( ans.answer_count, 0 ) AS answer_count,
+        COALESCE ( ans.right_count, 0 ) AS right_count,
+        COALESCE ( ans.wrong_count, 0 ) AS wrong_count
+    FROM
+        targets AS tgt
+    LEFT JOIN questions AS qst
+        ON qst.attempt_id = tgt.attempt_id
+    LEFT JOIN answers AS ans
+        ON ans.attempt_id = tgt.attempt_id
+'''
+
+
+# PERFORM CHANGES IN DATABASE
+# Chains the given questions, each one will depend on the previous one. This is
+# used by the import wizards to resolve sequential dependencies after all the
+# questions have been created at once. The ``%s`` must be a list of question
+# IDs sorted in the dependency order.
+# -----------------------------------------------------------------------------
+
+ACADEMY_QUESTION_CHAIN_DEPENDENCIES = '''
+    WITH chain AS (
         SELECT
-          question_id,
-            UPPER(MD5(
-                preamble || '; ' ||
-                "name" || '; ' ||
-                ARRAY_TO_STRING(answers::VARCHAR[], '; ')::VARCHAR || '; ' ||
-                ARRAY_TO_STRING(version_ids, '; ')::VARCHAR ||
-                ARRAY_TO_STRING(attachment_ids, '; ')::VARCHAR
-            ))::VARCHAR AS md5
-        FROM value_list
+            ids.question_id,
+            LAG ( ids.question_id ) OVER ( ORDER BY ids.position )
+                AS depends_on_id
+        FROM
+            UNNEST ( %s :: INTEGER [] ) WITH ORDINALITY
+                AS ids ( question_id, position )
     )
     UPDATE academy_tests_question AS atq
-    SET checksum = "md5"
-    FROM computed_md5 as cmp
-    WHERE cmp."question_id" = atq."id"
+    SET depends_on_id = chain.depends_on_id
+    FROM
+        chain
+    WHERE
+        atq."id" = chain.question_id
+        AND chain.depends_on_id IS NOT NULL
+        AND atq.depends_on_id IS DISTINCT FROM chain.depends_on_id
+'''
+
+
+# VALIDATE ANSWER SHEETS: used in academy.tests.attempt
+# Returns the answer sheet entries which do not belong to the test of their
+# attempt, or whose answer does not belong to the linked question. All the
+# parameters must be arrays with the same length, one item by entry, and the
+# answer must be NULL for blanks.
+# -----------------------------------------------------------------------------
+
+ACADEMY_TESTS_ATTEMPT_SHEET_CHECK = '''
+    SELECT
+        sheet.attempt_id,
+        sheet.question_link_id,
+        sheet.answer_id
+    FROM
+        UNNEST (
+            %(attempt_ids)s :: INTEGER [],
+            %(link_ids)s :: INTEGER [],
+            %(answer_ids)s :: INTEGER []
+        ) AS sheet ( attempt_id, question_link_id, answer_id )
+    LEFT JOIN academy_tests_attempt AS att
+        ON att."id" = sheet.attempt_id
+    LEFT JOIN academy_tests_test_question_rel AS rel
+        ON rel."id" = sheet.question_link_id
+        AND rel.test_id = att.test_id
+    LEFT JOIN academy_tests_answer AS ans
+        ON ans."id" = sheet.answer_id
+        AND ans.question_id = rel.question_id
+    WHERE
+        rel."id" IS NULL
+        OR ( sheet.answer_id IS NOT NULL AND ans."id" IS NULL )
+'''
+
+
+# PERFORM CHANGES IN DATABASE
+# Bulk insert of attempt answers, used by academy.tests.attempt to store answer
+# sheets and to fill the questions left unanswered when attempts are closed.
+# The answer sheet parameters must be arrays with the same length, one item by
+# answer. A blank answer will also be inserted for each link of the tests of
+# ``blank_attempt_ids`` attempts which has not been answered yet, links to
+# archived questions are skipped and only the active final answers (prevalence
+# 1) count, as in the score counts. Answer prevalence must be up to date.
+# Blanks are inserted with prevalence 1.
+# -----------------------------------------------------------------------------
+
+ACADEMY_TESTS_ATTEMPT_INSERT_ANSWERS = '''
+    WITH sheet AS (
+        SELECT
+            attempt_id,
+            question_link_id,
+            answer_id,
+            user_action,
+            9999 AS prevalence
+        FROM
+            UNNEST (
+                %(attempt_ids)s :: INTEGER [],
+                %(link_ids)s :: INTEGER [],
+                %(answer_ids)s :: INTEGER [],
+                %(user_actions)s :: VARCHAR []
+            ) AS sheet ( attempt_id, question_link_id, answer_id, user_action )
+    ), blanks AS (
+        SELECT
+            att."id" AS attempt_id,
+            rel."id" AS question_link_id,
+            NULL :: INTEGER AS answer_id,
+            'blank' :: VARCHAR AS user_action,
+            1 AS prevalence
+        FROM
+            academy_tests_attempt AS att
+        INNER JOIN academy_tests_test_question_rel AS rel
+            ON rel.test_id = att.test_id
+        INNER JOIN academy_tests_question AS atq
+            ON atq."id" = rel.question_id AND atq.active
+        WHERE
+            att."id" = ANY ( %(blank_attempt_ids)s :: INTEGER [] )
+            AND NOT EXISTS (
+                SELECT
+                    1
+                FROM
+                    academy_tests_attempt_answer AS ans
+                WHERE
+                    ans.attempt_id = att."id"
+                    AND ans.question_link_id = rel."id"
+                    AND ans.prevalence = 1
+                    AND ans.active
+            )
+            AND NOT EXISTS (
+                SELECT
+                    1
+                FROM
+                    sheet
+                WHERE
+                    sheet.attempt_id = att."id"
+                    AND sheet.question_link_id = rel."id"
+            )
+    ), entries AS (
+        SELECT * FROM sheet
+        UNION ALL
+        SELECT * FROM blanks
+    )
+    INSERT INTO academy_tests_attempt_answer (
+        attempt_id,
+        question_link_id,
+        link_sequence,
+        answer_id,
+        user_action,
+        prevalence,
+        active,
+        instant,
+        create_uid,
+        create_date,
+        write_uid,
+        write_date
+    )
+    SELECT
+        entries.attempt_id,
+        entries.question_link_id,
+        rel."sequence",
+        entries.answer_id,
+        entries.user_action,
+        entries.prevalence,
+        TRUE,
+        ( NOW ( ) AT TIME ZONE 'UTC' ),
+        %(uid)s,
+        ( NOW ( ) AT TIME ZONE 'UTC' ),
+        %(uid)s,
+        ( NOW ( ) AT TIME ZONE 'UTC' )
+    FROM
+        entries
+    INNER JOIN academy_tests_test_question_rel AS rel
+        ON rel."id" = entries.question_link_id
+    RETURNING attempt_id
 '''
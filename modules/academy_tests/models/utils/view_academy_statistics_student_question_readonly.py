@@ -104,3 +104,260 @@ ACADEMY_STATISTICS_STUDENT_QUESTION_READONLY_MODEL = '''
     FROM absolute_data
     WHERE COALESCE(attempts, 0) > 0
 '''
+
+
+# Stored statistics:
+# Computes the same rows as the previous query for the given students and
+# questions (all of them when NULL) and synchronizes the stored ones.
+# Percentages are stored to allow sorting and filtering by them.
+# -----------------------------------------------------------------------------
+ACADEMY_STATISTICS_STUDENT_QUESTION_REFRESH = '''
+    WITH scoped_attempt AS (
+        SELECT
+            att."id",
+            att.student_id,
+            att.assignment_id,
+            att.create_date
+        FROM
+            academy_tests_attempt AS att
+        WHERE
+            att.student_id IS NOT NULL
+            AND (
+                %(student_ids)s::INTEGER[] IS NULL
+                OR att.student_id = ANY ( %(student_ids)s )
+            )
+    ), answered AS (
+        SELECT
+            ataa.attempt_id,
+            ataa.question_link_id,
+            ataa.answer_id,
+            ataa.instant,
+            ataa.user_action::TEXT AS user_action
+        FROM
+            academy_tests_attempt_answer AS ataa
+        INNER JOIN scoped_attempt AS att
+            ON att."id" = ataa.attempt_id
+        WHERE
+            ataa.active IS TRUE
+    ), non_answered AS (
+        SELECT
+            att."id" AS attempt_id,
+            link."id" AS question_link_id,
+            NULL::INTEGER AS answer_id,
+            att.create_date AS instant,
+            'blank'::TEXT AS user_action
+        FROM
+            scoped_attempt AS att
+        INNER JOIN academy_tests_test_training_assignment AS tta
+            ON tta."id" = att.assignment_id
+        INNER JOIN academy_tests_test_question_rel AS link
+            ON link.test_id = tta.test_id
+        INNER JOIN academy_tests_question AS atq
+            ON atq."id" = link.question_id
+            AND atq.active IS TRUE
+        WHERE
+            NOT EXISTS (
+                SELECT
+                    1
+                FROM
+                    answered AS ans
+                WHERE
+                    ans.attempt_id = att."id"
+                    AND ans.question_link_id = link."id"
+            )
+    ), sanitized AS (
+        SELECT
+            aaq.attempt_id,
+            link.question_id,
+            aaq.user_action,
+            ROW_NUMBER ( ) OVER (
+                PARTITION BY aaq.attempt_id, aaq.question_link_id
+                ORDER BY aaq.instant DESC
+            ) :: INTEGER AS "leading",
+            (
+                aaq.user_action <> 'blank' AND ans.is_correct IS TRUE
+            )::BOOLEAN AS is_correct
+        FROM (
+            SELECT * FROM answered
+            UNION ALL
+            SELECT * FROM non_answered
+        ) AS aaq
+        INNER JOIN academy_tests_test_question_rel AS link
+            ON link."id" = aaq.question_link_id
+        LEFT JOIN academy_tests_answer AS ans
+            ON ans."id" = aaq.answer_id
+        WHERE
+            %(question_ids)s::INTEGER[] IS NULL
+            OR link.question_id = ANY ( %(question_ids)s )
+    ), absolute_data AS (
+        SELECT
+            att.student_id,
+            asa.question_id,
+
+            COUNT(*)::INTEGER AS attempts,
+
+            SUM((asa.user_action = 'answer')::INTEGER)::INTEGER AS answer,
+            SUM((asa.user_action = 'doubt')::INTEGER)::INTEGER AS doubt,
+            SUM((asa.user_action = 'blank')::INTEGER)::INTEGER AS blank,
+
+            SUM((asa.is_correct)::INTEGER)::INTEGER AS "right",
+            (
+                COUNT(*) -
+                SUM((asa.user_action = 'blank' OR asa.is_correct)::INTEGER)
+            )::INTEGER AS wrong,
+
+            SUM(
+                (asa.user_action != 'blank')::INTEGER
+            )::INTEGER AS answer_doubt,
+            SUM(
+                (asa.user_action != 'answer')::INTEGER
+            )::INTEGER AS blank_doubt,
+            SUM(
+                (asa.user_action = 'blank' OR NOT asa.is_correct)::INTEGER
+            )::INTEGER AS blank_wrong,
+
+            SUM(
+                (asa.user_action = 'doubt' OR NOT asa.is_correct)::INTEGER
+            )::INTEGER doubt_wrong,
+            SUM(
+                (asa.user_action <> 'answer' OR NOT asa.is_correct)::INTEGER
+            )::INTEGER AS blank_doubt_wrong
+        FROM
+            sanitized AS asa
+        INNER JOIN scoped_attempt AS att
+            ON att."id" = asa.attempt_id
+        WHERE
+            asa."leading" = 1
+        GROUP BY
+            att.student_id,
+            asa.question_id
+        HAVING
+            COUNT(*) > 0
+    ), removed AS (
+        DELETE FROM academy_statistics_student_question_readonly AS st
+        WHERE
+            (
+                %(student_ids)s::INTEGER[] IS NULL
+                OR st.student_id = ANY ( %(student_ids)s )
+            )
+            AND (
+                %(question_ids)s::INTEGER[] IS NULL
+                OR st.question_id = ANY ( %(question_ids)s )
+            )
+            AND NOT EXISTS (
+                SELECT
+                    1
+                FROM
+                    absolute_data AS ad
+                WHERE
+                    ad.student_id = st.student_id
+                    AND ad.question_id = st.question_id
+            )
+        RETURNING st."id"
+    )
+    INSERT INTO academy_statistics_student_question_readonly AS st (
+        create_uid, create_date, write_uid, write_date,
+        student_id, question_id, attempts,
+        answer, answer_percent, doubt, doubt_percent,
+        blank, blank_percent, "right", right_percent,
+        wrong, wrong_percent, answer_doubt, answer_doubt_percent,
+        blank_doubt, blank_doubt_percent, blank_wrong, blank_wrong_percent,
+        doubt_wrong, doubt_wrong_percent,
+        blank_doubt_wrong, blank_doubt_wrong_percent
+    )
+    SELECT
+        %(uid)s,
+        ( NOW() AT TIME ZONE 'UTC' ),
+        %(uid)s,
+        ( NOW() AT TIME ZONE 'UTC' ),
+        student_id,
+        question_id,
+        attempts,
+        answer,
+        (answer::NUMERIC / attempts)::NUMERIC,
+        doubt,
+        (doubt::NUMERIC / attempts)::NUMERIC,
+        blank,
+        (blank::NUMERIC / attempts)::NUMERIC,
+        "right",
+        ("right"::NUMERIC / attempts)::NUMERIC,
+        wrong,
+        (wrong::NUMERIC / attempts)::NUMERIC,
+        answer_doubt,
+        (answer_doubt::NUMERIC / attempts)::NUMERIC,
+        blank_doubt,
+        (blank_doubt::NUMERIC / attempts)::NUMERIC,
+        blank_wrong,
+        (blank_wrong::NUMERIC / attempts)::NUMERIC,
+        doubt_wrong,
+        (doubt_wrong::NUMERIC / attempts)::NUMERIC,
+        blank_doubt_wrong,
+        (blank_doubt_wrong::NUMERIC / attempts)::NUMERIC
+    FROM
+        absolute_data
+    ON CONFLICT ( student_id, question_id ) DO UPDATE
+    SET
+        write_uid = EXCLUDED.write_uid,
+        write_date = EXCLUDED.write_date,
+        attempts = EXCLUDED.attempts,
+        answer = EXCLUDED.answer,
+        answer_percent = EXCLUDED.answer_percent,
+        doubt = EXCLUDED.doubt,
+        doubt_percent = EXCLUDED.doubt_percent,
+        blank = EXCLUDED.blank,
+        blank_percent = EXCLUDED.blank_percent,
+        "right" = EXCLUDED."right",
+        right_percent = EXCLUDED.right_percent,
+        wrong = EXCLUDED.wrong,
+        wrong_percent = EXCLUDED.wrong_percent,
+        answer_doubt = EXCLUDED.answer_doubt,
+        answer_doubt_percent = EXCLUDED.answer_doubt_percent,
+        blank_doubt = EXCLUDED.blank_doubt,
+        blank_doubt_percent = EXCLUDED.blank_doubt_percent,
+        blank_wrong = EXCLUDED.blank_wrong,
+        blank_wrong_percent = EXCLUDED.blank_wrong_percent,
+        doubt_wrong = EXCLUDED.doubt_wrong,
+        doubt_wrong_percent = EXCLUDED.doubt_wrong_percent,
+        blank_doubt_wrong = EXCLUDED.blank_doubt_wrong,
+        blank_doubt_wrong_percent = EXCLUDED.blank_doubt_wrong_percent
+    WHERE (
+        st.attempts, st.answer, st.doubt, st.blank, st."right", st.wrong,
+        st.doubt_wrong, st.blank_doubt_wrong
+    ) IS DISTINCT FROM (
+        EXCLUDED.attempts, EXCLUDED.answer, EXCLUDED.doubt, EXCLUDED.blank,
+        EXCLUDED."right", EXCLUDED.wrong, EXCLUDED.doubt_wrong,
+        EXCLUDED.blank_doubt_wrong
+    )
+'''
+
+# Students and questions whose statistics can be changed by the attempts
+ACADEMY_STATISTICS_STUDENT_QUESTION_SCOPE = '''
+    SELECT
+        ARRAY_AGG ( DISTINCT att.student_id ) AS student_ids,
+        ARRAY_AGG ( DISTINCT link.question_id ) AS question_ids
+    FROM
+        academy_tests_attempt AS att
+    INNER JOIN academy_tests_test_training_assignment AS tta
+        ON tta."id" = att.assignment_id
+    INNER JOIN academy_tests_test_question_rel AS link
+        ON link.test_id = tta.test_id
+    WHERE
+        att."id" = ANY ( %s )
+        AND att.student_id IS NOT NULL
+'''
+
+# Students and questions whose statistics can be changed by the test links
+ACADEMY_STATISTICS_STUDENT_QUESTION_LINK_SCOPE = '''
+    SELECT
+        ARRAY_AGG ( DISTINCT att.student_id ) AS student_ids,
+        ARRAY_AGG ( DISTINCT link.question_id ) AS question_ids
+    FROM
+        academy_tests_test_question_rel AS link
+    INNER JOIN academy_tests_test_training_assignment AS tta
+        ON tta.test_id = link.test_id
+    INNER JOIN academy_tests_attempt AS att
+        ON att.assignment_id = tta."id"
+    WHERE
+        link."id" = ANY ( %s )
+        AND att.student_id IS NOT NULL
+'''
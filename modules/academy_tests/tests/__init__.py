@@ -5,3 +5,12 @@
 ###############################################################################
 
 from . import test_academy_tests_random_template
+from . import test_academy_tests_random_line
+from . import test_academy_tests_attempt
+from . import test_academy_tests_attempt_answer_sheets
+from . import test_academy_statistics_student_question
+from . import test_academy_tests_question_near_duplicate
+from . import test_academy_tests_question_render
+from . import test_academy_tests_random_benchmark
+from . import test_academy_tests_attempt_benchmark
+from . import test_academy_tests_question_near_duplicate_benchmark
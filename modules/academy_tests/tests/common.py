@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+from odoo.tests.common import TransactionCase
+from logging import getLogger
+
+from datetime import datetime, timedelta
+
+
+_logger = getLogger(__name__)
+
+
+class TestAcademyTestsCommon(TransactionCase):
+    """ Builds its own questions, test, assignment and individual assignment,
+    so the tests do not depend on the question bank of the database. Only the
+    enrolment is taken from the ``academy_base`` demo data.
+    """
+
+    _enrolment_xid = 'academy_base.academy_training_action_enrolment_demo_1'
+    _scale_xid = 'academy_tests.academy_tests_correction_scale_default'
+
+    _question_count = 6
+
+    def setUp(self):
+        super(TestAcademyTestsCommon, self).setUp()
+
+        self.question_obj = self.env['academy.tests.question']
+        self.attempt_obj = self.env['academy.tests.attempt']
+        self.attempt_answer_obj = self.env['academy.tests.attempt.answer']
+
+        self.topic = self.env['academy.tests.topic'].create({
+            'name': 'Fixture topic'
+        })
+        self.categories = self.env['academy.tests.category'].create([
+            {'name': 'Fixture category A', 'topic_id': self.topic.id},
+            {'name': 'Fixture category B', 'topic_id': self.topic.id}
+        ])
+
+        self.questions = self._create_questions(self._question_count)
+
+        self.test = self.env['academy.tests.test'].create({
+            'name': 'Fixture test',
+            'question_ids': [
+                (0, 0, {'question_id': question.id, 'sequence': index})
+                for index, question in enumerate(self.questions, 1)
+            ]
+        })
+        self.links = self.test.question_ids.sorted('sequence')
+
+        self.scale = self.env.ref(self._scale_xid)
+        self.enrolment = self.env.ref(self._enrolment_xid)
+
+        self.assignment = self.env[
+            'academy.tests.test.training.assignment'].create({
+                'name': 'Fixture assignment',
+                'test_id': self.test.id,
+                'training_ref': '{},{}'.format(
+                    self.enrolment._name, self.enrolment.id),
+                'correction_scale_id': self.scale.id,
+                'release': datetime.now() - timedelta(days=1),
+                'available_time': 1.0
+            })
+
+        self.individual = self.env[
+            'academy.tests.test.training.assignment.enrolment.rel'].create({
+                'assignment_id': self.assignment.id,
+                'enrolment_id': self.enrolment.id
+            })
+
+    def _create_questions(self, count, prefix='Fixture question'):
+        """ Creates questions with four answers, the first one is the right
+        answer. Even questions go to category A and odd ones to category B.
+        """
+
+        values_list = []
+
+        for index in range(0, count):
+            category = self.categories[index % 2]
+            values_list.append({
+                'name': '{} {:03} about the topic'.format(prefix, index),
+                'topic_id': self.topic.id,
+                'category_ids': [(6, 0, [category.id])],
+                'answer_ids': [
+                    (0, 0, {
+                        'name': 'Answer {} to question {}'.format(pos, index),
+                        'is_correct': pos == 0,
+                        'sequence': pos
+                    }) for pos in range(0, 4)
+                ]
+            })
+
+        return self.question_obj.create(values_list)
+
+    @staticmethod
+    def _right_answer(link):
+        return link.question_id.answer_ids.filtered('is_correct')[:1]
+
+    @staticmethod
+    def _wrong_answer(link):
+        return link.question_id.answer_ids.filtered(
+            lambda r: not r.is_correct)[:1]
+
+    def _create_attempt(self, right=0, wrong=0, doubt=0):
+        """ Creates an opened attempt and answers its first questions, the
+        rest of them are left unanswered.
+
+        Returns:
+            Model: the new attempt
+        """
+
+        attempt = self.attempt_obj.create({
+            'individual_id': self.individual.id,
+            'start': datetime.now() - timedelta(minutes=10),
+            'available_time': 1.0
+        })
+
+        actions = ['right'] * right + ['wrong'] * wrong + ['doubt'] * doubt
+
+        values_list = []
+        for link, action in zip(self.links, actions):
+            if action == 'doubt':
+                answer, user_action = self._right_answer(link), 'doubt'
+            elif action == 'right':
+                answer, user_action = self._right_answer(link), 'answer'
+            else:
+                answer, user_action = self._wrong_answer(link), 'answer'
+
+            values_list.append({
+                'attempt_id': attempt.id,
+                'question_link_id': link.id,
+                'answer_id': answer.id,
+                'user_action': user_action
+            })
+
+        if values_list:
+            self.attempt_answer_obj.create(values_list)
+
+        return attempt
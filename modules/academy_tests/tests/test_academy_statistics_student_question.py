@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+from .common import TestAcademyTestsCommon
+from logging import getLogger
+
+
+_logger = getLogger(__name__)
+
+
+class TestAcademyStatisticsStudentQuestion(TestAcademyTestsCommon):
+    """ Changes attempts and test links and checks the refreshed statistics
+    are the same a full rebuild gives.
+    """
+
+    _fields = [
+        'attempts', 'answer', 'doubt', 'blank', 'right', 'wrong',
+        'doubt_wrong', 'blank_doubt_wrong'
+    ]
+
+    def setUp(self):
+        super(TestAcademyStatisticsStudentQuestion, self).setUp()
+
+        self.statistics_obj = self.env[
+            'academy.statistics.student.question.readonly']
+        self.link_obj = self.env['academy.tests.test.question.rel']
+
+    def _read_statistics(self):
+        domain = [('question_id.topic_id', '=', self.topic.id)]
+        self.statistics_obj.invalidate_cache()
+        rows = self.statistics_obj.search_read(domain, self._fields + [
+            'student_id', 'question_id'])
+
+        return {
+            (row['student_id'][0], row['question_id'][0]):
+            tuple(row[name] for name in self._fields)
+            for row in rows
+        }
+
+    def _assert_same_as_rebuild(self):
+        refreshed = self._read_statistics()
+
+        self.statistics_obj.rebuild_statistics()
+        rebuilt = self._read_statistics()
+
+        self.assertEqual(refreshed, rebuilt)
+
+        return refreshed
+
+    def test_close_refreshes(self):
+        attempt_set = self._create_attempt(right=2, wrong=1)
+        attempt_set += self._create_attempt(doubt=3)
+        attempt_set.close()
+
+        statistics = self._assert_same_as_rebuild()
+
+        self.assertEqual(len(statistics), len(self.links))
+        for values in statistics.values():
+            self.assertEqual(values[0], 2)
+
+    def test_unlink_attempt(self):
+        attempt_set = self._create_attempt(right=2)
+        attempt_set += self._create_attempt(wrong=2)
+        attempt_set.close()
+
+        attempt_set[0].unlink()
+
+        statistics = self._assert_same_as_rebuild()
+        for values in statistics.values():
+            self.assertEqual(values[0], 1)
+
+        attempt_set[1].unlink()
+
+        self.assertFalse(self._assert_same_as_rebuild())
+
+    def test_archive_attempt(self):
+        attempt_set = self._create_attempt(right=2)
+        attempt_set += self._create_attempt(wrong=2)
+        attempt_set.close()
+
+        attempt_set[0].write({'active': False})
+
+        self._assert_same_as_rebuild()
+
+    def test_link_changes(self):
+        attempt = self._create_attempt(right=2, wrong=1)
+        attempt.close()
+
+        # New link adds a blank to the closed attempt
+        question = self._create_questions(1, 'Fixture new question')
+        link = self.link_obj.create({
+            'test_id': self.test.id,
+            'question_id': question.id
+        })
+
+        statistics = self._assert_same_as_rebuild()
+        self.assertEqual(len(statistics), len(self.links) + 1)
+
+        key = (attempt.student_id.id, question.id)
+        self.assertEqual(statistics[key][3], 1)
+
+        # Removed links remove their rows
+        (link + self.links[0]).unlink()
+
+        statistics = self._assert_same_as_rebuild()
+        self.assertEqual(len(statistics), len(self.links) - 1)
+        self.assertNotIn(key, statistics)
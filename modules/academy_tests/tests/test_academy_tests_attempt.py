@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+from .common import TestAcademyTestsCommon
+from ..models.academy_tests_attempt import PENDING_UPDATE_TABLE
+from logging import getLogger
+from unittest.mock import patch
+
+
+_logger = getLogger(__name__)
+
+
+class TestAcademyTestsAttempt(TestAcademyTestsCommon):
+    """ Scores fixture attempts with the set-based engine and compares the
+    result with the values computed record by record.
+    """
+
+    def _assert_same_values(self, expected, obtained, attempt_id):
+        for name, value in expected.items():
+            msg = '{} differs for attempt {}'.format(name, attempt_id)
+            if isinstance(value, float):
+                self.assertAlmostEqual(value, obtained[name], places=10,
+                                       msg=msg)
+            else:
+                self.assertEqual(value, obtained[name], msg)
+
+    def test_batch_scoring_matches_orm(self):
+        attempt_set = self._create_attempt(right=2, wrong=1, doubt=1)
+        attempt_set += self._create_attempt(right=4)
+        attempt_set += self._create_attempt()
+
+        computed = attempt_set.get_computed_values_batch()
+        self.assertEqual(set(computed.keys()), set(attempt_set.ids))
+
+        for attempt in attempt_set:
+            expected = attempt.get_computed_values()
+            self._assert_same_values(expected, computed[attempt.id],
+                                     attempt.id)
+
+    def test_close_stores_scores(self):
+        attempt = self._create_attempt(right=2, wrong=1, doubt=1)
+
+        attempt.close()
+        attempt.invalidate_cache()
+
+        self.assertTrue(attempt.closed)
+        self.assertEqual(attempt.question_count, len(self.links))
+        self.assertEqual(attempt.answered_count, 4)
+        self.assertEqual(attempt.doubt_count, 1)
+        self.assertEqual(attempt.answer_count, 3)
+        self.assertEqual(attempt.wrong_count, 1)
+        self.assertEqual(attempt.blank_count, len(self.links) - 4)
+        self.assertEqual(attempt.right_count + attempt.wrong_count,
+                         attempt.answered_count)
+
+        # Missing answers have been stored as blanks
+        blank_set = attempt.attempt_answer_ids.filtered(
+            lambda r: r.user_action == 'blank')
+        self.assertEqual(len(blank_set), len(self.links) - 4)
+
+        self._assert_same_values(attempt.get_computed_values(), {
+            name: attempt[name] for name in attempt.get_computed_values()
+        }, attempt.id)
+
+    def test_close_skips_archived_questions(self):
+        """ Links to archived questions are neither scored nor filled with
+        blanks when the attempt is closed
+        """
+
+        archived_link = self.links[-1]
+        archived_link.question_id.write({'active': False})
+
+        attempt = self._create_attempt(right=2, wrong=1)
+        attempt.close()
+        attempt.invalidate_cache()
+
+        active_count = len(self.links) - 1
+        self.assertEqual(attempt.question_count, active_count)
+        self.assertEqual(attempt.blank_count, active_count - 3)
+
+        answer_set = self.attempt_answer_obj.with_context(
+            active_test=False).search([('attempt_id', '=', attempt.id)])
+        self.assertFalse(answer_set.filtered(
+            lambda r: r.question_link_id == archived_link))
+        self.assertEqual(len(answer_set), active_count)
+
+        self._assert_same_values(attempt.get_computed_values(), {
+            name: attempt[name] for name in attempt.get_computed_values()
+        }, attempt.id)
+
+        # Blanks are not added again for questions already answered
+        attempt._create_missing_answers()
+        self.assertEqual(self.attempt_answer_obj.search_count(
+            [('attempt_id', '=', attempt.id)]), active_count)
+
+    def test_recalculate_closed_attempts(self):
+        attempt_set = self._create_attempt(right=3)
+        attempt_set += self._create_attempt(wrong=2)
+        attempt_set.close()
+
+        # Changing the penalty changes the scores of the closed attempts
+        attempt_set.write({'wrong': -0.5})
+        attempt_set.recalculate()
+        attempt_set.invalidate_cache()
+
+        for attempt in attempt_set:
+            expected = attempt.get_computed_values()
+            self.assertAlmostEqual(attempt.wrong_points,
+                                   attempt.wrong_count * -0.5)
+            self._assert_same_values(expected, {
+                name: attempt[name] for name in expected
+            }, attempt.id)
+
+    def _queue_entries(self):
+        sql = 'SELECT kind, res_id, retries FROM {} ORDER BY "id"'
+        self.env.cr.execute(sql.format(PENDING_UPDATE_TABLE))
+
+        return self.env.cr.fetchall()
+
+    def _statistics_count(self):
+        statistics_obj = self.env[
+            'academy.statistics.student.question.readonly']
+        domain = [('question_id', 'in', self.questions.ids)]
+
+        return statistics_obj.search_count(domain)
+
+    def test_process_pending_updates(self):
+        self.env.cr.execute('DELETE FROM {}'.format(PENDING_UPDATE_TABLE))
+
+        attempt = self._create_attempt(right=2, wrong=1)
+        attempt.with_context(disable_statistics_update=True).close()
+        self.assertEqual(self._statistics_count(), 0)
+
+        self.attempt_obj._enqueue_updates({
+            'statistics': attempt.ids,
+            'rank': [self.assignment.id]
+        })
+        self.attempt_obj.process_pending_updates()
+
+        self.assertFalse(self._queue_entries())
+        self.assertEqual(self._statistics_count(), len(self.links))
+
+    def test_failed_pending_updates(self):
+        """ A failing side effect does not block the other entries, it is
+        queued again with one more retry
+        """
+
+        self.env.cr.execute('DELETE FROM {}'.format(PENDING_UPDATE_TABLE))
+
+        attempt = self._create_attempt(right=2, wrong=1)
+        attempt.with_context(disable_statistics_update=True).close()
+
+        self.attempt_obj._enqueue_updates({
+            'statistics': attempt.ids,
+            'rank': [self.assignment.id]
+        })
+
+        def broken_rank(assignment_ids=False):
+            if assignment_ids:
+                raise ValueError('Broken ranking')
+
+        attempt_cls = type(self.attempt_obj)
+        with patch.object(attempt_cls, 'update_rank', side_effect=broken_rank):
+            self.attempt_obj.process_pending_updates()
+
+        self.assertEqual(self._statistics_count(), len(self.links))
+        self.assertEqual(self._queue_entries(),
+                         [('rank', self.assignment.id, 1)])
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+from .common import TestAcademyTestsCommon
+from odoo.exceptions import ValidationError
+from logging import getLogger
+
+
+_logger = getLogger(__name__)
+
+
+class TestAcademyTestsAttemptAnswerSheets(TestAcademyTestsCommon):
+    """ Submits compact answer sheets and compares the stored attempts with
+    the attempts answered through the ORM.
+    """
+
+    def _sheet(self, right=0, wrong=0, doubt=0):
+        """ Same answers ``_create_attempt`` stores, as sheet entries """
+
+        actions = ['right'] * right + ['wrong'] * wrong + ['doubt'] * doubt
+
+        sheet = []
+        for link, action in zip(self.links, actions):
+            if action == 'doubt':
+                sheet.append([link.id, self._right_answer(link).id, 'doubt'])
+            elif action == 'right':
+                sheet.append([link.id, self._right_answer(link).id])
+            else:
+                sheet.append([link.id, self._wrong_answer(link).id])
+
+        return sheet
+
+    def test_invalid_sheets(self):
+        attempt = self._create_attempt()
+        link = self.links[0]
+        other = self.links[1]
+
+        invalid_sheets = [
+            {'not-an-id': []},
+            {str(attempt.id): [['not-a-link', False]]},
+            {str(attempt.id): [[link.id]]},
+            {str(attempt.id): [[link.id, False, 'answer']]},
+            {str(attempt.id): [[link.id, self._right_answer(link).id,
+                                'blank']]},
+            {str(attempt.id): [[link.id, False], [link.id, False]]},
+            {str(attempt.id): [[link.id, self._right_answer(other).id]]}
+        ]
+
+        for sheets in invalid_sheets:
+            with self.assertRaises(ValidationError, msg=str(sheets)):
+                self.attempt_obj.submit_answer_sheets(sheets)
+
+        self.assertFalse(attempt.attempt_answer_ids)
+        self.assertFalse(attempt.closed)
+
+    def test_blanks_on_close(self):
+        attempt = self._create_attempt()
+        empty = self._create_attempt()
+
+        self.attempt_obj.submit_answer_sheets({
+            str(attempt.id): self._sheet(right=1, wrong=1),
+            str(empty.id): []
+        })
+
+        for record, answered in ((attempt, 2), (empty, 0)):
+            record.invalidate_cache()
+            self.assertTrue(record.closed)
+
+            answer_set = record.attempt_answer_ids
+            blank_set = answer_set.filtered(
+                lambda r: r.user_action == 'blank')
+
+            self.assertEqual(len(answer_set), len(self.links))
+            self.assertEqual(len(blank_set), len(self.links) - answered)
+            self.assertEqual(record.blank_count, len(self.links) - answered)
+
+    def test_open_submission(self):
+        attempt = self._create_attempt()
+
+        self.attempt_obj.submit_answer_sheets(
+            {str(attempt.id): self._sheet(right=2)}, close=False)
+
+        attempt.invalidate_cache()
+        self.assertFalse(attempt.closed)
+        self.assertEqual(len(attempt.attempt_answer_ids), 2)
+
+    def test_scoring_matches_orm(self):
+        expected = self._create_attempt(right=2, wrong=1, doubt=1)
+        expected.close()
+
+        obtained = self._create_attempt()
+        self.attempt_obj.submit_answer_sheets({
+            str(obtained.id): self._sheet(right=2, wrong=1, doubt=1)
+        })
+
+        expected.invalidate_cache()
+        obtained.invalidate_cache()
+
+        for name, value in expected.get_computed_values().items():
+            if isinstance(value, float):
+                self.assertAlmostEqual(value, obtained[name], places=10,
+                                       msg=name)
+            else:
+                self.assertEqual(expected[name], obtained[name], name)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+from odoo.tests.common import TransactionCase, tagged
+from logging import getLogger
+
+from time import perf_counter
+
+
+_logger = getLogger(__name__)
+
+
+@tagged('-standard', 'benchmark')
+class TestAcademyTestsAttemptBenchmark(TransactionCase):
+    """ Compares the time needed to score the closed attempts one by one
+    against the set-based scoring. Both must return the same values.
+
+    This does not run with the standard tests, use ``--test-tags benchmark``
+    """
+
+    def setUp(self):
+        super(TestAcademyTestsAttemptBenchmark, self).setUp()
+
+        attempt_obj = self.env['academy.tests.attempt']
+        self._attempt_set = attempt_obj.search([('closed', '=', True)])
+
+        if not self._attempt_set:
+            self.skipTest("There are no closed attempts to score")
+
+    def test_benchmark_scoring(self):
+        attempt_set = self._attempt_set
+
+        started = perf_counter()
+        legacy = {item.id: item.get_computed_values() for item in attempt_set}
+        legacy_time = perf_counter() - started
+
+        attempt_set.invalidate_cache()
+
+        started = perf_counter()
+        computed = attempt_set.get_computed_values_batch()
+        batch_time = perf_counter() - started
+
+        _logger.info(
+            'ATTEMPT SCORING BENCHMARK: %s attempts. '
+            'Per record: %.4fs, set-based: %.4fs',
+            len(attempt_set), legacy_time, batch_time)
+
+        for attempt_id, values in legacy.items():
+            for name, value in values.items():
+                msg = '{} differs for attempt {}'.format(name, attempt_id)
+                if isinstance(value, float):
+                    self.assertAlmostEqual(
+                        value, computed[attempt_id][name], places=10, msg=msg)
+                else:
+                    self.assertEqual(value, computed[attempt_id][name], msg)
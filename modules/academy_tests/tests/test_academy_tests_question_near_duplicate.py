@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+from .common import TestAcademyTestsCommon
+from logging import getLogger
+
+
+_logger = getLogger(__name__)
+
+
+class TestAcademyTestsQuestionNearDuplicate(TestAcademyTestsCommon):
+    """ Indexes fixture questions whose texts are almost the same and checks
+    they are found as near duplicates, but never amended as duplicates.
+    """
+
+    _statement = (
+        'During the administrative procedure the interested party may '
+        'submit any allegation or document considered relevant at any '
+        'moment before the hearing, and these must be taken into account '
+        'by the competent body when drafting the proposed resolution of '
+        'the procedure which will be notified to all the interested '
+        'parties within the period established by the applicable rules'
+    )
+
+    _answers = [
+        'Only within the first ten days of the procedure',
+        'At any moment before the hearing',
+        'Only after the proposed resolution has been notified',
+        'Never, documents must be submitted with the application'
+    ]
+
+    def setUp(self):
+        super(TestAcademyTestsQuestionNearDuplicate, self).setUp()
+
+        self.near_obj = self.env['academy.tests.question.near.duplicate.rel']
+
+    def _create_statement_question(self, statement):
+        return self.question_obj.create({
+            'name': statement,
+            'topic_id': self.topic.id,
+            'category_ids': [(6, 0, self.categories[:1].ids)],
+            'answer_ids': [
+                (0, 0, {'name': name, 'is_correct': pos == 1,
+                        'sequence': pos})
+                for pos, name in enumerate(self._answers)
+            ]
+        })
+
+    def test_near_duplicates(self):
+        original = self._create_statement_question(self._statement)
+        near = self._create_statement_question(
+            self._statement.replace('competent body', 'competent authority'))
+
+        self.questions.invalidate_cache()
+
+        self.assertIn(near, original.near_duplicate_ids)
+        self.assertIn(original, near.near_duplicate_ids)
+        self.assertFalse(original.near_duplicate_ids & self.questions)
+
+        # They are not exact duplicates
+        self.assertNotIn(near, original.duplicated_ids)
+
+    def test_index_follows_changes(self):
+        original = self._create_statement_question(self._statement)
+        near = self._create_statement_question(self._statement + ' too')
+
+        near.write({'name': 'A completely different statement'})
+        near.answer_ids.write({'name': 'Other answer'})
+        original.invalidate_cache()
+
+        self.assertNotIn(near, original.near_duplicate_ids)
+
+    def test_index_missing_questions(self):
+        original = self._create_statement_question(self._statement)
+        near = self._create_statement_question(self._statement + ' too')
+
+        sql = 'DELETE FROM academy_tests_question_minhash'
+        self.env.cr.execute(sql)
+        original.invalidate_cache()
+        self.assertFalse(original.near_duplicate_ids)
+
+        self.near_obj.index_missing_questions()
+        original.invalidate_cache()
+
+        self.assertIn(near, original.near_duplicate_ids)
+
+    def test_wizard_only_lists_near_duplicates(self):
+        original = self._create_statement_question(self._statement)
+        near = self._create_statement_question(self._statement + ' too')
+
+        link = self.env['academy.tests.test.question.rel'].create({
+            'test_id': self.test.id,
+            'question_id': near.id
+        })
+
+        wizard_obj = self.env[
+            'academy.tests.remove.duplicate.questions.wizard']
+        wizard = wizard_obj.create({'question_id': original.id})
+
+        self.assertIn(near, wizard.near_duplicate_ids)
+
+        # Links to near duplicates will not be replaced by amend
+        self.assertNotIn(link, wizard._search_links(original))
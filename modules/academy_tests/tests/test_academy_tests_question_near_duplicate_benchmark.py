@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+from odoo.tests.common import TransactionCase, tagged
+from logging import getLogger
+
+from time import perf_counter
+
+
+_logger = getLogger(__name__)
+
+
+@tagged('-standard', 'benchmark')
+class TestAcademyTestsQuestionNearDuplicateBenchmark(TransactionCase):
+    """ Builds the near-duplicate index and measures its recall against the
+    exact checksum matches, all of them must also be near duplicates.
+
+    This does not run with the standard tests, use ``--test-tags benchmark``
+    """
+
+    def setUp(self):
+        super(TestAcademyTestsQuestionNearDuplicateBenchmark, self).setUp()
+
+        self._exact_pairs = self._read_pairs(
+            'academy_tests_question_duplicated_rel')
+
+        if not self._exact_pairs:
+            self.skipTest("There are no duplicate questions")
+
+    def _read_pairs(self, table):
+        sql = 'SELECT question_id, duplicate_id FROM {}'.format(table)
+
+        self.env.cr.execute(sql)
+
+        return set(self.env.cr.fetchall())
+
+    def test_benchmark_near_duplicates(self):
+        near_obj = self.env['academy.tests.question.near.duplicate.rel']
+
+        build_time = near_obj.rebuild_index()
+
+        started = perf_counter()
+        near_pairs = self._read_pairs(
+            'academy_tests_question_near_duplicate_rel')
+        query_time = perf_counter() - started
+
+        found = self._exact_pairs & near_pairs
+        recall = len(found) / float(len(self._exact_pairs))
+
+        _logger.info(
+            'NEAR DUPLICATE BENCHMARK: %s exact pairs, %s near pairs. '
+            'Recall: %.4f, build: %.4fs, query: %.4fs',
+            len(self._exact_pairs), len(near_pairs), recall, build_time,
+            query_time)
+
+        self.assertGreaterEqual(recall, 0.99)
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+from .common import TestAcademyTestsCommon
+from logging import getLogger
+
+
+_logger = getLogger(__name__)
+
+
+class TestAcademyTestsQuestionRender(TestAcademyTestsCommon):
+    """ Renders fixture questions through the render cache and checks the
+    cached texts follow the changes in their answers.
+    """
+
+    def _render(self, question):
+        question.invalidate_cache()
+        return question._render_html_list()[0]
+
+    def test_cache_follows_answers(self):
+        question = self.questions[0]
+        answer = question.answer_ids[-1]
+
+        html = self._render(question)
+        self.assertIn(answer.name, html)
+        self.assertEqual(self._render(question), html)
+
+        # Archived answers are no longer rendered
+        answer.write({'active': False})
+        self.assertNotIn(answer.name, self._render(question))
+
+        answer.write({'active': True, 'name': 'Renamed fixture answer'})
+        self.assertIn('Renamed fixture answer', self._render(question))
+
+    def test_cache_follows_removed_answers(self):
+        question = self.questions[0]
+        answer = question.answer_ids[-1]
+        name = answer.name
+
+        self.assertIn(name, self._render(question))
+
+        answer.unlink()
+        self.assertNotIn(name, self._render(question))
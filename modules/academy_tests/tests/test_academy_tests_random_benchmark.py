@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+from odoo.tests.common import TransactionCase, tagged
+from odoo.osv.expression import AND
+from logging import getLogger
+
+from time import perf_counter
+
+
+_logger = getLogger(__name__)
+
+
+@tagged('-standard', 'benchmark')
+class TestAcademyTestsRandomBenchmark(TransactionCase):
+    """ Compares the time needed to draw questions for a random template using
+    one ``ORDER BY RANDOM()`` search by line against the set-based engine.
+
+    This does not run with the standard tests, use ``--test-tags benchmark``
+    """
+
+    _template_xid = 'academy_tests.academy_tests_random_template_demo'
+    _rounds = 20
+
+    def setUp(self):
+        super(TestAcademyTestsRandomBenchmark, self).setUp()
+
+        self._template = self.env.ref(self._template_xid, False)
+        if not self._template:
+            self.skipTest("Demo data has not been loaded")
+
+    @staticmethod
+    def _legacy_search(line_set, extra):
+        """ Former behavior, one search by line excluding the questions have
+        been chosen by previous lines
+        """
+
+        result_set = line_set.env['academy.tests.question']
+        accumulate_ids = []
+
+        for line in line_set:
+            domain = extra.copy()
+            if accumulate_ids:
+                domain = AND([extra, [('id', 'not in', accumulate_ids)]])
+
+            record_set = line._perform_search(domain)
+            accumulate_ids.extend(record_set.mapped('id'))
+
+            result_set += record_set
+
+        return result_set
+
+    def _measure(self, method, line_set, extra):
+        started = perf_counter()
+
+        for index in range(0, self._rounds):
+            result_set = method(line_set, extra)
+            line_set.invalidate_cache()
+
+        return (perf_counter() - started) / self._rounds, result_set
+
+    def test_benchmark_random_lines(self):
+        line_set = self._template.random_line_ids
+        extra = self._template._exclude_incremental()
+
+        legacy_time, legacy_set = self._measure(
+            self._legacy_search, line_set, extra)
+        engine_time, engine_set = self._measure(
+            lambda lines, domain: lines.perform_search(domain),
+            line_set, extra)
+
+        _logger.info(
+            'RANDOM TEMPLATE BENCHMARK: %s lines, %s questions. '
+            'Per line search: %.4fs, set-based: %.4fs',
+            len(line_set), len(engine_set), legacy_time, engine_time)
+
+        self.assertEqual(len(legacy_set), len(engine_set))
+        self.assertEqual(len(engine_set), len(set(engine_set.ids)))
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+from .common import TestAcademyTestsCommon
+from logging import getLogger
+
+
+_logger = getLogger(__name__)
+
+
+class TestAcademyTestsRandomLine(TestAcademyTestsCommon):
+    """ Draws questions from the fixture topic using the set-based engine,
+    both through the single query and through the cached candidate pools.
+    """
+
+    def _create_template(self, *lines):
+        """ Creates a template with one line by each given tuple of quantity
+        and categories, all the lines are restricted to the fixture topic.
+        """
+
+        values = []
+        for quantity, category_set in lines:
+            categorization = {'topic_id': self.topic.id}
+            if category_set:
+                categorization['category_ids'] = [(6, 0, category_set.ids)]
+
+            values.append((0, 0, {
+                'quantity': quantity,
+                'categorization_ids': [(0, 0, categorization)]
+            }))
+
+        return self.env['academy.tests.random.template'].create({
+            'name': 'Fixture template',
+            'random_line_ids': values
+        })
+
+    def test_lines_do_not_share_questions(self):
+        template = self._create_template((2, None), (3, None))
+        line_set = template.random_line_ids
+
+        samples = line_set.sample_candidates()
+
+        obtained = self.question_obj
+        for line in line_set:
+            self.assertEqual(len(samples[line.id]), line.quantity)
+            obtained += samples[line.id]
+
+        self.assertEqual(len(obtained), 5)
+        self.assertEqual(len(set(obtained.ids)), 5)
+        self.assertFalse(obtained - self.questions)
+
+    def test_line_criteria(self):
+        category = self.categories[1]
+        expected = self.questions.filtered(
+            lambda r: category in r.category_ids)
+
+        template = self._create_template((len(self.questions), category))
+
+        obtained = template.random_line_ids.perform_search()
+
+        self.assertEqual(set(obtained.ids), set(expected.ids))
+
+    def test_excluded_questions(self):
+        """ Template passes the incremental exclusion as ``id not in`` leafs,
+        those lines are resolved from the cached candidate pool
+        """
+
+        excluded = self.questions[:2]
+        expected = self.questions - excluded
+
+        template = self._create_template((len(self.questions), None))
+        line = template.random_line_ids
+        extra = [('id', 'not in', excluded.ids)]
+
+        for index in range(0, 2):
+            obtained = line.perform_search(extra)
+            self.assertEqual(set(obtained.ids), set(expected.ids))
+
+    def test_disjoint_samples(self):
+        template = self._create_template((2, None))
+        line = template.random_line_ids
+
+        samples = line.sample_candidates_batch(count=3, disjoint=True)
+
+        obtained_ids = []
+        for sample in samples:
+            self.assertEqual(len(sample[line.id]), 2)
+            obtained_ids.extend(sample[line.id].ids)
+
+        self.assertEqual(len(set(obtained_ids)), 6)
+
+    def test_new_tests_links(self):
+        """ Links inserted by new_tests are checked as if they had been
+        created through the ORM
+        """
+
+        template = self._create_template((2, None), (1, None))
+
+        test_set = template.new_tests(count=2, disjoint=True)
+
+        self.assertEqual(len(test_set), 2)
+        for test in test_set:
+            link_set = test.question_ids.sorted('sequence')
+            self.assertEqual(link_set.mapped('sequence'), [1, 2, 3])
+            self.assertFalse(link_set.mapped('question_id') - self.questions)
+
+            link_set._check_dependency_sequence_order()
+
+    def test_pool_follows_category_side_changes(self):
+        """ Cached candidate pools are discarded when questions are
+        categorized or tagged from the other side of the relation
+        """
+
+        category = self.categories[1]
+        question = self.questions.filtered(
+            lambda r: category not in r.category_ids)[0]
+
+        template = self._create_template((len(self.questions), category))
+        line = template.random_line_ids
+        extra = [('id', 'not in', [0])]
+
+        expected = len(self.questions.filtered(
+            lambda r: category in r.category_ids))
+        self.assertEqual(line.perform_search_count(), expected)
+
+        category.write({'question_ids': [(4, question.id)]})
+
+        self.assertEqual(line.perform_search_count(), expected + 1)
+        self.assertIn(question, line.perform_search(extra))
+
+        tag = self.env['academy.tests.tag'].create({'name': 'Fixture tag'})
+        line.write({'tag_ids': [(6, 0, tag.ids)]})
+        self.assertEqual(line.perform_search_count(), 0)
+
+        tag.write({'question_ids': [(4, question.id)]})
+        self.assertEqual(line.perform_search_count(), 1)
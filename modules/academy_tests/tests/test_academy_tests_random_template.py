@@ -562,6 +562,39 @@ class TestAcademyTestsRandomTemplate(TransactionCase):
         question_set = question_set.search(domain)
         self._one_line_context(question_set, enrolment, None, True, True)
 
+    def test_available_questions_materialized(self):
+        """ Stored available questions must follow the changes in their
+        sources and they must match the SQL VIEW they are built from
+        """
+
+        action = self.env.ref('academy_base.academy_training_action_demo_1')
+        activity = action.training_activity_id
+        field = activity._fields['available_question_ids']
+
+        question = activity.available_question_ids[0]
+        new_question = question.create({
+            'name': datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'),
+            'topic_id': question.topic_id.id,
+            'topic_version_ids': [(6, 0, question.topic_version_ids.ids)],
+            'category_ids': [(6, 0, question.category_ids.ids)],
+            'level_id': question.level_id.id,
+            'type_id': question.type_id.id,
+            'answer_ids': [
+                (0, 0, {'name': 'a'}),
+                (0, 0, {'name': 'x', 'is_correct': True})
+            ]
+        })
+
+        activity.invalidate_cache(['available_question_ids'])
+        self.assertIn(new_question, activity.available_question_ids)
+
+        sql = 'SELECT question_id FROM {} WHERE training_activity_id = %s'
+        self.env.cr.execute(sql.format(field.source), (activity.id,))
+        expected = set(row[0] for row in self.env.cr.fetchall())
+
+        self.assertEqual(set(activity.available_question_ids.ids), expected)
+        self.assertEqual(field.check_consistency(self.env.cr), (0, 0))
+
     def test_several_lines(self):
         """ Perform a search with using two lines topic, version and category,
         and the same search using a simple domain. Both results must be equal.
@@ -595,3 +628,47 @@ class TestAcademyTestsRandomTemplate(TransactionCase):
         ]
 
         self._one_line_categorization(domain, o2m, False)
+
+    def test_new_tests(self):
+        """ Create several tests at once. Disjoint tests must not share any
+        question and all of them must have the expected number of questions.
+        """
+
+        question_set = self._question_obj.search(self._domain)
+        quantity = len(question_set) // 3
+
+        if quantity:
+            template = self._get_template(lines=1)
+            template.skip_faulty_lines = False
+            template.random_line_ids[0].quantity = quantity
+
+            test_set = template.new_tests(count=3, disjoint=True)
+            self.assertEqual(len(test_set), 3)
+
+            obtained_ids = test_set.mapped('question_ids.question_id.id')
+            self.assertEqual(len(obtained_ids), quantity * 3)
+
+            for test in test_set:
+                self.assertEqual(len(test.question_ids), quantity)
+
+    def test_new_tests_incremental(self):
+        """ Incremental templates must not repeat questions between the tests
+        created at once, as they would not if they were created one by one.
+        """
+
+        template = self._get_template(lines=1)
+        template.skip_faulty_lines = False
+        template.incremental = 'tpl'
+
+        domain = AND([self._domain, template._exclude_incremental()])
+        question_set = self._question_obj.search(domain)
+        quantity = len(question_set) // 3
+
+        if quantity:
+            template.random_line_ids[0].quantity = quantity
+
+            test_set = template.new_tests(count=3)
+            self.assertEqual(len(test_set), 3)
+
+            obtained_ids = test_set.mapped('question_ids.question_id.id')
+            self.assertEqual(len(obtained_ids), quantity * 3)
@@ -857,24 +857,53 @@ class AcademyAbstractImportExport(models.AbstractModel):
             value['owner_id'] = owner_set.id
 
     def create_questions(self, value_set, sequential=False):
-        question_set = self.env['academy.tests.question']
-        question_id = None
+        """ Creates all the questions at once. Mail tracking is disabled
+        while they are being created and a single creation message is logged
+        for all of them when the batch is done.
+
+        If ``sequential`` is set, each question will depend on the previous
+        one; the first one keeps the dependency given in its values.
+        """
+        question_obj = self.env['academy.tests.question']
+        question_set = question_obj.browse()
+
+        if not value_set:
+            return question_set
+
+        tracking_disable_ctx = self.env.context.copy()
+        tracking_disable_ctx.update({
+            'tracking_disable': True,
+            'mail_create_nolog': True,
+            'mail_notrack': True
+        })
+        question_obj = question_obj.with_context(tracking_disable_ctx)
 
         # pylint: disable=locally-disabled, W0703
         try:
-            for values in value_set:
-                if sequential and question_id:
-                    values['depends_on_id'] = question_id.id
+            question_set = question_obj.create(value_set)
 
-                question_id = question_set.create(values)
-                question_set += question_id
+            if sequential:
+                question_set.chain_dependencies()
 
         except Exception as ex:
             message = _('Some questions could not be created, system says: %s')
             raise UserError(message % ex)
 
+        question_set = question_set.with_context(self.env.context)
+        self._log_created_questions(question_set)
+
         return question_set
 
+    def _log_created_questions(self, question_set):
+        """ Logs the creation message in the chatter of all the given
+        questions using a single batch of mail messages.
+        """
+        doc_name = self.env['ir.model']._get(question_set._name).name
+        body = _('%s created') % doc_name
+
+        bodies = dict.fromkeys(question_set.ids, body)
+        question_set._message_log_batch(bodies=bodies)
+
     # --------------------------- APPEND TO TEST ------------------------------
 
     @staticmethod
@@ -76,7 +76,8 @@ class AcademyTestsAttemptWizard(models.TransientModel):
     def _perform_action(self):
         self.ensure_one()
 
-        target_set = self.attempt_ids
+        # Results are shown as soon as the wizard is closed
+        target_set = self.attempt_ids.with_context(attempt_update_now=True)
 
         if self.wizard_action == 'close':
             opened_set = target_set.filtered(lambda r: not r.closed)
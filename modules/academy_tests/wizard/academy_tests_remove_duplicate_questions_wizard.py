@@ -48,6 +48,14 @@ class AcademyTestsRemoveDuplicateQuestionsWizard(models.TransientModel):
         related="question_id.duplicated_ids"
     )
 
+    # Near duplicates are only listed to be reviewed, amend only replaces
+    # the questions with the same checksum
+    near_duplicate_ids = fields.Many2many(
+        string='Near duplicates',
+        readonly=True,
+        related="question_id.near_duplicate_ids"
+    )
+
     @api.model
     def _get_original_questions(self, question_set):
         target_set = self.env['academy.tests.question']
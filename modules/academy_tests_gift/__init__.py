@@ -5,3 +5,4 @@
 ###############################################################################
 
 from . import models
+from . import controllers
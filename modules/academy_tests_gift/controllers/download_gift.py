@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+import logging
+from datetime import datetime
+from odoo.http import route, Response
+from odoo.http import content_disposition
+from odoo.tools.translate import _
+
+from odoo.addons.academy_tests.controllers.download_resources import \
+    TestAttachments, stream_records
+
+
+_logger = logging.getLogger(__name__)
+
+
+class TestGift(TestAttachments):
+    """ Downloads tests and questions in GIFT format, the file is streamed
+    while the questions are being read in batches.
+    """
+
+    @route('/academy_tests/gift/test', type='http', auth="public")
+    def test_to_gift(self, test_id, **kw):
+
+        try:
+            test_set = self._browse_for_test(test_id)
+        except AssertionError as ae:
+            return Response(str(ae), status=404)
+
+        headers = self._build_gift_headers(test_set.name)
+        stream = stream_records(test_set.question_ids, 'gift_stream')
+
+        return Response(stream, headers=headers, direct_passthrough=True)
+
+    @route('/academy_tests/gift/questions', type='http', auth="public")
+    def questions_to_gift(self, question_ids, **kw):
+
+        try:
+            question_set = self._search_for_questions(question_ids)
+        except AssertionError as ae:
+            return Response(str(ae), status=404)
+
+        headers = self._build_gift_headers()
+        stream = stream_records(question_set, 'gift_stream')
+
+        return Response(stream, headers=headers, direct_passthrough=True)
+
+    @staticmethod
+    def _build_gift_headers(fname=None):
+        if not fname:
+            pattern = datetime.now().strftime('{} %Y-%m-%d %H-%M-%S')
+            fname = pattern.format(_('Odoo export'))
+
+        fname = '{}.txt'.format(fname)
+
+        return [('Content-Type', 'text/plain; charset=utf-8'),
+                ('Content-Disposition', content_disposition(fname))]
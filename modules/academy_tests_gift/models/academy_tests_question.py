@@ -14,6 +14,10 @@ import re
 _logger = getLogger(__name__)
 
 
+# Number of questions will be read by each export batch
+GIFT_BATCH_SIZE = 500
+
+
 class AcademyTestsQuestion(models.Model):
     """ Extend academy.tests.question functionality adding a new computed fild
     witch will contain a valid GIFT code to export the question
@@ -58,6 +62,48 @@ class AcademyTestsQuestion(models.Model):
 
         return gift
 
+    def gift_stream(self, encoding='utf8', titles=None,
+                    batch_size=GIFT_BATCH_SIZE):
+        """ Yields the GIFT code of the questions in encoded chunks, one by
+        batch. The cache is cleared after each batch, so memory does not grow
+        with the number of questions.
+
+        Args:
+            titles (list): optional GIFT titles, one by question
+            batch_size (int): number of questions read at once
+
+        Yields:
+            bytes: GIFT code of the next batch of questions
+        """
+
+        question_ids = list(self._ids)
+
+        for start in range(0, len(question_ids), batch_size):
+            stop = start + batch_size
+            batch_set = self.browse(question_ids[start:stop])
+            batch_set._prefetch_for_gift()
+
+            chunks = []
+            for position, record in enumerate(batch_set, start):
+                title = titles[position] if titles else None
+                chunks.append(record.to_gift(title=title))
+
+            yield ''.join(chunks).encode(encoding)
+
+            batch_set.invalidate_cache()
+
+    def _prefetch_for_gift(self):
+        """ Reads the answers, the categories and the users of all the
+        questions at once
+        """
+
+        self.mapped('answer_ids').read(
+            ['name', 'description', 'is_correct', 'sequence'])
+        self.mapped('topic_id').read(['name'])
+        self.mapped('category_ids').read(['name'])
+        self.mapped('owner_id').read(['name'])
+        (self.mapped('create_uid') | self.mapped('write_uid')).read(['name'])
+
     @staticmethod
     def _gift_scape_string(in_str):
         pattern = re.compile('([~=#{}:])')
@@ -31,3 +31,18 @@ class AcademyTestsTestQuestionRel(models.Model):
         title = self._gift_title()
 
         return self.question_id.to_gift(title=title)
+
+    def gift_stream(self, **kwargs):
+        """ Yields the GIFT code of the linked questions, they are titled
+        using the link sequence. See ``academy.tests.question``.
+        """
+
+        self.read(['question_id', 'sequence'])
+
+        titles = [record._gift_title() for record in self]
+        question_ids = [record.question_id.id for record in self]
+
+        question_obj = self.env['academy.tests.question']
+        question_set = question_obj.browse(question_ids)
+
+        return question_set.gift_stream(titles=titles, **kwargs)
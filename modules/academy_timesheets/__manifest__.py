@@ -42,6 +42,7 @@
         'security/academy_training_session_teacher_rel.xml',
         'security/academy_timesheets_clone_wizard_log.xml',
         'security/academy_teacher_operational_shift.xml',
+        'security/academy_timesheets_mailing.xml',
 
         'views/academy_training_session_view.xml',
         'views/academy_training_session_invitation_view.xml',
@@ -56,6 +57,7 @@
         'views/academy_training_session_teacher_rel_view.xml',
         'views/academy_training_action_enrolment_view.xml',
         'views/academy_timesheets_clone_wizard_log_view.xml',
+        'views/academy_timesheets_mailing_view.xml',
         'views/academy_teacher_operational_shift_view.xml',
         'views/res_config_settings_view.xml',
 
@@ -71,7 +73,8 @@
         'report/academy_timesheet_training_action_report.xml',
         'report/academy_timesheet_student_report.xml',
 
-        'data/mail_template_data.xml'  # It should be included after reports
+        'data/mail_template_data.xml',  # It should be included after reports
+        'data/ir_cron_data.xml'
     ],
 
     'demo': [
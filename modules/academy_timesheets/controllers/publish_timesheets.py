@@ -4,10 +4,13 @@
 #    __openerp__.py file at the root folder of this module.                   #
 ###############################################################################
 
-from odoo.http import Controller, request, route
+from odoo.http import Controller, Response, request, route
 from odoo.tools.translate import _
+from odoo.tools.lru import LRU
 from logging import getLogger
 from datetime import datetime, timedelta
+from hashlib import md5
+from werkzeug.http import http_date
 from bs4 import BeautifulSoup
 
 _logger = getLogger(__name__)
@@ -28,6 +31,89 @@ ACTION_URL = '/academy-timesheets/training/<int:action_id>/schedule'
 ACTION_ACT = \
     'academy_timesheets.action_report_academy_timesheets_training_action'
 
+# Rendered reports, the entries are validated through their ETag, which
+# changes when any record the reports read has been created, changed or
+# removed. Only the sessions of the requested week, the records joined to
+# them and the report target are taken into account.
+RENDER_CACHE = LRU(256)
+
+# Most recent ``write_date`` and number of the records the reports read, the
+# latter changes on deletions. Related records are read by primary key.
+SCHEDULE_STAMP_SQL = '''
+    WITH week_session AS (
+        SELECT
+            "id",
+            write_date,
+            training_action_id,
+            competency_unit_id
+        FROM
+            academy_training_session
+        WHERE
+            date_start < %(date_stop)s
+            AND date_stop > %(date_start)s
+    ), teacher_rel AS (
+        SELECT
+            rel.write_date,
+            rel.teacher_id
+        FROM
+            academy_training_session_teacher_rel AS rel
+        WHERE
+            rel.session_id IN ( SELECT "id" FROM week_session )
+    ), invitation AS (
+        SELECT
+            inv.write_date,
+            inv.enrolment_id,
+            inv.student_id
+        FROM
+            academy_training_session_invitation AS inv
+        WHERE
+            inv.session_id IN ( SELECT "id" FROM week_session )
+    ), reservation AS (
+        SELECT
+            res.write_date,
+            res.facility_id
+        FROM
+            facility_reservation AS res
+        WHERE
+            res.session_id IN ( SELECT "id" FROM week_session )
+    ), stamps AS (
+        SELECT write_date FROM week_session
+        UNION ALL
+        SELECT write_date FROM teacher_rel
+        UNION ALL
+        SELECT write_date FROM invitation
+        UNION ALL
+        SELECT write_date FROM reservation
+        UNION ALL
+        SELECT write_date FROM academy_training_action
+        WHERE "id" IN ( SELECT training_action_id FROM week_session )
+        UNION ALL
+        SELECT write_date FROM academy_competency_unit
+        WHERE "id" IN ( SELECT competency_unit_id FROM week_session )
+        UNION ALL
+        SELECT write_date FROM academy_teacher
+        WHERE "id" IN ( SELECT teacher_id FROM teacher_rel )
+        UNION ALL
+        SELECT write_date FROM academy_training_action_enrolment
+        WHERE "id" IN ( SELECT enrolment_id FROM invitation )
+        UNION ALL
+        SELECT write_date FROM academy_student
+        WHERE "id" IN ( SELECT student_id FROM invitation )
+        UNION ALL
+        SELECT write_date FROM facility_facility
+        WHERE "id" IN ( SELECT facility_id FROM reservation )
+        UNION ALL
+        SELECT write_date FROM {target} WHERE "id" = %(target_id)s
+    )
+    SELECT
+        MAX ( write_date ) AS updated,
+        COUNT ( * ) AS total
+    FROM
+        stamps
+'''
+
+CACHE_CONTROL = 'no-cache, must-revalidate, max-age=0'
+
 JSCRIPT = ('<script defer src="https://cdnjs.cloudflare.com/ajax/libs/'
            'iframe-resizer/4.3.6/iframeResizer.contentWindow.min.js" />')
 
@@ -55,12 +141,8 @@ class PublishTimesheets(Controller):
         if not teacher:
             return request.not_found()
 
-        content = self._render_report(
-            TEACH_ACT, teacher, doc_type, target_date, embed)
-        if not content:
-            return request.not_found()
-
-        return self._report_reponse(content, doc_type, download)
+        return self._publish_report(
+            TEACH_ACT, teacher, doc_type, target_date, embed, download)
 
     @route(TEACH_URL, type='http', auth='user', website=False)
     def publish_instructor_timesheet(self, teacher_id, **kw):
@@ -80,12 +162,8 @@ class PublishTimesheets(Controller):
         if not teacher:
             return request.not_found()
 
-        content = self._render_report(
-            TEACH_ACT, teacher, doc_type, target_date, embed)
-        if not content:
-            return request.not_found()
-
-        return self._report_reponse(content, doc_type, download)
+        return self._publish_report(
+            TEACH_ACT, teacher, doc_type, target_date, embed, download)
 
     @route(STUDENT_URL, type='http', auth='user', website=False)
     def publish_student_timesheet(self, student_id, **kw):
@@ -105,12 +183,8 @@ class PublishTimesheets(Controller):
         if not student:
             return request.not_found()
 
-        content = self._render_report(
-            STUDENT_ACT, student, doc_type, target_date, embed)
-        if not content:
-            return request.not_found()
-
-        return self._report_reponse(content, doc_type, download)
+        return self._publish_report(
+            STUDENT_ACT, student, doc_type, target_date, embed, download)
 
     @route(ACTION_URL, type='http', auth='public', website=False)
     def publish_training_action_timesheet(self, action_id, **kw):
@@ -131,12 +205,8 @@ class PublishTimesheets(Controller):
         if not action:
             return request.not_found()
 
-        content = self._render_report(
-            ACTION_ACT, action, doc_type, target_date, embed)
-        if not content:
-            return request.not_found()
-
-        return self._report_reponse(content, doc_type, download)
+        return self._publish_report(
+            ACTION_ACT, action, doc_type, target_date, embed, download)
 
     @route(EMBED_URL, type='http', auth='public', website=False)
     def publish_embed_training_action_timesheet(self, action_id, **kw):
@@ -157,12 +227,103 @@ class PublishTimesheets(Controller):
         if not action:
             return request.not_found()
 
-        content = self._render_report(
-            ACTION_ACT, action, doc_type, target_date, embed)
+        return self._publish_report(
+            ACTION_ACT, action, doc_type, target_date, embed, download)
+
+    def _publish_report(self, report_xid, record, doc_type, dt, embed=False,
+                        download=False):
+        """ Returns the report response, rendering it only when there is no
+        valid rendered copy in cache. Conditional requests are answered with
+        304 Not Modified without rendering.
+        """
+
+        key, etag, last_modified = \
+            self._render_stamp(report_xid, record, doc_type, dt, embed)
+
+        if self._is_not_modified(etag, last_modified):
+            headers = self._validator_headers(etag, last_modified)
+            return Response(status=304, headers=headers)
+
+        cached = RENDER_CACHE.get(key)
+        if cached and cached[0] == etag:
+            content = cached[1]
+        else:
+            content = self._render_report(
+                report_xid, record, doc_type, dt, embed)
+            if content:
+                RENDER_CACHE[key] = (etag, content)
+
         if not content:
             return request.not_found()
 
-        return self._report_reponse(content, doc_type, download)
+        return self._report_reponse(
+            content, doc_type, download, etag, last_modified)
+
+    def _render_stamp(self, report_xid, record, doc_type, dt, embed=False):
+        """ Returns the cache key, the ETag and the last modification date of
+        the report. They depend on the records the report reads.
+        """
+
+        date_start, date_stop = self._weekly_interval(dt)
+        week_start = date_start.date()
+
+        lang = request.env.context.get('lang')
+        key = (request.env.cr.dbname, report_xid, record._name, record.id,
+               week_start, doc_type, bool(embed), lang)
+
+        last_modified, count = \
+            self._schedule_stamp(record, date_start, date_stop)
+
+        stamp = key + (last_modified, count)
+        etag = md5(repr(stamp).encode('utf-8')).hexdigest()
+
+        return key, etag, last_modified
+
+    @staticmethod
+    def _schedule_stamp(record, date_start, date_stop):
+        """ Returns the most recent ``write_date`` of the records the report
+        of the given target reads in the week and their total number, the
+        latter changes on deletions. One day is added on both sides of the
+        week to be safe with time zones.
+        """
+
+        env = request.env
+        sql = SCHEDULE_STAMP_SQL.format(target=record._table)
+
+        env.cr.execute(sql, {
+            'date_start': date_start - timedelta(days=1),
+            'date_stop': date_stop + timedelta(days=2),
+            'target_id': record.id
+        })
+        updated, count = env.cr.fetchone()
+
+        return updated or datetime(1970, 1, 1), count or 0
+
+    @staticmethod
+    def _is_not_modified(etag, last_modified):
+        httprequest = request.httprequest
+
+        if httprequest.if_none_match:
+            return httprequest.if_none_match.contains(etag)
+
+        since = httprequest.if_modified_since
+        if since and last_modified:
+            return last_modified.replace(microsecond=0) <= since
+
+        return False
+
+    @staticmethod
+    def _validator_headers(etag, last_modified):
+        headers = [
+            ('ETag', '"{}"'.format(etag)),
+            ('Cache-Control', CACHE_CONTROL),
+            ('Access-Control-Allow-Origin', '*')
+        ]
+
+        if last_modified:
+            headers.append(('Last-Modified', http_date(last_modified)))
+
+        return headers
 
     def _render_report(self, report_xid, record, doc_type, dt, embed=False):
         date_start, date_stop = self._weekly_interval(dt)
@@ -200,7 +361,8 @@ class PublishTimesheets(Controller):
 
         return content
 
-    def _report_reponse(self, content, doc_type, download):
+    def _report_reponse(self, content, doc_type, download, etag=None,
+                        last_modified=None):
 
         if doc_type == 'html':
             content_type = 'text/html; charset=utf-8'
@@ -216,13 +378,21 @@ class PublishTimesheets(Controller):
         pdfhttpheaders = [
             ('Content-Type', content_type),
             ('Content-Length', len(content)),
-            ('Content-Disposition', disposition),
-            ('Cache-Control', 'no-cache, no-store, must-revalidate, max-age=0'),
-            ('Pragma', 'no-cache'),
-            ('Expires', '0'),
-            ('Access-Control-Allow-Origin', '*')
+            ('Content-Disposition', disposition)
         ]
 
+        if etag:
+            validators = self._validator_headers(etag, last_modified)
+            pdfhttpheaders.extend(validators)
+        else:
+            pdfhttpheaders.extend([
+                ('Cache-Control', 'no-cache, no-store, must-revalidate, '
+                                  'max-age=0'),
+                ('Pragma', 'no-cache'),
+                ('Expires', '0'),
+                ('Access-Control-Allow-Origin', '*')
+            ])
+
         return request.make_response(content, headers=pdfhttpheaders)
 
     def _get_format_param(self, kw):
@@ -0,0 +1,456 @@
+-- ----------------------------------------------------------------------------
+-- academy_training_session_affinity
+-- Materialized relation between sessions and enrolled students. Rows are kept
+-- up to date by the triggers below, each one refreshes only the sessions or
+-- enrolments affected by the change. Existing rows are updated in place, so
+-- their IDs remain stable. The initial build is left to a scheduled action.
+-- ----------------------------------------------------------------------------
+
+
+-- Rows which should exist for the given sessions or enrolments, all of them
+-- when both arrays are NULL
+CREATE OR REPLACE FUNCTION academy_training_session_affinity_rows(
+    p_session_ids INTEGER[],
+    p_enrolment_ids INTEGER[]
+)
+RETURNS TABLE (
+    create_uid INTEGER,
+    create_date TIMESTAMP,
+    write_uid INTEGER,
+    write_date TIMESTAMP,
+    session_id INTEGER,
+    training_action_id INTEGER,
+    competency_unit_id INTEGER,
+    enrolment_id INTEGER,
+    student_id INTEGER,
+    invited BOOLEAN,
+    company_id INTEGER
+) AS $$
+    SELECT
+        GREATEST ( sess.create_uid, enrol.create_uid ) AS create_uid,
+        GREATEST ( sess.create_date, enrol.create_date ) AS create_date,
+        GREATEST ( sess.write_uid, enrol.write_uid ) AS write_uid,
+        GREATEST ( sess.write_date, enrol.write_date ) AS write_date,
+        sess."id" AS session_id,
+        sess.training_action_id,
+        sess.competency_unit_id,
+        enrol."id" as enrolment_id,
+        enrol.student_id,
+        EXISTS (
+            SELECT
+                1
+            FROM
+                academy_training_session_invitation AS atd
+            WHERE
+                atd.enrolment_id = enrol."id"
+                AND atd.session_id = sess."id"
+        ) AS invited,
+        enrol."company_id" as company_id
+    FROM
+        academy_training_session AS sess
+    INNER JOIN academy_training_action AS ata
+        ON ata."id" = sess.training_action_id
+        AND ata.active
+    INNER JOIN academy_competency_unit AS acu
+        ON acu.ID = sess.competency_unit_id
+        AND acu.active
+    INNER JOIN academy_training_action_enrolment AS enrol
+        ON enrol.training_action_id = ata."id"
+        AND enrol.active
+    INNER JOIN academy_action_enrolment_competency_unit_rel AS rel
+        ON rel.action_enrolment_id = enrol."id"
+        AND rel.competency_unit_id = acu."id"
+    WHERE
+        sess.date_start >= enrol.register::TIMESTAMP
+        AND ( sess.date_stop <=
+              COALESCE(deregister::TIMESTAMP, 'infinity'::TIMESTAMP))
+        AND ( p_session_ids IS NULL OR sess."id" = ANY ( p_session_ids ) )
+        AND ( p_enrolment_ids IS NULL OR enrol."id" = ANY ( p_enrolment_ids ) )
+$$ LANGUAGE sql STABLE;
+
+
+-- Synchronizes the stored rows of the given sessions or enrolments, all of
+-- them when both arrays are NULL. Dynamic SQL is used to get a query plan
+-- for the actual arguments.
+CREATE OR REPLACE FUNCTION academy_training_session_affinity_refresh(
+    p_session_ids INTEGER[],
+    p_enrolment_ids INTEGER[]
+)
+RETURNS VOID AS $$
+BEGIN
+
+    IF p_session_ids = '{}' OR p_enrolment_ids = '{}' THEN
+        RETURN;
+    END IF;
+
+    EXECUTE '
+        WITH wanted AS (
+            SELECT
+                session_id,
+                enrolment_id
+            FROM
+                academy_training_session_affinity_rows ( $1, $2 )
+        )
+        DELETE FROM academy_training_session_affinity AS aff
+        WHERE
+            ( $1 IS NULL OR aff.session_id = ANY ( $1 ) )
+            AND ( $2 IS NULL OR aff.enrolment_id = ANY ( $2 ) )
+            AND NOT EXISTS (
+                SELECT
+                    1
+                FROM
+                    wanted
+                WHERE
+                    wanted.session_id = aff.session_id
+                    AND wanted.enrolment_id = aff.enrolment_id
+            )'
+    USING p_session_ids, p_enrolment_ids;
+
+    EXECUTE '
+        INSERT INTO academy_training_session_affinity AS aff (
+            create_uid,
+            create_date,
+            write_uid,
+            write_date,
+            session_id,
+            training_action_id,
+            competency_unit_id,
+            enrolment_id,
+            student_id,
+            invited,
+            company_id
+        )
+        SELECT
+            *
+        FROM
+            academy_training_session_affinity_rows ( $1, $2 )
+        ON CONFLICT ( session_id, enrolment_id ) DO UPDATE
+        SET
+            write_uid = EXCLUDED.write_uid,
+            write_date = EXCLUDED.write_date,
+            training_action_id = EXCLUDED.training_action_id,
+            competency_unit_id = EXCLUDED.competency_unit_id,
+            student_id = EXCLUDED.student_id,
+            invited = EXCLUDED.invited,
+            company_id = EXCLUDED.company_id
+        WHERE (
+            aff.training_action_id,
+            aff.competency_unit_id,
+            aff.student_id,
+            aff.invited,
+            aff.company_id
+        ) IS DISTINCT FROM (
+            EXCLUDED.training_action_id,
+            EXCLUDED.competency_unit_id,
+            EXCLUDED.student_id,
+            EXCLUDED.invited,
+            EXCLUDED.company_id
+        )'
+    USING p_session_ids, p_enrolment_ids;
+
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Sessions: new ones or changes in the fields used to match the students
+CREATE OR REPLACE FUNCTION academy_training_session_affinity_on_session()
+RETURNS TRIGGER AS $$
+BEGIN
+
+    PERFORM academy_training_session_affinity_refresh(ARRAY[NEW."id"], NULL);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS
+    trg_academy_training_session_affinity_on_session
+    ON academy_training_session;
+
+CREATE TRIGGER trg_academy_training_session_affinity_on_session
+AFTER INSERT OR UPDATE OF
+    training_action_id, competency_unit_id, date_start, date_stop
+ON academy_training_session
+FOR EACH ROW
+EXECUTE FUNCTION academy_training_session_affinity_on_session();
+
+
+-- Enrolments: new ones or changes in the fields used to match the sessions
+CREATE OR REPLACE FUNCTION academy_training_session_affinity_on_enrolment()
+RETURNS TRIGGER AS $$
+BEGIN
+
+    PERFORM academy_training_session_affinity_refresh(NULL, ARRAY[NEW."id"]);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS
+    trg_academy_training_session_affinity_on_enrolment
+    ON academy_training_action_enrolment;
+
+CREATE TRIGGER trg_academy_training_session_affinity_on_enrolment
+AFTER INSERT OR UPDATE OF
+    active, register, deregister, training_action_id, student_id, company_id
+ON academy_training_action_enrolment
+FOR EACH ROW
+EXECUTE FUNCTION academy_training_session_affinity_on_enrolment();
+
+
+-- Competency units in which each student has been enrolled
+CREATE OR REPLACE FUNCTION academy_training_session_affinity_on_enrolment_unit()
+RETURNS TRIGGER AS $$
+BEGIN
+
+    IF TG_OP = 'DELETE' THEN
+        PERFORM academy_training_session_affinity_refresh(
+            NULL, ARRAY[OLD.action_enrolment_id]);
+    ELSE
+        PERFORM academy_training_session_affinity_refresh(
+            NULL, ARRAY[NEW.action_enrolment_id]);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS
+    trg_academy_training_session_affinity_on_enrolment_unit
+    ON academy_action_enrolment_competency_unit_rel;
+
+CREATE TRIGGER trg_academy_training_session_affinity_on_enrolment_unit
+AFTER INSERT OR DELETE
+ON academy_action_enrolment_competency_unit_rel
+FOR EACH ROW
+EXECUTE FUNCTION academy_training_session_affinity_on_enrolment_unit();
+
+
+-- Training actions which have been archived or restored
+CREATE OR REPLACE FUNCTION academy_training_session_affinity_on_action()
+RETURNS TRIGGER AS $$
+BEGIN
+
+    PERFORM academy_training_session_affinity_refresh(
+        NULL,
+        ARRAY(
+            SELECT "id"
+            FROM academy_training_action_enrolment
+            WHERE training_action_id = NEW."id"
+        )
+    );
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS
+    trg_academy_training_session_affinity_on_action
+    ON academy_training_action;
+
+CREATE TRIGGER trg_academy_training_session_affinity_on_action
+AFTER UPDATE OF active
+ON academy_training_action
+FOR EACH ROW
+WHEN ( OLD.active IS DISTINCT FROM NEW.active )
+EXECUTE FUNCTION academy_training_session_affinity_on_action();
+
+
+-- Competency units which have been archived or restored
+CREATE OR REPLACE FUNCTION academy_training_session_affinity_on_unit()
+RETURNS TRIGGER AS $$
+BEGIN
+
+    PERFORM academy_training_session_affinity_refresh(
+        ARRAY(
+            SELECT "id"
+            FROM academy_training_session
+            WHERE competency_unit_id = NEW."id"
+        ),
+        NULL
+    );
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS
+    trg_academy_training_session_affinity_on_unit
+    ON academy_competency_unit;
+
+CREATE TRIGGER trg_academy_training_session_affinity_on_unit
+AFTER UPDATE OF active
+ON academy_competency_unit
+FOR EACH ROW
+WHEN ( OLD.active IS DISTINCT FROM NEW.active )
+EXECUTE FUNCTION academy_training_session_affinity_on_unit();
+
+
+-- Invitations only change the ``invited`` flag of the given pairs of session
+-- and enrolment, both arrays have the same length
+CREATE OR REPLACE FUNCTION academy_training_session_affinity_invited(
+    p_session_ids INTEGER[],
+    p_enrolment_ids INTEGER[]
+)
+RETURNS VOID AS $$
+    UPDATE academy_training_session_affinity AS aff
+    SET invited = EXISTS (
+        SELECT
+            1
+        FROM
+            academy_training_session_invitation AS atd
+        WHERE
+            atd.session_id = aff.session_id
+            AND atd.enrolment_id = aff.enrolment_id
+    )
+    FROM (
+        SELECT DISTINCT
+            session_id,
+            enrolment_id
+        FROM
+            UNNEST ( p_session_ids, p_enrolment_ids )
+                AS pair ( session_id, enrolment_id )
+    ) AS changed
+    WHERE
+        aff.session_id = changed.session_id
+        AND aff.enrolment_id = changed.enrolment_id
+$$ LANGUAGE sql;
+
+
+-- Invitations are inserted in bulk, so they are handled once by statement
+-- using transition tables. These can not be shared between events.
+DROP TRIGGER IF EXISTS
+    trg_academy_training_session_affinity_on_invitation
+    ON academy_training_session_invitation;
+
+DROP FUNCTION IF EXISTS academy_training_session_affinity_on_invitation();
+
+CREATE OR REPLACE FUNCTION academy_training_session_affinity_on_invitation_insert()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_session_ids INTEGER[];
+    v_enrolment_ids INTEGER[];
+BEGIN
+
+    SELECT
+        ARRAY_AGG ( session_id ),
+        ARRAY_AGG ( enrolment_id )
+    INTO
+        v_session_ids,
+        v_enrolment_ids
+    FROM
+        new_invitation;
+
+    PERFORM academy_training_session_affinity_invited(
+        v_session_ids, v_enrolment_ids);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS
+    trg_academy_training_session_affinity_on_invitation_insert
+    ON academy_training_session_invitation;
+
+CREATE TRIGGER trg_academy_training_session_affinity_on_invitation_insert
+AFTER INSERT
+ON academy_training_session_invitation
+REFERENCING NEW TABLE AS new_invitation
+FOR EACH STATEMENT
+EXECUTE FUNCTION academy_training_session_affinity_on_invitation_insert();
+
+
+CREATE OR REPLACE FUNCTION academy_training_session_affinity_on_invitation_delete()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_session_ids INTEGER[];
+    v_enrolment_ids INTEGER[];
+BEGIN
+
+    SELECT
+        ARRAY_AGG ( session_id ),
+        ARRAY_AGG ( enrolment_id )
+    INTO
+        v_session_ids,
+        v_enrolment_ids
+    FROM
+        old_invitation;
+
+    PERFORM academy_training_session_affinity_invited(
+        v_session_ids, v_enrolment_ids);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS
+    trg_academy_training_session_affinity_on_invitation_delete
+    ON academy_training_session_invitation;
+
+CREATE TRIGGER trg_academy_training_session_affinity_on_invitation_delete
+AFTER DELETE
+ON academy_training_session_invitation
+REFERENCING OLD TABLE AS old_invitation
+FOR EACH STATEMENT
+EXECUTE FUNCTION academy_training_session_affinity_on_invitation_delete();
+
+
+-- Transition tables can not be used with a column list, rows whose session
+-- and enrolment have not changed are skipped here
+CREATE OR REPLACE FUNCTION academy_training_session_affinity_on_invitation_update()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_session_ids INTEGER[];
+    v_enrolment_ids INTEGER[];
+BEGIN
+
+    WITH moved AS (
+        SELECT
+            old_invitation.session_id AS old_session_id,
+            old_invitation.enrolment_id AS old_enrolment_id,
+            new_invitation.session_id AS new_session_id,
+            new_invitation.enrolment_id AS new_enrolment_id
+        FROM
+            old_invitation
+        INNER JOIN new_invitation
+            ON new_invitation."id" = old_invitation."id"
+        WHERE (
+            old_invitation.session_id,
+            old_invitation.enrolment_id
+        ) IS DISTINCT FROM (
+            new_invitation.session_id,
+            new_invitation.enrolment_id
+        )
+    ), pair AS (
+        SELECT old_session_id, old_enrolment_id FROM moved
+        UNION
+        SELECT new_session_id, new_enrolment_id FROM moved
+    )
+    SELECT
+        ARRAY_AGG ( old_session_id ),
+        ARRAY_AGG ( old_enrolment_id )
+    INTO
+        v_session_ids,
+        v_enrolment_ids
+    FROM
+        pair;
+
+    IF v_session_ids IS NOT NULL THEN
+        PERFORM academy_training_session_affinity_invited(
+            v_session_ids, v_enrolment_ids);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS
+    trg_academy_training_session_affinity_on_invitation_update
+    ON academy_training_session_invitation;
+
+CREATE TRIGGER trg_academy_training_session_affinity_on_invitation_update
+AFTER UPDATE
+ON academy_training_session_invitation
+REFERENCING OLD TABLE AS old_invitation NEW TABLE AS new_invitation
+FOR EACH STATEMENT
+EXECUTE FUNCTION academy_training_session_affinity_on_invitation_update();
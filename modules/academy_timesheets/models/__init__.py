@@ -5,6 +5,8 @@
 ###############################################################################
 
 
+from . import academy_timesheets_overlapping_mixin
+
 from . import academy_non_teaching_task
 
 from . import academy_training_session_invitation
@@ -24,6 +26,7 @@ from . import academy_training_action_enrolment
 from . import res_config_settings
 
 from . import academy_timesheets_clone_wizard_log
+from . import academy_timesheets_mailing
 
 from . import ir_rule
 
@@ -188,7 +188,7 @@ class AcademyTimesheetsCloneWizardLog(models.Model):
         return name
 
     @api.model
-    def target(self, sequence, wizard, target):
+    def target(self, sequence, wizard, target, buffer=None):
         name = self._get_target_name(target)
         target_ref = self._get_target_reference(target)
         model, _id = target_ref.split(',')
@@ -207,12 +207,13 @@ class AcademyTimesheetsCloneWizardLog(models.Model):
         }
 
         values = self.base_values(values)
-        self.create(values)
+        self._emit(values, buffer)
 
         return sequence
 
     @api.model
-    def dates(self, sequence, wizard, target, from_date, to_date):
+    def dates(self, sequence, wizard, target, from_date, to_date,
+              buffer=None):
         msg = _('Change source and target dates to {} and {} respectively')
         msg = msg.format(from_date.strftime('%x'), to_date.strftime('%x'))
 
@@ -229,12 +230,13 @@ class AcademyTimesheetsCloneWizardLog(models.Model):
         }
 
         values = self.base_values(values)
-        self.create(values)
+        self._emit(values, buffer)
 
         return sequence
 
     @api.model
-    def found(self, sequence, wizard, target, from_date, session):
+    def found(self, sequence, wizard, target, from_date, session,
+              buffer=None):
         name = self._get_target_name(target)
 
         msg = _('Previous session at {} was found, at {}, for «{}»')
@@ -252,12 +254,12 @@ class AcademyTimesheetsCloneWizardLog(models.Model):
         }
 
         values = self.base_values(values)
-        self.create(values)
+        self._emit(values, buffer)
 
         return sequence
 
     @api.model
-    def delete(self, sequence, wizard, target, from_date):
+    def delete(self, sequence, wizard, target, from_date, buffer=None):
         name = self._get_target_name(target)
 
         msg = _('Previously found session, for «{}», with date {} was removed')
@@ -275,11 +277,12 @@ class AcademyTimesheetsCloneWizardLog(models.Model):
         }
 
         values = self.base_values(values)
-        self.create(values)
+        self._emit(values, buffer)
 
         return sequence
 
-    def no_delete(self, sequence, wizard, target, from_date, session, ex):
+    def no_delete(self, sequence, wizard, target, from_date, session, ex,
+                  buffer=None):
         name = self._get_target_name(target)
 
         msg = _('Previously found session at {}, for «{}», with date {} could'
@@ -300,12 +303,13 @@ class AcademyTimesheetsCloneWizardLog(models.Model):
         }
 
         values = self.base_values(values)
-        self.create(values)
+        self._emit(values, buffer)
 
         return sequence
 
     @api.model
-    def clone(self, sequence, wizard, target, from_date, to_date, session):
+    def clone(self, sequence, wizard, target, from_date, to_date, session,
+              buffer=None):
         name = self._get_target_name(target)
 
         msg = _('Session at {}, for «{}», with date {} was cloned to {}')
@@ -325,12 +329,13 @@ class AcademyTimesheetsCloneWizardLog(models.Model):
         }
 
         values = self.base_values(values)
-        self.create(values)
+        self._emit(values, buffer)
 
         return sequence
 
     @api.model
-    def no_clone(self, seq, wizard, target, from_date, to_date, session, ex):
+    def no_clone(self, seq, wizard, target, from_date, to_date, session, ex,
+                 buffer=None):
         name = self._get_target_name(target)
 
         msg = _('Session at {}, for «{}», with date {} could not be cloned '
@@ -352,19 +357,67 @@ class AcademyTimesheetsCloneWizardLog(models.Model):
         }
 
         values = self.base_values(values)
-        self.create(values)
+        self._emit(values, buffer)
 
         return seq
 
     @api.model
-    def create(self, values):
+    def summary(self, sequence, wizard, cloned, removed, failed, elapsed,
+                buffer=None):
+        rate = (cloned + removed) / elapsed if elapsed > 0 else 0.0
+
+        msg = _('{} sessions were cloned and {} were removed in {:.2f} '
+                'seconds ({:.2f} sessions per second). {} operations failed')
+        msg = msg.format(cloned, removed, elapsed, rate, failed)
+
+        sequence = sequence + 10
+        values = {
+            'kind': '40' if failed else '20',
+            'wizard_code': wizard.id,
+            'name': _('Summary'),
+            'description': msg,
+            'sequence': sequence
+        }
+
+        values = self.base_values(values)
+        self._emit(values, buffer)
+
+        return sequence
+
+    @api.model
+    def _emit(self, values, buffer=None):
+        """ Creates the log record or, if a ``buffer`` list is given, appends
+        its values to be created later using ``flush_buffer``
+        """
+
+        if buffer is None:
+            self.create(values)
+        else:
+            buffer.append(values)
+
+    @api.model
+    def flush_buffer(self, buffer):
+        """ Creates all the log records in buffer at once and empties it
+        """
+
+        result = self.browse()
+
+        if buffer:
+            result = self.create(list(buffer))
+            del buffer[:]
+
+        return result
+
+    @api.model_create_multi
+    def create(self, values_list):
         """ Ensure level
         """
 
-        values['level'] = int(values['kind'])
+        for values in values_list:
+            values['level'] = int(values['kind'])
 
         parent = super(AcademyTimesheetsCloneWizardLog, self)
-        result = parent.create(values)
+        result = parent.create(values_list)
 
         return result
 
@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#    License, author and contributors information in:                         #
+#    __openerp__.py file at the root folder of this module.                   #
+###############################################################################
+
+from odoo import models, fields, api
+from odoo.modules.registry import Registry
+from odoo.tools.translate import _
+from odoo.tools import split_every
+
+from logging import getLogger
+from base64 import encodebytes
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from threading import current_thread
+import json
+
+
+_logger = getLogger(__name__)
+
+
+MAILING_WORKERS_PARAM = 'academy_timesheets.mailing_workers'
+MAILING_WORKERS = 4
+MAILING_CHUNK_SIZE = 50
+
+# Failed mailings are retried by the scheduled action until this number of
+# attempts, running mailings without progress for a while are retried too
+MAILING_MAX_ATTEMPTS = 3
+MAILING_STALE_MINUTES = 30
+
+WIZARD_MODEL = 'academy.timesheets.send.by.mail.wizard'
+
+
+def render_report_pdf(dbname, uid, context, report_xid, res_id, data=None):
+    """ Renders the PDF of a single report using its own cursor, so it can
+    be called from a worker thread.
+    """
+
+    with api.Environment.manage():
+        with Registry(dbname).cursor() as cr:
+            env = api.Environment(cr, uid, context)
+            report = env.ref(report_xid)
+            content, c_type = report.render_qweb_pdf([res_id], data=data)
+
+    return content
+
+
+class AcademyTimesheetsMailing(models.Model):
+    """ Queued schedule mailing, it is created by the send by mail wizard and
+    processed by a scheduled action. It also shows the progress.
+    """
+
+    _name = 'academy.timesheets.mailing'
+    _description = u'Academy timesheets mailing'
+
+    _rec_name = 'name'
+    _order = 'create_date DESC'
+
+    name = fields.Char(
+        string='Name',
+        required=True,
+        readonly=True,
+        index=True,
+        default=lambda self: _('Send schedule'),
+        help='Short description',
+        size=255,
+        translate=False
+    )
+
+    state = fields.Selection(
+        string='State',
+        required=True,
+        readonly=True,
+        index=True,
+        default='queued',
+        help='Current mailing state',
+        selection=[
+            ('queued', 'Queued'),
+            ('running', 'Running'),
+            ('done', 'Done'),
+            ('failed', 'Failed')
+        ]
+    )
+
+    active_model = fields.Char(
+        string='Active model',
+        required=True,
+        readonly=True,
+        index=False,
+        default=None,
+        help='Model of the selected records',
+        size=255,
+        translate=False
+    )
+
+    res_ids = fields.Text(
+        string='Records',
+        required=True,
+        readonly=True,
+        index=False,
+        default='[]',
+        help='JSON list with the IDs of the selected records',
+        translate=False
+    )
+
+    date_start = fields.Datetime(
+        string='Beginning',
+        required=True,
+        readonly=True,
+        index=False,
+        default=None,
+        help='Date/time of session start'
+    )
+
+    date_stop = fields.Datetime(
+        string='Ending',
+        required=True,
+        readonly=True,
+        index=False,
+        default=None,
+        help='Date/time of session end'
+    )
+
+    full_weeks = fields.Boolean(
+        string='Full weeks',
+        required=False,
+        readonly=True,
+        index=False,
+        default=True,
+        help='Always show full weeks'
+    )
+
+    force_send = fields.Boolean(
+        string='Force send',
+        required=False,
+        readonly=True,
+        index=False,
+        default=False,
+        help='If True, the generated mails will be sent as soon as they are '
+             'created, otherwise they will wait for the mail queue'
+    )
+
+    total_count = fields.Integer(
+        string='Emails',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of emails will be sent'
+    )
+
+    sent_count = fields.Integer(
+        string='Enqueued',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of emails already enqueued'
+    )
+
+    progress = fields.Float(
+        string='Progress',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0.0,
+        digits=(16, 2),
+        help='Percentage of emails already enqueued',
+        compute='_compute_progress'
+    )
+
+    @api.depends('state', 'total_count', 'sent_count')
+    def _compute_progress(self):
+        for record in self:
+            if record.total_count:
+                ratio = record.sent_count / record.total_count
+                record.progress = min(ratio * 100.0, 100.0)
+            else:
+                record.progress = 100.0 if record.state == 'done' else 0.0
+
+    processed_ids = fields.Text(
+        string='Processed targets',
+        required=True,
+        readonly=True,
+        index=False,
+        default='[]',
+        help='JSON list with the IDs of the targets already mailed, they '
+             'will be skipped when the mailing is retried',
+        translate=False
+    )
+
+    attempt_count = fields.Integer(
+        string='Attempts',
+        required=False,
+        readonly=True,
+        index=False,
+        default=0,
+        help='Number of times the mailing has been processed'
+    )
+
+    error = fields.Text(
+        string='Error',
+        required=False,
+        readonly=True,
+        index=False,
+        default=None,
+        help='What the system said when the mailing failed',
+        translate=False
+    )
+
+    def refresh_progress(self):
+        """ Used by the form button, the client reloads the record """
+        return True
+
+    def retry(self):
+        """ Used by the form button, failed mailings are queued again and
+        they will continue from the first target which was not mailed
+        """
+
+        failed_set = self.filtered(lambda r: r.state == 'failed')
+        failed_set.write({'state': 'queued', 'attempt_count': 0})
+
+        return True
+
+    @api.model
+    def process_queue(self):
+        """ Scheduled action, processes all the queued mailings committing
+        after each one of them. Failed mailings are retried a few times and
+        running mailings without progress are retried too, their worker was
+        stopped before finishing them.
+        """
+
+        stale = timedelta(minutes=MAILING_STALE_MINUTES)
+        stale = fields.Datetime.now() - stale
+
+        domain = [
+            '|', '|',
+            ('state', '=', 'queued'),
+            '&', ('state', '=', 'running'), ('write_date', '<', stale),
+            '&', ('state', '=', 'failed'),
+            ('attempt_count', '<', MAILING_MAX_ATTEMPTS)
+        ]
+        mailing_set = self.search(domain, order='id ASC')
+
+        for mailing in mailing_set:
+            mailing.with_user(mailing.create_uid).process()
+
+    def process(self):
+        """ Renders the reports and enqueues the emails. Renders are shared
+        by all the recipients of the same target. Progress is committed after
+        each chunk, so a retry will skip the targets already mailed.
+        """
+
+        for record in self:
+            record.write({
+                'state': 'running',
+                'error': None,
+                'attempt_count': record.attempt_count + 1
+            })
+            record._commit()
+
+            try:
+                record._process()
+            except Exception as ex:
+                self.env.cr.rollback()
+                self.invalidate_cache()
+                _logger.exception('Mailing %s failed', record.id)
+                record.write({'state': 'failed', 'error': str(ex)})
+            else:
+                record.write({'state': 'done'})
+
+            record._commit()
+
+    def _process(self):
+        self.ensure_one()
+
+        wizard_obj = self.env[WIZARD_MODEL]
+        model = self.active_model
+
+        record_set = self.env[model].browse(json.loads(self.res_ids))
+        record_set = record_set.exists()
+
+        # Recipients of each target, a target can be shared by many records
+        jobs = {}
+        for record in record_set:
+            target = wizard_obj._get_target(record, model)
+            recipients = wizard_obj._get_recipients(record, model)
+            for target_id in target.ids:
+                job = jobs.setdefault(target_id, [])
+                job.extend(item for item in recipients if item not in job)
+
+        self.write({'total_count': sum(len(item) for item in jobs.values())})
+        self._commit()
+
+        template = wizard_obj._get_email_template(model)
+        template = template.with_context(self._compute_report_context())
+        report_xid = wizard_obj._get_report_xid(model)
+
+        processed = set(json.loads(self.processed_ids or '[]'))
+        pending_ids = [item for item in jobs.keys() if item not in processed]
+
+        for target_ids in split_every(MAILING_CHUNK_SIZE, pending_ids):
+            target_ids = list(target_ids)
+
+            # Templates with their own report render it in generate_email,
+            # the training action report is rendered once by target here
+            attachments = {}
+            if not template.report_template:
+                contents = self._render_reports(
+                    template, report_xid, target_ids)
+                attachments = self._create_attachments(
+                    template, target_ids, contents)
+
+            mail_set = self._create_mails(
+                template, target_ids, jobs, attachments)
+
+            if self.force_send:
+                mail_set.send()
+
+            processed.update(target_ids)
+            self.write({
+                'sent_count': self.sent_count + len(mail_set),
+                'processed_ids': json.dumps(sorted(processed))
+            })
+            self._commit()
+
+    def _compute_report_context(self):
+        self.ensure_one()
+
+        context = self.env.context.copy()
+
+        context.update({
+            'time_span': {
+                'date_start': self.date_start.strftime('%Y-%m-%d'),
+                'date_stop': self.date_stop.strftime('%Y-%m-%d'),
+            },
+            'full_weeks': self.full_weeks,
+            'active_model': self._name,
+            'active_id': self.id,
+            'active_ids': []
+        })
+
+        return context
+
+    def _report_data(self, template, target_id):
+        """ Training action reports take the interval from ``data`` """
+
+        return {
+            'doc_ids': [target_id],
+            'doc_model': 'academy.training.action',
+            'interval': {
+                'date_start': self.date_start,
+                'date_stop': self.date_stop
+            },
+            'full_weeks': self.full_weeks
+        }
+
+    def _get_workers(self):
+        param_obj = self.env['ir.config_parameter'].sudo()
+        value = param_obj.get_param(MAILING_WORKERS_PARAM, MAILING_WORKERS)
+
+        try:
+            workers = int(value)
+        except (ValueError, TypeError):
+            workers = MAILING_WORKERS
+
+        # Test cursors can not be shared with other threads
+        if getattr(current_thread(), 'testing', False):
+            workers = 1
+
+        return max(workers, 1)
+
+    def _render_reports(self, template, report_xid, target_ids):
+        """ Renders one PDF by target, in parallel when more than one worker
+        has been configured.
+
+        Returns:
+            dict: PDF content by target ID
+        """
+
+        context = template.env.context
+        workers = min(self._get_workers(), len(target_ids))
+
+        if workers < 2:
+            report = template.env.ref(report_xid)
+            result = {}
+            for target_id in target_ids:
+                data = self._report_data(template, target_id)
+                result[target_id] = report.render_qweb_pdf(
+                    [target_id], data=data)[0]
+
+            return result
+
+        dbname, uid = self.env.cr.dbname, self.env.uid
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                target_id: executor.submit(
+                    render_report_pdf, dbname, uid, context, report_xid,
+                    target_id, self._report_data(template, target_id))
+                for target_id in target_ids
+            }
+
+            return {key: item.result() for key, item in futures.items()}
+
+    def _create_attachments(self, template, target_ids, contents):
+        target_model = template.model
+        target_set = self.env[target_model].browse(target_ids)
+
+        values_list = []
+        for target in target_set:
+            values_list.append({
+                'name': target.display_name,
+                'type': 'binary',
+                'datas': encodebytes(contents[target.id]),
+                'res_model': target_model,
+                'res_id': target.id
+            })
+
+        attachment_set = self.env['ir.attachment'].create(values_list)
+
+        return dict(zip(target_ids, attachment_set.ids))
+
+    def _create_mails(self, template, target_ids, jobs, attachments):
+        """ Generates the email values once by target, using the template as
+        ``send_mail`` does, and creates all the emails of the chunk at once.
+        Email values are the same the synchronous wizard uses.
+        """
+
+        generated = template.generate_email(target_ids)
+
+        # Reports rendered by the template are stored once by target and
+        # shared by all its emails, as the training action ones are
+        values_list = []
+        for target_id in target_ids:
+            for name, datas in generated[target_id].pop('attachments', []):
+                values_list.append({
+                    'name': name,
+                    'datas': datas,
+                    'type': 'binary',
+                    'res_model': template.model,
+                    'res_id': target_id
+                })
+
+        attachment_set = self.env['ir.attachment'].create(values_list)
+        generated_ids = {}
+        for attachment in attachment_set:
+            generated_ids.setdefault(attachment.res_id, []).append(
+                attachment.id)
+
+        values_list = []
+        for target_id in target_ids:
+            attachment_ids = generated_ids.get(target_id, [])
+            if target_id in attachments:
+                attachment_ids = attachment_ids + [attachments[target_id]]
+
+            for recipient in jobs[target_id]:
+                email_values = {'email_to': recipient}
+                values_list.append(self._mail_values(
+                    generated[target_id], email_values, attachment_ids))
+
+        return self.env['mail.mail'].sudo().create(values_list)
+
+    @staticmethod
+    def _mail_values(values, email_values, attachment_ids):
+        """ Builds the values of a single email from the generated template
+        values, this is the same ``mail.template.send_mail`` does after
+        generating them
+        """
+
+        values = dict(values)
+        values['recipient_ids'] = \
+            [(4, pid) for pid in values.get('partner_ids', list())]
+        values['attachment_ids'] = \
+            [(4, aid) for aid in values.get('attachment_ids', list())]
+        values['attachment_ids'] += [(4, aid) for aid in attachment_ids]
+        values.update(email_values)
+
+        if 'email_from' in values and not values.get('email_from'):
+            values.pop('email_from')
+
+        return values
+
+    def _commit(self):
+        """ Progress must be visible from other transactions, but test
+        cursors can not be committed
+        """
+
+        if not getattr(current_thread(), 'testing', False):
+            self.env.cr.commit()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+""" AcademyTimesheetsOverlappingMixin
+
+This module contains an abstract model which allows to search for records
+whose ``[date_start, date_stop)`` interval overlaps with a given one. It
+uses a ``tsrange`` expression backed by a GiST index, so conflict checks
+are resolved with index lookups instead of pairs of date comparisons.
+"""
+
+from odoo import models, api, fields
+
+from logging import getLogger
+from datetime import datetime
+
+
+_logger = getLogger(__name__)
+
+
+# Only well-formed intervals can be converted into ranges
+OVERLAPPING_GIST_INDEX = '''
+    CREATE INDEX IF NOT EXISTS {table}_tsrange_gist_idx
+    ON {table} USING gist ( tsrange ( date_start, date_stop ) )
+    WHERE date_start <= date_stop
+'''
+
+# Empty ``[)`` ranges overlap nothing, zero-length records are compared by
+# hand to keep the behavior of ``date_start < stop AND date_stop > start``
+OVERLAPPING_WHERE = '''
+    "{table}".date_start <= "{table}".date_stop
+    AND (
+        tsrange ( "{table}".date_start, "{table}".date_stop )
+            && tsrange ( %s :: TIMESTAMP, %s :: TIMESTAMP )
+        OR (
+            "{table}".date_start = "{table}".date_stop
+            AND "{table}".date_start > %s :: TIMESTAMP
+            AND "{table}".date_start < %s :: TIMESTAMP
+        )
+    )
+'''
+
+# Zero-length searches, the range of the search would be empty
+OVERLAPPING_INSTANT_WHERE = '''
+    "{table}".date_start < %s :: TIMESTAMP
+    AND "{table}".date_stop > %s :: TIMESTAMP
+'''
+
+
+class AcademyTimesheetsOverlappingMixin(models.AbstractModel):
+    """ Models with ``date_start`` and ``date_stop`` datetime columns can
+    extend this to search for overlapping records
+    """
+
+    _name = 'academy.timesheets.overlapping.mixin'
+    _description = u'Academy timesheets overlapping mixin'
+
+    def init(self):
+        """ Ensures the range index exists in the table of the model """
+
+        parent = super(AcademyTimesheetsOverlappingMixin, self)
+        parent.init()
+
+        if not self._abstract:
+            sql = OVERLAPPING_GIST_INDEX.format(table=self._table)
+            self.env.cr.execute(sql)
+
+    @staticmethod
+    def _overlapping_bound(value):
+        if isinstance(value, datetime):
+            value = fields.Datetime.to_string(value)
+
+        return value
+
+    @api.model
+    def _overlapping_query(self, start, stop, domain=None):
+        """ Returns the query which searches for the records that overlap
+        with ``[start, stop)`` and match the given domain. Access rules are
+        applied. Zero-length intervals, on both sides, overlap the intervals
+        which strictly contain them.
+        """
+
+        query = self._where_calc(domain or [])
+        self._apply_ir_rules(query, 'read')
+
+        start = self._overlapping_bound(start)
+        stop = self._overlapping_bound(stop)
+
+        if start == stop:
+            where = OVERLAPPING_INSTANT_WHERE.format(table=self._table)
+            params = [stop, start]
+        else:
+            where = OVERLAPPING_WHERE.format(table=self._table)
+            params = [start, stop, start, stop]
+
+        query.where_clause.append(where)
+        query.where_clause_params.extend(params)
+
+        return query
+
+    @api.model
+    def overlapping(self, start, stop, domain=None, order=None):
+        """ Searches for the records whose ``[date_start, date_stop)`` interval
+        overlaps with ``[start, stop)``.
+
+        Args:
+            start (datetime|str): lower bound (included)
+            stop (datetime|str): upper bound (excluded)
+            domain (list): optional domain the records must also match
+            order (str): optional order, defaults to model ``_order``
+
+        Returns:
+            Model: recordset with all the matching records
+        """
+
+        fnames = ['date_start', 'date_stop']
+        self._flush_search(domain or [], fields=fnames, order=order)
+
+        query = self._overlapping_query(start, stop, domain)
+        order_by = self._generate_order_by(order, query)
+        from_clause, where_clause, params = query.get_sql()
+
+        sql = 'SELECT "{}".id FROM {} WHERE {} {}'.format(
+            self._table, from_clause, where_clause or 'TRUE', order_by)
+
+        self.env.cr.execute(sql, params)
+        record_ids = [row[0] for row in self.env.cr.fetchall()]
+
+        return self.browse(record_ids)
@@ -9,7 +9,6 @@ from odoo.tools import safe_eval
 from odoo.tools.translate import _
 from odoo.osv.expression import AND, TRUE_DOMAIN, FALSE_DOMAIN
 from odoo.exceptions import UserError, MissingError
-from odoo.tools import DEFAULT_SERVER_DATE_FORMAT as DATE_FORMAT
 
 from datetime import timedelta, datetime, date, time
 import pytz
@@ -41,6 +40,69 @@ CHECK_NON_TRAINING_TASK = """
     )
 """
 
+# Invites the students enrolled in the training action and competency unit of
+# each session. Existing invitations are reactivated. When a student has more
+# than one matching enrolment only the first one will be used.
+INVITE_ALL_SQL = """
+    INSERT INTO academy_training_session_invitation AS inv (
+        session_id,
+        enrolment_id,
+        student_id,
+        active,
+        present,
+        create_uid,
+        create_date,
+        write_uid,
+        write_date
+    )
+    SELECT DISTINCT ON ( ats."id", enr.student_id )
+        ats."id",
+        enr."id",
+        enr.student_id,
+        enr.active,
+        FALSE,
+        %(uid)s,
+        ( NOW ( ) AT TIME ZONE 'UTC' ),
+        %(uid)s,
+        ( NOW ( ) AT TIME ZONE 'UTC' )
+    FROM
+        academy_training_session AS ats
+    INNER JOIN academy_training_action_enrolment AS enr
+        ON enr.training_action_id = ats.training_action_id
+    INNER JOIN academy_action_enrolment_competency_unit_rel AS rel
+        ON rel.action_enrolment_id = enr."id"
+        AND rel.competency_unit_id = ats.competency_unit_id
+    WHERE
+        ats."id" = ANY ( %(session_ids)s )
+        AND enr."id" = ANY ( %(enrolment_ids)s )
+        AND enr.register <= ats.date_start :: DATE
+        AND (
+            enr.deregister IS NULL
+            OR enr.deregister >= ats.date_stop :: DATE
+        )
+        AND NOT EXISTS (
+            SELECT
+                1
+            FROM
+                academy_training_session_invitation AS other
+            WHERE
+                other.session_id = ats."id"
+                AND other.student_id = enr.student_id
+                AND other.enrolment_id <> enr."id"
+        )
+    ORDER BY
+        ats."id",
+        enr.student_id,
+        enr."id"
+    ON CONFLICT ( session_id, enrolment_id ) DO UPDATE
+    SET
+        active = EXCLUDED.active,
+        write_uid = EXCLUDED.write_uid,
+        write_date = EXCLUDED.write_date
+    WHERE
+        inv.active IS DISTINCT FROM EXCLUDED.active
+"""
+
 
 class AcademyTrainingSession(models.Model):
     """Temporarily delimited phase or act in which part of a training action
@@ -50,7 +112,11 @@ class AcademyTrainingSession(models.Model):
     _name = "academy.training.session"
     _description = "Academy training session"
 
-    _inherit = ["mail.thread", "ownership.mixin"]
+    _inherit = [
+        "mail.thread",
+        "ownership.mixin",
+        "academy.timesheets.overlapping.mixin",
+    ]
 
     _rec_name = "id"
     _order = "date_start ASC"
@@ -1377,91 +1443,85 @@ class AcademyTrainingSession(models.Model):
         return serialized
 
     def invite_all(self):
-        enrol_obj = self.env["academy.training.action.enrolment"]
-        invitation_obj = self.env["academy.training.session.invitation"]
+        """Invites all the students enrolled in the training action and
+        competency unit of each session in recordset.
 
-        for record in self:
-            invitation_ops = []
-
-            date_start = record.date_start.strftime(DATE_FORMAT)
-            date_stop = record.date_stop.strftime(DATE_FORMAT)
-
-            enrol_domain = [
-                "&",
-                "&",
-                "&",
-                ("training_action_id", "=", record.training_action_id.id),
-                ("competency_unit_ids", "=", record.competency_unit_id.id),
-                ("register", "<=", date_start),
-                "|",
-                ("deregister", "=", False),
-                ("deregister", ">=", date_stop),
-            ]
+        Enrolments are resolved for the whole recordset with a single search,
+        so access rules still apply, and invitations are created or
+        reactivated using a single INSERT ... ON CONFLICT statement.
+        """
+        session_set = self.filtered("training_action_id")
+        if not session_set:
+            return
 
-            enrol_set = enrol_obj.search(enrol_domain)
+        enrol_obj = self.env["academy.training.action.enrolment"]
+        invitation_obj = self.env["academy.training.session.invitation"]
 
-            for enrol in enrol_set:
-                domain = [
-                    (
-                        "session_id",
-                        "=",
-                        record.id,
-                    ),
-                    ("enrolment_id", "=", enrol.id),
-                ]
-                invitation = invitation_obj.search(domain, limit=1)
+        action_ids = session_set.mapped("training_action_id").ids
+        enrol_domain = [("training_action_id", "in", action_ids)]
+        enrolment_ids = enrol_obj._search(enrol_domain)
+        if not enrolment_ids:
+            return
 
-                if invitation:
-                    o2m_op = (1, invitation.id, {"active": enrol.active})
-                else:
-                    o2m_op = (
-                        0,
-                        0,
-                        {
-                            "session_id": record.id,
-                            "enrolment_id": enrol.id,
-                            "active": enrol.active,
-                        },
-                    )
+        session_set.flush()
+        enrol_obj.flush()
+        invitation_obj.flush()
 
-                invitation_ops.append(o2m_op)
+        params = {
+            "uid": self.env.uid,
+            "session_ids": session_set.ids,
+            "enrolment_ids": list(enrolment_ids),
+        }
+        self.env.cr.execute(INVITE_ALL_SQL, params)
 
-            record.write({"invitation_ids": invitation_ops})
+        invitation_obj.invalidate_cache()
+        session_set.invalidate_cache(["invitation_ids", "invitation_count"])
+        enrol_obj.invalidate_cache(["invitation_ids", "invitation_count"])
+        self.env["academy.student"].invalidate_cache(
+            ["invitation_ids", "invitation_count"]
+        )
 
-    @api.model
-    def create(self, values):
+    @api.model_create_multi
+    def create(self, values_list):
         tracking_disable_ctx = self.env.context.copy()
         tracking_disable_ctx.update({"tracking_disable": True})
 
-        self._update_task_name(values)
-
         self_ctx = self.with_context(tracking_disable_ctx)
-        with self.env.cr.savepoint():
-            self_ctx._adjust_existing_facility_reservations(values)
 
-        if "kind" in values:
-            if values.get("kind", None) == "teach":
-                values["task_id"] = None
-            else:
-                values["training_action_id"] = None
-                values["competency_unit_id"] = None
+        for values in values_list:
+            self._update_task_name(values)
 
-        _super = super(AcademyTrainingSession, self)
-        result = _super.create(values)
+            with self.env.cr.savepoint():
+                self_ctx._adjust_existing_facility_reservations(values)
 
-        if "invitation_ids" not in values:
-            result.invite_all()
+            if "kind" in values:
+                if values.get("kind", None) == "teach":
+                    values["task_id"] = None
+                else:
+                    values["training_action_id"] = None
+                    values["competency_unit_id"] = None
 
-        if "reservation_ids" in values:
-            reservation_values = {
-                "date_start": result.date_start,
-                "date_stop": result.date_stop,
-                "name": result.training_action_id.action_name,
-                "description": result.competency_unit_id.name,
-            }
+        _super = super(AcademyTrainingSession, self)
+        result = _super.create(values_list)
+
+        uninvited = result.browse()
+        for record, values in zip(result, values_list):
+            if "invitation_ids" not in values:
+                uninvited += record
+
+            if "reservation_ids" in values:
+                reservation_values = {
+                    "date_start": record.date_start,
+                    "date_stop": record.date_stop,
+                    "name": record.training_action_id.action_name,
+                    "description": record.competency_unit_id.name,
+                }
 
-            result_ctx = result.with_context(tracking_disable_ctx)
-            result_ctx.reservation_ids.write(reservation_values)
+                record_ctx = record.with_context(tracking_disable_ctx)
+                record_ctx.reservation_ids.write(reservation_values)
+
+        if uninvited:
+            uninvited.invite_all()
 
         # result._update_session_followers()
 
@@ -1570,11 +1630,47 @@ class AcademyTrainingSession(models.Model):
     def copy(self, default=None):
         self.ensure_one()
 
-        default = dict(default or {})
+        default = self._copy_default(default)
 
         ctx = dict(self.env.context, tracking_disable=True)
         parent = super(AcademyTrainingSession, self.with_context(ctx))
 
+        return parent.copy(default=default)
+
+    def _copy_many(self, default_list):
+        """ Copies each session using its own defaults, as ``copy`` does,
+        but creating all the new sessions with a single ``create`` call
+
+        Args:
+            default_list (list): one dictionary of defaults by session
+
+        Returns:
+            recordset: new sessions, in the same order
+        """
+
+        ctx = dict(self.env.context, tracking_disable=True)
+
+        values_list = []
+        for record, default in zip(self, default_list):
+            default = record._copy_default(default)
+            values_list.append(record.copy_data(default)[0])
+
+        target_set = self.with_context(ctx).create(values_list)
+
+        for record, target in zip(self, target_set):
+            if record.description:
+                record.with_context(ctx).copy_translations(target)
+
+        return target_set.with_context(self.env.context)
+
+    def _copy_default(self, default=None):
+        """ Completes the given defaults with the values a copy of this
+        session needs: dates, state and lines
+        """
+        self.ensure_one()
+
+        default = dict(default or {})
+
         if "date_start" not in default:
             date_start = self.date_start + timedelta(days=7)
             default["date_start"] = date_start.strftime("%Y-%m-%d %H:%M:%S")
@@ -1627,7 +1723,7 @@ class AcademyTrainingSession(models.Model):
                 m2m_op = (0, 0, values)
                 default["reservation_ids"].append(m2m_op)
 
-        return parent.copy(default=default)
+        return default
 
     def _update_task_name(self, values):
         action_id = self.env.context.get("default_training_action_id", False)
@@ -1911,25 +2007,20 @@ class AcademyTrainingSession(models.Model):
             message = "A training action has not been found as expected"
             raise MissingError(message)
 
-    def _append_overlapping_domain(self, domains, values):
+    def _compute_overlapping_interval(self, values):
         date_start, date_stop = self._compute_new_datetimes(
             values, as_str=True
         )
 
-        if date_start and date_stop:
-            overlapped_domain = [
-                "&",
-                ("date_start", "<", date_stop),
-                ("date_stop", ">", date_start),
-            ]
-            domains.append(overlapped_domain)
-        else:
+        if not (date_start and date_stop):
             message = (
                 "The date range for the training session could not be "
                 "determined"
             )
             raise MissingError(message)
 
+        return date_start, date_stop
+
     @staticmethod
     def _append_confirmed_domain(domains):
         state_confirmed_domain = [("state", "=", "confirmed")]
@@ -1945,11 +2036,13 @@ class AcademyTrainingSession(models.Model):
 
         self._append_without_session_domain(domains)
         self._append_training_action_domain(domains, values)
-        self._append_overlapping_domain(domains, values)
         self._append_confirmed_domain(domains)
 
+        date_start, date_stop = self._compute_overlapping_interval(values)
+
         domain = AND(domains)
-        reservation_set = reservation_obj.search(domain)
+        reservation_set = reservation_obj.overlapping(
+            date_start, date_stop, domain)
 
         return reservation_set
 
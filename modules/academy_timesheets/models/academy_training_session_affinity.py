@@ -4,8 +4,11 @@
 #    __openerp__.py file at the root folder of this module.                   #
 ###############################################################################
 
-from odoo import models, fields
-from odoo.tools import drop_view_if_exists
+from odoo import models, fields, api
+from odoo.tools.translate import _
+from odoo.tools import drop_view_if_exists, table_kind
+from odoo.exceptions import UserError
+from odoo.addons.academy_base.utils.sql_helpers import execute_sql_script
 
 from logging import getLogger
 
@@ -23,8 +26,6 @@ class AcademyTrainingSessionAffinity(models.Model):
 
     _order = 'session_id DESC, student_id DESC'
 
-    _auto = False
-
     _check_company_auto = True
 
     company_id = fields.Many2one(
@@ -203,65 +204,57 @@ class AcademyTrainingSessionAffinity(models.Model):
         related='student_id.image_128'
     )
 
-    def prevent_actions(self):
-        actions = ['INSERT', 'UPDATE', 'DELETE']
+    _sql_constraints = [
+        (
+            'unique_enrolment_by_session',
+            'UNIQUE(session_id, enrolment_id)',
+            _(u'The enrolment has already been used in this session')
+        )
+    ]
+
+    def _auto_init(self):
+        """ Older versions used a SQL VIEW, it must be removed before the
+        table can be created
+        """
 
-        BASE_SQL = '''
-            CREATE OR REPLACE RULE {table}_{action} AS
-                ON {action} TO {table} DO INSTEAD NOTHING
-        '''
+        if table_kind(self.env.cr, self._table) == 'v':
+            drop_view_if_exists(self.env.cr, self._table)
 
-        for action in actions:
-            sql = BASE_SQL.format(table=self._table, action=action)
-            self.env.cr.execute(sql)
+        return super(AcademyTrainingSessionAffinity, self)._auto_init()
 
     def init(self):
-        sentence = '''CREATE or REPLACE VIEW {} as ({})'''
-
-        drop_view_if_exists(self.env.cr, self._table)
-
-        self.env.cr.execute(sentence.format(self._table, self._view_sql))
-
-        self.prevent_actions()
-
-    # Raw sentence used to create new model based on SQL VIEW
-    _view_sql = '''
-        SELECT
-            ROW_NUMBER ( ) OVER (wnd) :: INTEGER AS "id",
-            GREATEST ( sess.create_uid, enrol.create_uid ) AS create_uid,
-            GREATEST ( sess.create_date, enrol.create_date ) AS create_date,
-            GREATEST ( sess.write_uid, enrol.write_uid ) AS write_uid,
-            GREATEST ( sess.write_date, enrol.write_date ) AS write_date,
-            sess."id" AS session_id,
-            sess.training_action_id,
-            sess.competency_unit_id,
-            enrol."id" as enrolment_id,
-            enrol.student_id,
-            atd."id"::BOOLEAN AS invited,
-            enrol."company_id" as company_id
-        FROM
-            academy_training_session AS sess
-        INNER JOIN academy_training_action AS ata
-            ON ata."id" = sess.training_action_id
-            AND ata.active
-        INNER JOIN academy_competency_unit AS acu
-            ON acu.ID = sess.competency_unit_id
-            AND acu.active
-        INNER JOIN academy_training_action_enrolment AS enrol
-            ON enrol.training_action_id = ata."id"
-            AND enrol.active
-        INNER JOIN academy_action_enrolment_competency_unit_rel AS rel
-            ON rel.action_enrolment_id = enrol."id"
-            AND rel.competency_unit_id = acu."id"
-        LEFT JOIN academy_training_session_invitation AS atd
-            ON atd.enrolment_id = enrol."id"
-            AND atd.session_id = sess."id"
-        WHERE
-            sess.date_start >= enrol.register::TIMESTAMP
-            AND ( sess.date_stop <=
-                  COALESCE(deregister::TIMESTAMP, 'infinity'::TIMESTAMP))
-        WINDOW wnd AS (ORDER BY enrol."id" ASC, sess."id" ASC)
-    '''
+        """ Creates the functions and the triggers which keep the table up to
+        date. Existing rows are synchronized by a scheduled action, which can
+        also be run manually, in order not to slow down module updates.
+        """
+
+        rel_path = ('academy_timesheets', 'data')
+        file_name = 'academy_training_session_affinity.sql'
+        execute_sql_script(self.env.cr, rel_path, file_name, self._name)
+
+    @api.model
+    def refresh_affinity(self, session_ids=None, enrolment_ids=None):
+        """ Synchronizes the stored rows of the given sessions or enrolments,
+        all of them when no one has been given. Triggers do this on each
+        change, it is only needed after bulk operations which skip them.
+        """
+
+        self.flush()
+
+        sql = 'SELECT academy_training_session_affinity_refresh(%s, %s)'
+        self.env.cr.execute(sql, (session_ids, enrolment_ids))
+
+        self.invalidate_cache()
+
+    @api.model_create_multi
+    def create(self, values_list):
+        raise UserError(_('Session affinity is maintained by the database'))
+
+    def write(self, values):
+        raise UserError(_('Session affinity is maintained by the database'))
+
+    def unlink(self):
+        raise UserError(_('Session affinity is maintained by the database'))
 
     def name_get(self):
         result = []
@@ -295,3 +288,6 @@ class AcademyTrainingSessionAffinity(models.Model):
                     'present': False
                 }
                 invitation_obj.create(values)
+
+        # The ``invited`` column is updated by a trigger
+        self.invalidate_cache(['invited'])
@@ -22,7 +22,10 @@ class FacilityReservation(models.Model):
     """
 
     _name = 'facility.reservation'
-    _inherit = ['facility.reservation']
+    _inherit = [
+        'facility.reservation',
+        'academy.timesheets.overlapping.mixin'
+    ]
 
     session_id = fields.Many2one(
         string='Session',
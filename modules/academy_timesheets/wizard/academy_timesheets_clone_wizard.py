@@ -8,15 +8,20 @@ from odoo import models, fields, api
 from odoo.tools.translate import _
 from odoo.exceptions import ValidationError, UserError
 from odoo.osv.expression import AND
-from odoo.tools import safe_eval
+from odoo.tools import safe_eval, split_every
 
 from datetime import timedelta, datetime
 from logging import getLogger
+from time import monotonic
 
 
 _logger = getLogger(__name__)
 
 
+CLONE_BATCH_SIZE = 100
+LOG_BATCH_SIZE = 500
+
+
 class AcademyTimesheetsCloneWizard(models.TransientModel):
     """ Clone all sessions from a given date or week
     """
@@ -318,7 +323,99 @@ class AcademyTimesheetsCloneWizard(models.TransientModel):
 
         return {'date_start': date_start, 'date_stop': date_stop}
 
+    def _session_target_ids(self, session_set, target_set):
+        """ Returns the ID of the target each session belongs to. When a
+        session belongs to more than one target, the first one is used.
+        """
+        target_ids = set(target_set.ids)
+        result = {}
+
+        if target_set._name == 'academy.training.action':
+            for session in session_set:
+                result[session.id] = session.training_action_id.id
+        else:
+            for session in session_set:
+                path = 'teacher_assignment_ids.teacher_id'
+                teacher_ids = session.mapped(path).ids
+                result[session.id] = next(
+                    (item for item in teacher_ids if item in target_ids),
+                    False)
+
+        return result
+
+    def _group_sessions(self, session_set, target_set, start):
+        """ Groups sessions by target and by day offset from ``start``
+
+        Returns:
+            dict: {(target_id, offset): [session, ...]}
+        """
+        result = {}
+
+        target_ids = self._session_target_ids(session_set, target_set)
+        for session in session_set:
+            offset = (session.date_start.date() - start).days
+            key = (target_ids[session.id], offset)
+            result.setdefault(key, []).append(session)
+
+        return result
+
+    def _run_in_batches(self, session_list, operation):
+        """ Performs ``operation`` over batches of sessions. Each batch runs
+        in its own savepoint; if a batch fails, its sessions are retried one
+        by one to isolate the failing ones.
+
+        Returns:
+            dict: exception raised by each failed session ID
+        """
+        session_obj = self.env['academy.training.session']
+        errors = {}
+
+        for batch in split_every(CLONE_BATCH_SIZE, session_list):
+            try:
+                with self.env.cr.savepoint():
+                    operation(batch)
+
+            except Exception:
+                session_obj.invalidate_cache()
+                for session in batch:
+                    try:
+                        with self.env.cr.savepoint():
+                            operation([session])
+                    except Exception as ex:
+                        errors[session.id] = ex
+
+            session_obj.invalidate_cache()
+
+        return errors
+
+    def _unlink_sessions(self, session_list):
+        session_set = self.env['academy.training.session']
+        for session in session_list:
+            session_set += session
+
+        session_set.unlink()
+
+    def _clone_sessions(self, session_list, to_start, from_start):
+        source_set = self.env['academy.training.session']
+        default_list = []
+
+        for session in session_list:
+            offset = (session.date_start.date() - from_start).days
+            to_date = to_start + timedelta(days=offset)
+            default_list.append(self._compute_new_interval(session, to_date))
+            source_set += session
+
+        session_set = source_set._copy_many(default_list)
+
+        if self.autoinvite:
+            session_set.invite_all()
+
     def perform_action(self):
+        """ Clones all the sessions of the selected targets. Source and
+        destination sessions are fetched with a single search each and
+        processed in batches, each one in its own savepoint. Log records are
+        also created in batches once all the work has been done.
+        """
         self.ensure_one()
 
         if self.tracking_disable:
@@ -328,6 +425,7 @@ class AcademyTimesheetsCloneWizard(models.TransientModel):
 
         log_obj = self.env['academy.timesheets.clone.wizard.log']
         sequence = 10
+        buffer = []
 
         from_start, from_stop, to_start, to_stop = self._get_consistent_dates()
 
@@ -340,68 +438,99 @@ class AcademyTimesheetsCloneWizard(models.TransientModel):
             msg = _('No records selected for which to clone sessions')
             raise ValidationError(msg)
 
+        started = monotonic()
+
+        # STEP 1: Remove existing sessions in destination range
+        removed_groups = {}
+        found = {}
+        no_delete = {}
+        if self.method == 'replace':
+            session_set = self._search_sessions(target_set, to_start, to_stop)
+            removed_groups = self._group_sessions(
+                session_set, target_set, to_start)
+
+            # Log messages need values of the sessions will be removed
+            for target in target_set:
+                for offset in range(0, (from_stop - from_start).days):
+                    from_date = from_start + timedelta(days=offset)
+                    for session in removed_groups.get((target.id, offset), []):
+                        values = []
+                        log_obj.found(0, self, target, from_date, session,
+                                      buffer=values)
+                        found[session.id] = values[0]
+
+            no_delete = self._run_in_batches(
+                list(session_set), self._unlink_sessions)
+
+        # STEP 2: Clone sessions from source range
+        session_set = self._search_sessions(target_set, from_start, from_stop)
+        cloned_groups = self._group_sessions(
+            session_set, target_set, from_start)
+
+        no_clone = self._run_in_batches(
+            list(session_set),
+            lambda batch: self._clone_sessions(batch, to_start, from_start))
+
+        elapsed = monotonic() - started
+
+        # STEP 3: Write log in the same order they were written before
         for target in target_set:
-            sequence = log_obj.target(sequence, self, target)
+            sequence = log_obj.target(sequence, self, target, buffer=buffer)
 
             for offset in range(0, (from_stop - from_start).days):
-
                 from_date = from_start + timedelta(days=offset)
                 to_date = to_start + timedelta(days=offset)
                 sequence = log_obj.dates(
-                    sequence, self, target, from_date, to_date)
-
-                if self.method == 'replace':
-
-                    session_set = self._search_sessions(
-                        target, to_date, to_date + timedelta(days=1))
-
-                    for session in session_set:
-                        sequence = log_obj.found(
-                            sequence, self, target, from_date, session)
-
-                        try:
-                            self.env.cr.commit()
-                            session.unlink()
-                            self.env.cr.commit()
-                        except Exception as ex:
-                            self.env.cr.rollback()
-                            sequence = log_obj.no_delete(
-                                sequence, self, target, from_date, session, ex)
-                        else:
-                            sequence = log_obj.delete(
-                                sequence, self, target, from_date)
-
-                session_set = self._search_sessions(
-                    target, from_date, from_date + timedelta(days=1))
-                for session in session_set:
-                    try:
-                        defaults = self._compute_new_interval(session, to_date)
+                    sequence, self, target, from_date, to_date, buffer=buffer)
 
-                        self.env.cr.commit()
-                        session.copy(defaults)
-                        if self.autoinvite:
-                            session.invite_all()
-                        self.env.cr.commit()
+                for session in removed_groups.get((target.id, offset), []):
+                    sequence = sequence + 10
+                    buffer.append(dict(found[session.id], sequence=sequence))
 
-                    except Exception as ex:
-                        self.env.cr.rollback()
+                    ex = no_delete.get(session.id)
+                    if ex:
+                        sequence = log_obj.no_delete(
+                            sequence, self, target, from_date, session, ex,
+                            buffer=buffer)
+                    else:
+                        sequence = log_obj.delete(
+                            sequence, self, target, from_date, buffer=buffer)
+
+                for session in cloned_groups.get((target.id, offset), []):
+                    ex = no_clone.get(session.id)
+                    if ex:
                         sequence = log_obj.no_clone(
                             sequence, self, target, from_date, to_date,
-                            session, ex)
+                            session, ex, buffer=buffer)
                     else:
                         sequence = log_obj.clone(
                             sequence, self, target, from_date, to_date,
-                            session)
+                            session, buffer=buffer)
+
+                if len(buffer) >= LOG_BATCH_SIZE:
+                    log_obj.flush_buffer(buffer)
+
+        removed = sum(len(item) for item in removed_groups.values())
+        cloned = sum(len(item) for item in cloned_groups.values())
+        failed = len(no_delete) + len(no_clone)
+
+        log_obj.summary(sequence, self, cloned - len(no_clone),
+                        removed - len(no_delete), failed, elapsed,
+                        buffer=buffer)
+        log_obj.flush_buffer(buffer)
 
-        return self._view_logs()
+        rate = (cloned + removed) / elapsed if elapsed > 0 else 0.0
+        return self._view_logs(rate)
 
-    def _view_logs(self):
+    def _view_logs(self, rate=None):
         self.ensure_one()
 
         action_xid = 'academy_timesheets.action_clone_wizard_log_act_window'
         action = self.env.ref(action_xid)
 
         name = _('Log history #{}').format(self.id)
+        if rate is not None:
+            name = _('{} ({:.2f} sessions/s)').format(name, rate)
 
         ctx = self.env.context.copy()
         ctx.update(safe_eval(action.context))
@@ -7,7 +7,6 @@
 from odoo import models
 from odoo.tools.translate import _
 from logging import getLogger
-from odoo.osv.expression import AND
 from odoo.tools import safe_eval
 
 _logger = getLogger(__name__)
@@ -34,13 +33,10 @@ class AcademyTimesheetsSearchTeachersWizard(models.TransientModel):
         date_start = date_start.strftime('%Y-%m-%d %H:%M:%S')
         date_stop = date_stop.strftime('%Y-%m-%d %H:%M:%S')
 
-        session_domain = AND([
-            [('date_start', '>=', date_start)],
-            [('date_start', '<', date_stop)],
-            [('state', '=', 'ready')]
-        ])
+        session_domain = [('state', '=', 'ready')]
         session_obj = self.env['academy.training.session']
-        session_set = session_obj.search(session_domain)
+        session_set = session_obj.overlapping(
+            date_start, date_stop, session_domain)
 
         path = 'teacher_assignment_ids.teacher_id.id'
         teacher_ids = session_set.mapped(path)
@@ -11,6 +11,7 @@ from odoo.exceptions import ValidationError
 from logging import getLogger
 from datetime import timedelta
 from base64 import encodebytes
+import json
 
 _logger = getLogger(__name__)
 
@@ -102,6 +103,16 @@ class AcademyTimesheetsSendByMailWizard(models.TransientModel):
               'message only')
     )
 
+    queued = fields.Boolean(
+        string='In background',
+        required=False,
+        readonly=False,
+        index=False,
+        default=False,
+        help=('If True, reports will be rendered and emails will be enqueued '
+              'by a scheduled action; a record will show the progress')
+    )
+
     def _correct_dates(self, stop_changes=False):
         msg = _('Last date should be later than first date')
 
@@ -132,6 +143,9 @@ class AcademyTimesheetsSendByMailWizard(models.TransientModel):
         model = self._get_active_model()
         active_ids = self._get_active_ids()
 
+        if self.queued:
+            return self._enqueue_mailing(model, active_ids)
+
         record_set = self._get_active_records(model, active_ids)
 
         email_values = {'email_to': None}
@@ -142,6 +156,7 @@ class AcademyTimesheetsSendByMailWizard(models.TransientModel):
         # Report will be empty when the model corresponds to student or teacher
         # In any other case the training action report will be used.
         training_action_report = self._get_training_action_report(model)
+        attachments = {}
 
         for record in record_set:
             target = self._get_target(record, model)
@@ -149,7 +164,7 @@ class AcademyTimesheetsSendByMailWizard(models.TransientModel):
 
             if training_action_report:
                 self._attach_training_action_report(
-                    email_values, training_action_report, target)
+                    email_values, training_action_report, target, attachments)
 
             # Emails will be sent to each user individually
             for recipient in recipients:
@@ -189,11 +204,46 @@ class AcademyTimesheetsSendByMailWizard(models.TransientModel):
 
         return attachment
 
-    def _attach_training_action_report(self, email_values, report, action):
-        attachment = self._render_training_action_report(report, action)
+    def _attach_training_action_report(self, email_values, report, action,
+                                       attachments=None):
+        """ Renders the training action report, ``attachments`` allows to
+        reuse the renders of the actions shared by several records.
+        """
+        attachments = {} if attachments is None else attachments
+
+        attachment = attachments.get(action.id)
+        if not attachment:
+            attachment = self._render_training_action_report(report, action)
+            attachments[action.id] = attachment
+
         m2m_ops = [(5, 0, 0), (4, attachment.id, 0)]
         email_values.update({'attachment_ids': m2m_ops})
 
+    def _enqueue_mailing(self, model, active_ids):
+        """ Creates the mailing record which will be processed by the
+        scheduled action and returns an action to follow its progress
+        """
+        mailing_obj = self.env['academy.timesheets.mailing']
+
+        mailing = mailing_obj.create({
+            'active_model': model,
+            'res_ids': json.dumps([item for item in active_ids
+                                   if isinstance(item, int)]),
+            'date_start': self.date_start,
+            'date_stop': self.date_stop,
+            'full_weeks': self.full_weeks,
+            'force_send': self.force_send
+        })
+
+        return {
+            'type': 'ir.actions.act_window',
+            'name': mailing.name,
+            'res_model': mailing._name,
+            'res_id': mailing.id,
+            'view_mode': 'form',
+            'target': 'current'
+        }
+
     def _with_referrer(self):
         """ Update context to communicate that the referrer will be this wizard
 
@@ -179,18 +179,9 @@ class AcademyTimesheetsVerificationWizard(models.TransientModel):
         lbound = datetime.combine(self.date_start, time.min)
         ubound = datetime.combine(self.date_stop + timedelta(days=1), time.min)
 
-        lbound = lbound.strftime('%Y-%m-%d %H:%M-%S')
-        ubound = ubound.strftime('%Y-%m-%d %H:%M-%S')
-
-        session_domain = [
-            '&',
-            '&',
-            ('training_action_id', 'in', action_ids),
-            ('date_start', '>=', lbound),
-            ('date_start', '<', ubound)
-        ]
+        session_domain = [('training_action_id', 'in', action_ids)]
         session_obj = self.env['academy.training.session']
-        session_set = session_obj.search(session_domain)
+        session_set = session_obj.overlapping(lbound, ubound, session_domain)
 
         return session_set
 